@@ -0,0 +1,166 @@
+"""Measures syncs of each stream end to end, running tap_ordway.main against
+the mock Ordway API from mock_server.py
+
+Usage: python benchmarks/e2e.py [--streams STREAMS] [--config JSON] ...
+
+Each stream is synced by its own tap process, so its CPU time and peak RSS
+(POSIX only) are the process'. Records/s counts every RECORD message the
+tap wrote, including its substreams' with --substreams.
+"""
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from mock_server import MockOrdwayServer, add_arguments, from_arguments
+from tap_ordway import discover
+from tap_ordway.streams import AVAILABLE_STREAMS, is_substream
+
+RECORD_PREFIXES = (b'{"type":"RECORD"', b'{"type": "RECORD"')
+
+# ru_maxrss is in kilobytes, except on macOS
+MAXRSS_BYTES = 1 if sys.platform == "darwin" else 1024
+
+
+def get_catalog(tap_stream_id: str, substreams: bool) -> Dict[str, Any]:
+    """ Gets a catalog selecting only the stream, and maybe its substreams """
+
+    selected = {tap_stream_id}
+
+    if substreams:
+        selected.update(
+            substream.tap_stream_id
+            for substream in getattr(
+                AVAILABLE_STREAMS[tap_stream_id], "substream_definitions", []
+            )
+        )
+
+    catalog = discover().to_dict()
+
+    for stream in catalog["streams"]:
+        for entry in stream["metadata"]:
+            if not entry["breadcrumb"]:
+                entry["metadata"]["selected"] = stream["tap_stream_id"] in selected
+
+    return catalog
+
+
+def run_tap(config_path: str, catalog_path: str, verbose: bool) -> Dict[str, Any]:
+    """Runs a sync, returning how many records it wrote, how long it took and
+    the resources it used
+    """
+
+    started_at = perf_counter()
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            "-c",
+            "import tap_ordway; tap_ordway.main()",
+            "--config",
+            config_path,
+            "--catalog",
+            catalog_path,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=None if verbose else subprocess.DEVNULL,
+    )
+    records = sum(1 for line in process.stdout if line.startswith(RECORD_PREFIXES))
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode != 0:
+        raise RuntimeError(f"The tap exited with status {process.returncode}")
+
+    return {
+        "records": records,
+        "seconds": perf_counter() - started_at,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": usage.ru_maxrss * MAXRSS_BYTES / 2 ** 20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--streams",
+        help="comma separated streams to sync, defaults to every top-level stream",
+    )
+    parser.add_argument(
+        "--substreams", action="store_true", help="also sync the streams' substreams"
+    )
+    parser.add_argument(
+        "--config", default="{}", help="JSON of extra tap config, e.g. page sizes"
+    )
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the tap's logs")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    tap_stream_ids = (
+        args.streams.split(",")
+        if args.streams
+        else [
+            tap_stream_id
+            for tap_stream_id, stream_class in AVAILABLE_STREAMS.items()
+            if not is_substream(stream_class)
+        ]
+    )
+    mock = from_arguments(args)
+    server = MockOrdwayServer(mock).start()
+    results: List[Dict[str, Any]] = []
+
+    print(
+        f"{'stream':<20} {'records':>8} {'records/s':>10} {'requests':>9}"
+        f" {'requests/s':>10} {'CPU s':>7} {'peak RSS MB':>11}"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "config.json")
+        catalog_path = os.path.join(directory, "catalog.json")
+
+        with open(config_path, "w") as config_file:
+            json.dump(
+                {
+                    "company": "benchmark",
+                    "user_token": "token",
+                    "user_email": "benchmark@example.com",
+                    "api_key": "key",
+                    "start_date": "2020-01-01T00:00:00Z",
+                    "api_url": server.url,
+                    **json.loads(args.config),
+                },
+                config_file,
+            )
+
+        for tap_stream_id in tap_stream_ids:
+            with open(catalog_path, "w") as catalog_file:
+                json.dump(get_catalog(tap_stream_id, args.substreams), catalog_file)
+
+            mock.prepare(tap_stream_id)
+            requests_before = mock.request_count
+            result = run_tap(config_path, catalog_path, args.verbose)
+            result["stream"] = tap_stream_id
+            result["requests"] = mock.request_count - requests_before
+            results.append(result)
+
+            print(
+                f"{tap_stream_id:<20} {result['records']:>8}"
+                f" {result['records'] / result['seconds']:>10.0f}"
+                f" {result['requests']:>9}"
+                f" {result['requests'] / result['seconds']:>10.1f}"
+                f" {result['cpu_seconds']:>7.2f} {result['peak_rss_mb']:>11.1f}",
+                flush=True,
+            )
+
+    server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Times the tap's per-record hot paths - every stream's transformer, denest,
+filter_record and handle_record - and counts their allocations
+
+Usage: python benchmarks/micro.py [--filter TEXT] [--save FILE] [--compare FILE]
+
+Each case is timed over --records synthetic API records, --repeat times
+with the garbage collector off, reporting the median time per call. A
+separate pass under tracemalloc reports the peak memory and the blocks
+still allocated - e.g. by output records - per call.
+
+--save stores the results as a baseline, which --compare reports changes
+against, exiting with status 1 when a case's best time got slower, or it
+allocates more blocks (by at least one per call), by over --threshold
+percent.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple
+import argparse
+from contextlib import redirect_stdout
+from datetime import timedelta
+import gc
+import json
+import os
+from random import Random
+from statistics import median
+import sys
+from time import perf_counter
+import tracemalloc
+from records import START, sample_api_record
+from tap_ordway import discover, filter_record, handle_record, set_global_config
+from tap_ordway.base import DataContext
+from tap_ordway.output import flush_messages
+from tap_ordway.streams import AVAILABLE_STREAMS, is_substream
+from tap_ordway.utils import denest
+
+CONFIG = {
+    "company": "benchmark",
+    "user_token": "token",
+    "user_email": "benchmark@example.com",
+    "api_key": "key",
+    "start_date": "2020-01-01T00:00:00Z",
+}
+
+
+class Case(NamedTuple):
+    """ A benchmarked function, called once per input `prepare` returns """
+
+    name: str
+    prepare: Callable[[], List[Any]]
+    run: Callable[[List[Any]], List[Any]]
+
+
+def _get_streams() -> Dict[str, Any]:
+    catalog = discover()
+
+    for entry in catalog.streams:
+        for metadata in entry.metadata:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = True
+
+    return {
+        tap_stream_id: stream_class(catalog, CONFIG, filter_record)
+        for tap_stream_id, stream_class in AVAILABLE_STREAMS.items()
+    }
+
+
+def _decoded(records: List[Dict[str, Any]]) -> Callable[[], List[Any]]:
+    """ Prepares fresh copies of records, as transformers modify them """
+
+    encoded = [json.dumps(record, default=str) for record in records]
+
+    return lambda: [json.loads(record) for record in encoded]
+
+
+def _transform_case(stream: Any, records: int) -> Case:
+    context = DataContext(
+        tap_stream_id=stream.tap_stream_id,
+        stream=stream,
+        filter_datetime=START - timedelta(days=1),
+        parent_record={} if is_substream(stream) else None,
+    )
+    transformer = stream.transformer_class()
+    random = Random(stream.tap_stream_id)
+
+    def run(inputs):
+        return [
+            transformed
+            for record in inputs
+            for transformed in transformer.transform(
+                record, stream.compiled_schema, context
+            )
+        ]
+
+    return Case(
+        f"transform/{stream.tap_stream_id} ({type(transformer).__name__})",
+        _decoded(
+            [sample_api_record(stream.tap_stream_id, i, random) for i in range(records)]
+        ),
+        run,
+    )
+
+
+def _denest_case(name: str, path, records: List[Dict[str, Any]]) -> Case:
+    return Case(
+        f"denest/{name}",
+        lambda: records,
+        lambda inputs: [denest(record, path) for record in inputs],
+    )
+
+
+def get_cases(records: int) -> List[Case]:
+    streams = _get_streams()
+    cases = [_transform_case(stream, records) for stream in streams.values()]
+
+    random = Random(0)
+    plans = [sample_api_record("plans", i, random) for i in range(records)]
+    wide_plans = [
+        sample_api_record("plans", i, random, children=500) for i in range(10)
+    ]
+    cases.append(_denest_case("plans.charges", ("charges",), plans))
+    cases.append(_denest_case("plans.charges x500", ("charges",), wide_plans))
+
+    invoices = streams["invoices"]
+    context = DataContext(
+        tap_stream_id="invoices",
+        stream=invoices,
+        filter_datetime=START + timedelta(days=1),
+    )
+    api_invoices = [sample_api_record("invoices", i, random) for i in range(records)]
+    cases.append(
+        Case(
+            "filter_record/invoices",
+            lambda: api_invoices,
+            lambda inputs: [filter_record(record, context) for record in inputs],
+        )
+    )
+
+    for tap_stream_id in ("invoices", "customers"):
+        stream = streams[tap_stream_id]
+        transformed = _transform_case(stream, records)
+        outputs = transformed.run(transformed.prepare())
+
+        def run(inputs, stream=stream):
+            state: Dict[str, Any] = {}
+
+            for record in inputs:
+                state = handle_record(stream.tap_stream_id, record, stream, 1, state)
+
+            flush_messages()
+
+            return [state]
+
+        cases.append(
+            Case(f"handle_record/{tap_stream_id}", lambda outputs=outputs: outputs, run)
+        )
+
+    return cases
+
+
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    """ Gets a case's median and best time, peak memory and blocks per call """
+
+    times = []
+
+    for _ in range(repeat):
+        inputs = case.prepare()
+        gc.collect()
+        gc.disable()
+
+        try:
+            started_at = perf_counter()
+            case.run(inputs)
+            times.append(perf_counter() - started_at)
+        finally:
+            gc.enable()
+
+    inputs = case.prepare()
+    calls = len(inputs)
+
+    tracemalloc.start()
+
+    try:
+        before = tracemalloc.take_snapshot()
+        current_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        outputs = case.run(inputs)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del outputs
+
+    return {
+        "us": median(times) * 1e6 / calls,
+        "min_us": min(times) * 1e6 / calls,
+        "peak_bytes": (peak - current_before) / calls,
+        "blocks": blocks / calls,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> bool:
+    """ Prints changes against `baseline`, returning whether any regressed """
+
+    regressed = False
+
+    print(f"\n{'case':<58} {'time':>8} {'blocks':>8}")
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        before, after = baseline[name], result
+        changes = [
+            (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            # Best times are the least skewed by the rest of the machine
+            for key in ("min_us", "blocks")
+        ]
+        flag = ""
+
+        # Blocks per call below one are mostly noise
+        if changes[0] > threshold or (
+            changes[1] > threshold and after["blocks"] - before["blocks"] >= 1
+        ):
+            flag = "  REGRESSED"
+            regressed = True
+
+        print(f"{name:<58} {changes[0]:>+7.1f}% {changes[1]:>+7.1f}%{flag}")
+
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=500, help="inputs per case")
+    parser.add_argument("--repeat", type=int, default=9, help="timed runs per case")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--save", help="write the results to this baseline file")
+    parser.add_argument("--compare", help="compare the results to this baseline file")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="regression threshold, percent"
+    )
+    args = parser.parse_args()
+
+    set_global_config(CONFIG)
+    results: Dict[str, Dict[str, float]] = {}
+
+    print(
+        f"{'case':<58} {'us/call':>9} {'min':>9} {'peak B/call':>12} {'blocks/call':>12}"
+    )
+
+    with open(os.devnull, "w") as devnull:
+        for case in get_cases(args.records):
+            if args.filter and args.filter not in case.name:
+                continue
+
+            # handle_record's messages are written to stdout
+            with redirect_stdout(devnull):
+                result = measure(case, args.repeat)
+
+            results[case.name] = result
+            print(
+                f"{case.name:<58} {result['us']:>9.2f} {result['min_us']:>9.2f}"
+                f" {result['peak_bytes']:>12.0f} {result['blocks']:>12.1f}",
+                flush=True,
+            )
+
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
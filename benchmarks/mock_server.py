@@ -0,0 +1,282 @@
+"""An offline mock of the Ordway API, serving synthetic pages of records for
+every endpoint in AVAILABLE_STREAMS
+
+Usage: python benchmarks/mock_server.py [--port PORT] [--records RECORDS] ...
+
+Top-level streams have `--records` records each, whose replication keys
+increase by a minute from 2021-01-01 - so INCREMENTAL filters, including
+keyset pagination's, select whole ranges of them. Nested records (e.g.
+invoices' line items, customers' contacts) and endpoint-based substreams
+have `--children` records per parent record.
+"""
+from typing import Dict, List, Optional, Tuple
+import argparse
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+from random import Random
+import re
+from threading import Lock, Thread
+from time import sleep
+from urllib.parse import parse_qsl, urlsplit
+from singer.utils import strptime_to_utc
+from records import START, STEP, sample_api_record
+from tap_ordway.streams import AVAILABLE_STREAMS, EndpointSubstream, ResponseSubstream
+
+
+def _get_routes() -> List[Tuple["re.Pattern", str]]:
+    routes = []
+
+    for tap_stream_id, stream_class in AVAILABLE_STREAMS.items():
+        if issubclass(stream_class, ResponseSubstream):
+            continue
+
+        pattern = re.escape(stream_class.request_handler.endpoint_template.lstrip("/"))
+        pattern = pattern.replace(r"\{id\}", "(?P<id>[^/]+)")
+        routes.append((re.compile(f"^/(?:api/v1/)?{pattern}$"), tap_stream_id))
+
+    return routes
+
+
+class MockOrdway:
+    """Generates, and caches, the API's responses
+
+    Each request sleeps for `latency` seconds, give or take up to `jitter`,
+    and is throttled with a 429 response `throttle_rate` of the time. Pages
+    are at most `max_page_size` records, whatever size is requested.
+    """
+
+    def __init__(
+        self,
+        records: int = 1000,
+        children: int = 2,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        max_page_size: Optional[int] = None,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        total_header: bool = False,
+        compress: bool = True,
+        seed: int = 0,
+    ):
+        self.records = records
+        self.children = children
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.total_header = total_header
+        self.compress = compress
+        self.seed = seed
+
+        self.request_count = 0
+        self._routes = _get_routes()
+        self._random = Random(seed)
+        self._encoded: Dict[Tuple[str, Optional[str]], List[bytes]] = {}
+        self._lock = Lock()
+
+    def get_records(
+        self, tap_stream_id: str, parent_id: Optional[str] = None
+    ) -> List[bytes]:
+        """Gets the JSON encoded records of a stream - or, for endpoint-based
+        substreams, of one of their parent's
+        """
+
+        key = (tap_stream_id, parent_id)
+        encoded = self._encoded.get(key)
+
+        if encoded is None:
+            count = self.records if parent_id is None else self.children
+            random = Random(f"{self.seed}:{tap_stream_id}:{parent_id}")
+            encoded = [
+                json.dumps(
+                    sample_api_record(tap_stream_id, i, random, self.children),
+                    default=str,
+                ).encode()
+                for i in range(count)
+            ]
+
+            with self._lock:
+                encoded = self._encoded.setdefault(key, encoded)
+
+        return encoded
+
+    def prepare(self, tap_stream_id: str) -> None:
+        """ Generates a stream's records ahead of its requests """
+
+        self.get_records(tap_stream_id)
+
+        for substream_class in getattr(
+            AVAILABLE_STREAMS[tap_stream_id], "substream_definitions", []
+        ):
+            if issubclass(substream_class, EndpointSubstream):
+                for i in range(self.records):
+                    self.get_records(
+                        substream_class.tap_stream_id, f"{tap_stream_id.upper()}-{i:06}"
+                    )
+
+    def _get_index(self, value: str) -> int:
+        return max(math.ceil((strptime_to_utc(value) - START) / STEP), 0)
+
+    def handle(
+        self, path: str, params: Dict[str, str]
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """ Gets the status, headers and body to respond to a GET request with """
+
+        with self._lock:
+            self.request_count += 1
+            throttled = self._random.random() < self.throttle_rate
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+
+        if delay > 0:
+            sleep(delay)
+
+        if throttled:
+            return 429, {"Retry-After": str(self.retry_after)}, b"[]"
+
+        for pattern, tap_stream_id in self._routes:
+            match = pattern.match(path)
+
+            if match is not None:
+                break
+        else:
+            return 404, {}, b'{"message": "Not found"}'
+
+        records = self.get_records(tap_stream_id, match.groupdict().get("id"))
+        first, last = 0, len(records)
+
+        for name, value in params.items():
+            if name.endswith(">"):
+                first = max(first, self._get_index(value))
+            elif name.endswith("<"):
+                last = min(last, self._get_index(value))
+
+        size = int(params.get("size", 20))
+
+        if self.max_page_size is not None:
+            size = min(size, self.max_page_size)
+
+        start = first + (int(params.get("page", 1)) - 1) * size
+        page = records[start : min(start + size, last)] if start < last else []
+        headers = {"Content-Type": "application/json"}
+
+        if self.total_header:
+            headers["X-Total-Count"] = str(max(last - first, 0))
+
+        return 200, headers, b"[" + b",".join(page) + b"]"
+
+
+class MockOrdwayRequestHandler(BaseHTTPRequestHandler):
+    server: "MockOrdwayServer"
+    protocol_version = "HTTP/1.1"
+    # Headers and bodies are written separately, which Nagle's algorithm
+    # would hold back for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlsplit(self.path)
+        status, headers, body = self.server.mock.handle(
+            url.path, dict(parse_qsl(url.query))
+        )
+
+        if self.server.mock.compress and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        ):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+        self.send_response(status)
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class MockOrdwayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, mock: MockOrdway, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), MockOrdwayRequestHandler)
+        self.mock = mock
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "MockOrdwayServer":
+        """ Serves requests on a background thread """
+
+        Thread(target=self.serve_forever, daemon=True).start()
+
+        return self
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--records", type=int, default=1000, help="records per stream")
+    parser.add_argument(
+        "--children", type=int, default=2, help="nested records per record"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="+/- seconds of latency"
+    )
+    parser.add_argument("--max-page-size", type=int, help="largest page served")
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="share of requests throttled"
+    )
+    parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="throttled requests' Retry-After"
+    )
+    parser.add_argument(
+        "--total-header", action="store_true", help="send X-Total-Count headers"
+    )
+    parser.add_argument(
+        "--no-compress", action="store_true", help="never gzip responses"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def from_arguments(args: argparse.Namespace) -> MockOrdway:
+    return MockOrdway(
+        records=args.records,
+        children=args.children,
+        latency=args.latency,
+        jitter=args.jitter,
+        max_page_size=args.max_page_size,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        total_header=args.total_header,
+        compress=not args.no_compress,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--port", type=int, default=8000)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockOrdwayServer(from_arguments(args), port=args.port)
+    print(f"Serving a mock Ordway API on {server.url}", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
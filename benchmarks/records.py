@@ -0,0 +1,151 @@
+"""Realistic records of the tap's streams, as output by their transformers
+or as returned by Ordway's API
+"""
+from typing import Any, Dict
+from datetime import datetime, timedelta
+from decimal import Decimal
+import json
+import os
+from random import Random
+from pytz import UTC
+from tap_ordway.streams import AVAILABLE_STREAMS, ResponseSubstream
+
+SCHEMAS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "tap_ordway", "schemas"
+)
+
+# API records' replication keys increase by STEP from START
+START = datetime(2021, 1, 1, tzinfo=UTC)
+STEP = timedelta(minutes=1)
+
+# Lists of lines a top-level stream's transformer turns into its records
+LINE_ITEMS = {
+    "invoices": "line_items",
+    "orders": "line_items",
+    "subscriptions": "plans",
+    "debit_memo": "debit_lines",
+}
+
+_KEY_METRICS = (
+    "monthly_recurring_revenue",
+    "annual_contract_revenue",
+    "total_contract_revenue",
+    "amount_invoiced",
+)
+
+_CONTACT = {
+    "first_name": "Jane",
+    "last_name": "Doe",
+    "email": "jane.doe@example.com",
+    "address1": "100 Main St",
+    "city": "San Francisco",
+    "state": "CA",
+    "zip": "94105",
+    "country": "United States",
+}
+
+
+def load_schema(tap_stream_id: str) -> Dict[str, Any]:
+    with open(os.path.join(SCHEMAS_DIR, f"{tap_stream_id}.json")) as schema_file:
+        return json.load(schema_file)
+
+
+def _sample_value(name: str, schema: Dict[str, Any], i: int, random: Random) -> Any:
+    types = schema.get("type", [])
+    types = types if isinstance(types, list) else [types]
+
+    if "null" in types and random.random() < 0.15:
+        return None
+
+    if schema.get("format") == "date":
+        return f"2021-{random.randint(1, 12):02}-{random.randint(1, 28):02}"
+
+    if schema.get("format") == "date-time":
+        return f"2021-{random.randint(1, 12):02}-{random.randint(1, 28):02}T{random.randint(0, 23):02}:{random.randint(0, 59):02}:{random.randint(0, 59):02}.{random.randint(0, 999):03}000Z"
+
+    if "number" in types:
+        return Decimal(random.randint(0, 10_000_000)) / 100
+
+    if "integer" in types:
+        return random.randint(1, 10)
+
+    if "boolean" in types:
+        return random.random() < 0.5
+
+    if "object" in types:
+        return dict(_CONTACT) if "contact" in name else {"region": "West"}
+
+    if "array" in types:
+        return [
+            {"name": "Sales Tax", "rate": Decimal("0.0725"), "amount": Decimal("7.25")}
+        ]
+
+    if name.endswith("_id"):
+        return f"{name[:-3].upper()}-{i:06}"
+
+    return f"Sample {name.replace('_', ' ')} {i}"
+
+
+def sample_record(
+    properties: Dict[str, Any], i: int, random: Random
+) -> Dict[str, Any]:
+    """ Generates the `i`th record following a schema's `properties` """
+
+    return {
+        name: _sample_value(name, schema, i, random)
+        for name, schema in properties.items()
+    }
+
+
+def sample_records(tap_stream_id: str, count: int, seed: int = 0):
+    """ Generates `count` records following the stream's schema """
+
+    random = Random(seed)
+    properties = load_schema(tap_stream_id)["properties"]
+
+    return [sample_record(properties, i, random) for i in range(count)]
+
+
+def sample_api_record(
+    tap_stream_id: str, i: int, random: Random, children: int = 2
+) -> Dict[str, Any]:
+    """Generates the `i`th record of a stream as Ordway's API returns it,
+    i.e. before its transformer - with `children` line items and response
+    substream records
+    """
+
+    stream_class = AVAILABLE_STREAMS[tap_stream_id]
+    properties = load_schema(tap_stream_id)["properties"]
+    record = sample_record(properties, i, random)
+    record["id"] = f"{tap_stream_id.upper()}-{i:06}"
+
+    if "updated_date" in record:
+        updated_date = START + STEP * i
+        record["updated_date"] = updated_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    if tap_stream_id == "customers":
+        record["customer_type"] = record.pop("billing_batch", None)
+
+    if tap_stream_id == "billing_schedules":
+        record["key_metrics"] = {name: record.pop(name, None) for name in _KEY_METRICS}
+
+    if tap_stream_id in LINE_ITEMS:
+        record[LINE_ITEMS[tap_stream_id]] = [
+            dict(sample_record(properties, i, random), line_no=line_no)
+            for line_no in range(1, children + 1)
+        ]
+
+    for substream_class in getattr(stream_class, "substream_definitions", []):
+        if issubclass(substream_class, ResponseSubstream):
+            substream_properties = load_schema(substream_class.tap_stream_id)[
+                "properties"
+            ]
+            record[substream_class.path[0]] = [
+                dict(
+                    sample_record(substream_properties, i * children + j, random),
+                    id=f"{substream_class.tap_stream_id.upper()}-{i:06}-{j}",
+                )
+                for j in range(children)
+            ]
+
+    return record
@@ -0,0 +1,41 @@
+"""Compares the cost of serializing RECORD messages with each json_encoder
+
+Usage: python benchmarks/serialization.py [RECORDS]
+"""
+import sys
+from timeit import timeit
+from records import sample_records
+from singer.messages import RecordMessage
+from tap_ordway.output import HAS_ORJSON, encode_orjson, encode_simplejson
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    encoders = [("simplejson", encode_simplejson)]
+
+    if HAS_ORJSON:
+        encoders.append(("orjson", encode_orjson))
+    else:
+        print("orjson>=3.9 isn't installed, skipping it")
+
+    for tap_stream_id in ("invoices", "subscriptions"):
+        messages = [
+            RecordMessage(tap_stream_id, record, version=1)
+            for record in sample_records(tap_stream_id, count)
+        ]
+
+        for name, encode in encoders:
+            seconds = timeit(
+                lambda encode=encode: [encode(message) for message in messages],
+                number=1,
+            )
+            size = sum(len(encode(message)) for message in messages) / count
+
+            print(
+                f"{tap_stream_id:<14} {name:<11} {seconds * 1e6 / count:8.2f} us/record"
+                f" {size:8.0f} bytes/record"
+            )
+
+
+if __name__ == "__main__":
+    main()
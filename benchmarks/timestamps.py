@@ -0,0 +1,53 @@
+"""Compares the per-record cost of parsing replication keys with singer's
+strptime_to_utc and tap_ordway's parse_timestamp
+
+Usage: python benchmarks/timestamps.py [RECORDS]
+"""
+import sys
+from datetime import datetime, timedelta
+from timeit import timeit
+from pytz import UTC
+from singer.utils import strptime_to_utc
+from tap_ordway.timestamps import parse_timestamp
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+
+    # Like Ordway's updated_date values: mostly unique, some repeated
+    values = [
+        (start + timedelta(milliseconds=7919 * (i - i % 4))).strftime(
+            "%Y-%m-%dT%H:%M:%S.%f"
+        )[:-3]
+        + "Z"
+        for i in range(records)
+    ]
+
+    def parse_all(parse):
+        for value in values:
+            parse(value)
+
+    results = [
+        ("singer strptime_to_utc", timeit(lambda: parse_all(strptime_to_utc), number=1)),
+    ]
+
+    parse_timestamp.cache_clear()
+    results.append(
+        ("parse_timestamp", timeit(lambda: parse_all(parse_timestamp), number=1))
+    )
+    results.append(
+        (
+            "parse_timestamp (no memo)",
+            timeit(lambda: parse_all(parse_timestamp.__wrapped__), number=1),
+        )
+    )
+
+    print(f"{records} records")
+
+    for name, seconds in results:
+        print(f"{name:<28} {seconds * 1e6 / records:8.2f} us/record")
+
+
+if __name__ == "__main__":
+    main()
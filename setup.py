@@ -15,6 +15,8 @@ INSTALL_REQUIRES = [
 ]
 
 EXTRA_REQUIRES = {
+    "async": ["aiohttp>=3.8"],
+    "orjson": ["orjson>=3.9"],
     "dev": ["black==20.8b1", "pylint==3.3.4", "tox==3.20.1"],
     "testing": [
         "mypy",
@@ -52,7 +54,7 @@ setup(
     [console_scripts]
     tap-ordway=tap_ordway:main
     """,
-    packages=find_packages(exclude=["tests", "tests.*"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks"]),
     package_data={"schemas": ["tap_ordway/schemas/*.json"]},
     include_package_data=True,
     extras_require=EXTRA_REQUIRES,
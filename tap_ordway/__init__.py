@@ -1,29 +1,58 @@
 #!/usr/bin/env python3
-from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 import json
 import os
+import sys
+from functools import partial
 from _datetime import datetime
 from singer import get_logger
-from singer.bookmarks import set_currently_syncing, write_bookmark
+from singer.bookmarks import (
+    clear_bookmark,
+    get_bookmark,
+    set_currently_syncing,
+    write_bookmark,
+)
 from singer.catalog import Catalog, CatalogEntry
-from singer.messages import write_schema, write_state
 from singer.schema import Schema
-from singer.utils import handle_top_exception, parse_args, strptime_to_utc
+from singer.utils import handle_top_exception, parse_args
 import tap_ordway.configs as TAP_CONFIG
+from .api import AsyncRequestHandler, RequestHandler
+from .api.aio import close_event_loop_thread
 from .api.consts import DEFAULT_API_VERSION
+from .api.decoding import get_decoder
+from .api.pagination import PageCursor
+from .api.session import close_session
+from .backfill import CompletedWindow, get_backfill_windows, sync_backfill_windows
+from .checkpoint import Checkpointer
+from .profiling import (
+    get_stage_profile,
+    iter_profiled,
+    log_stage_profiles,
+    parse_profiler_args,
+    profile_stream,
+    start_profiler,
+    stop_profiler,
+    time_stage,
+)
 from .property import (
     get_key_properties,
     get_replication_key,
     get_replication_method,
     get_stream_metadata,
 )
+from .scheduler import StreamScheduler
 from .streams import AVAILABLE_STREAMS, check_dependency_conflicts, is_substream
+from .timestamps import parse_timestamp
+from .output import flush_messages, get_encoder
 from .utils import (
     get_filter_datetime,
     get_full_table_version,
+    get_page_cursor,
     is_first_run,
     print_record,
     write_activate_version,
+    write_schema,
+    write_state,
 )
 
 if TYPE_CHECKING:
@@ -97,7 +126,9 @@ def filter_record(record: Dict[str, Any], context: "DataContext") -> bool:
 
         return False
 
-    if strptime_to_utc(record_updated_date) <= context.filter_datetime:
+    record_datetime = parse_timestamp(record_updated_date)
+
+    if record_datetime <= context.filter_datetime:
         LOGGER.debug(
             "Skipping record for stream '%s': %s is <= %s",
             context.tap_stream_id,
@@ -107,24 +138,61 @@ def filter_record(record: Dict[str, Any], context: "DataContext") -> bool:
 
         return True
 
+    if context.until_datetime is not None and record_datetime >= context.until_datetime:
+        LOGGER.debug(
+            "Skipping record for stream '%s': %s is >= %s",
+            context.tap_stream_id,
+            record_updated_date,
+            context.until_datetime,
+        )
+
+        return True
+
     return False
 
 
+# pylint: disable=too-many-arguments
+#pylint: disable=R0917
 def handle_record(
     tap_stream_id: str,
     record: Dict[str, Any],
     stream_def: Union["Stream", "Substream"],
     stream_version: Optional[int],
     state: Dict[str, Any],
+    checkpointer: Optional[Checkpointer] = None,
 ) -> Dict[str, Any]:
-    """Handles a single record's emission"""
+    """Handles a single record's emission
+
+    Without a `checkpointer`, the stream is set as `currently_syncing` and
+    STATE is written after every bookmarked record. Otherwise, the caller
+    sets `currently_syncing`, and bookmarks are only added to the state once
+    they're safe resume points - so that STATE written for any stream never
+    holds another stream's unsafe bookmark. STATE is then written when the
+    checkpointer deems it due and a bookmark was added.
+    """
+
+    with time_stage(get_stage_profile(tap_stream_id), "handle_record"):
+        return _handle_record(
+            tap_stream_id, record, stream_def, stream_version, state, checkpointer
+        )
 
+
+def _handle_record(
+    tap_stream_id: str,
+    record: Dict[str, Any],
+    stream_def: Union["Stream", "Substream"],
+    stream_version: Optional[int],
+    state: Dict[str, Any],
+    checkpointer: Optional[Checkpointer],
+) -> Dict[str, Any]:
     print_record(tap_stream_id, record, version=stream_version)
 
-    if not is_substream(stream_def):
+    if checkpointer is None and not is_substream(stream_def):
         state = set_currently_syncing(state, tap_stream_id)
 
-    if not stream_def.is_valid_incremental:
+    if not stream_def.is_valid_incremental or (
+        checkpointer is not None and checkpointer.bookmarks_held
+    ):
         return state
 
     replication_key = stream_def.replication_key
@@ -144,20 +212,117 @@ def handle_record(
 
     LOGGER.debug("Adding bookmark for %s at %s", tap_stream_id, bookmark_date)
 
+    if checkpointer is None:
+        state = write_bookmark(state, tap_stream_id, replication_key, bookmark_date)
+        write_state(state)
+
+        return state
+
+    pending_bookmark = checkpointer.pending_bookmark
+
+    # Records are requested with `{replication_key}>{bookmark}`, so the
+    # bookmark can only be resumed from once every record sharing its value
+    # has been written - which is the case once the value changes.
+    if (
+        pending_bookmark is not None
+        and pending_bookmark != bookmark_date
+        and parse_timestamp(pending_bookmark) != parse_timestamp(bookmark_date)
+    ):
+        state = write_bookmark(state, tap_stream_id, replication_key, pending_bookmark)
+
+        if checkpointer.is_due:
+            write_state(state)
+            checkpointer.checkpointed()
+
+    checkpointer.pending_bookmark = bookmark_date
+    checkpointer.record_handled()
+
+    return state
+
+
+def handle_completed_window(
+    tap_stream_id: str,
+    completed_window: CompletedWindow,
+    stream_def: "Stream",
+    state: Dict[str, Any],
+    checkpointer: Checkpointer,
+) -> Dict[str, Any]:
+    """Advances a backfilled stream's bookmark past a completed window
+
+    Once the last window before the open-ended one completes, records
+    advance the bookmark as usual again.
+    """
+
+    LOGGER.info(
+        "Completed backfill window for %s up to %s",
+        tap_stream_id,
+        completed_window.bookmark,
+    )
+
     state = write_bookmark(
         state,
         tap_stream_id,
-        replication_key,
-        bookmark_date,
+        stream_def.replication_key,
+        completed_window.bookmark,
     )
+    write_state(state)
+    checkpointer.checkpointed()
+    checkpointer.pending_bookmark = None
+
+    if completed_window.is_last:
+        checkpointer.bookmarks_held = False
+
+    return state
+
 
+def handle_page_cursor(
+    tap_stream_id: str, page_cursor: PageCursor, state: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Records the page a FULL_TABLE stream's sync may be resumed from, now
+    that every record before it has been written
+    """
+
+    state = write_bookmark(state, tap_stream_id, "page_cursor", page_cursor._asdict())
     write_state(state)
 
     return state
 
 
+def get_stream_version(
+    tap_stream_id: str, state: Dict[str, Any], resumable: bool, resuming: bool
+) -> int:
+    """Gets the version of a FULL_TABLE stream's sync - the interrupted
+    sync's, when `resuming` it, so that ACTIVATE_VERSION keeps the records it
+    already wrote. Versions of `resumable` syncs are kept in the state.
+    """
+
+    version = get_bookmark(state, tap_stream_id, "version") if resuming else None
+
+    if not isinstance(version, int):
+        version = get_full_table_version()
+
+    if resumable:
+        write_bookmark(state, tap_stream_id, "version", version)
+
+    return version
+
+
 _STREAM_DEFS = Dict[str, Union["Stream", "Substream"]]  # pylint: disable=invalid-name
 _STREAM_VERSIONS = Dict[str, Optional[int]]  # pylint: disable=invalid-name
+_STREAM_RECORDS = Iterable[Tuple[str, Union[Dict[str, Any], CompletedWindow, PageCursor]]]  # pylint: disable=invalid-name
+
+def select_request_handler(stream_def: Union["Stream", "Substream"]) -> None:
+    """Swaps the stream's RequestHandler for an AsyncRequestHandler when
+    `async_http` is enabled
+    """
+
+    request_handler = getattr(stream_def, "request_handler", None)
+
+    if TAP_CONFIG.async_http and isinstance(request_handler, RequestHandler):
+        stream_def.request_handler = AsyncRequestHandler.from_request_handler(  # type: ignore
+            request_handler
+        )
+
 
 # Could be refactored
 # pylint: disable=too-many-arguments
@@ -177,6 +342,9 @@ def prepare_stream(
     # mypy isn't properly considering is_substream
     stream_def: "Stream" = AVAILABLE_STREAMS[tap_stream_id](catalog, config, filter_record)  # type: ignore
     stream_defs[stream_def.tap_stream_id] = stream_def
+    select_request_handler(stream_def)
+    resumable = TAP_CONFIG.resume_full_table and not stream_def.is_valid_incremental
+    resuming = get_page_cursor(stream_def, state) is not None
 
     if stream_def.has_substreams:
         stream_def.instantiate_substreams(catalog, filter_record)
@@ -190,13 +358,16 @@ def prepare_stream(
             # ignored type errors below seem to be caused by same issue as
             # https://github.com/python/mypy/issues/8993
             stream_defs[substream_def.tap_stream_id] = substream_def
-            substream_version = get_full_table_version()
+            select_request_handler(substream_def)
+            substream_version = get_stream_version(
+                substream_def.tap_stream_id, state, resumable, resuming
+            )
             stream_versions[substream_def.tap_stream_id] = substream_version
 
             write_schema(
                 stream_name=substream_def.tap_stream_id,
                 schema=substream_def.schema_dict,
-                key_properties=substream_def.key_properties,
+                key_properties=list(substream_def.key_properties),
             )
 
             # All substreams are necessarily FULL_TABLE, so no need to
@@ -215,12 +386,16 @@ def prepare_stream(
     write_schema(
         stream_name=stream_def.tap_stream_id,
         schema=stream_def.schema_dict,
-        key_properties=stream_def.key_properties,
+        key_properties=list(stream_def.key_properties),
     )
 
     filter_datetime = get_filter_datetime(stream_def, config["start_date"], state)
     stream_version = (
-        None if stream_def.is_valid_incremental else get_full_table_version()
+        None
+        if stream_def.is_valid_incremental
+        else get_stream_version(
+            stream_def.tap_stream_id, state, resumable, resuming
+        )
     )
     stream_versions[stream_def.tap_stream_id] = stream_version
 
@@ -238,12 +413,264 @@ def prepare_stream(
     return filter_datetime
 
 
+def finalize_stream(
+    stream_def: "Stream",
+    stream_versions: _STREAM_VERSIONS,
+    state: Dict[str, Any],
+    checkpointer: Optional[Checkpointer] = None,
+) -> None:
+    """Writes the Singer messages that conclude a stream's sync, adding the
+    `checkpointer`'s pending bookmark - safe now that every record was
+    written - to the state
+    """
+
+    if checkpointer is not None and checkpointer.pending_bookmark is not None:
+        write_bookmark(
+            state,
+            stream_def.tap_stream_id,
+            stream_def.replication_key,
+            checkpointer.pending_bookmark,
+        )
+
+    if TAP_CONFIG.resume_full_table and not stream_def.is_valid_incremental:
+        # The sync completed, so the next one starts over with a new version
+        for tap_stream_id in [stream_def.tap_stream_id] + [
+            substream_def.tap_stream_id
+            for substream_def in stream_def.substreams
+            if substream_def.is_selected
+        ]:
+            clear_bookmark(state, tap_stream_id, "page_cursor")
+            clear_bookmark(state, tap_stream_id, "version")
+
+    write_state(state)
+
+    for substream_def in stream_def.substreams:
+        if not substream_def.is_selected:
+            continue
+
+        # All substreams are necessarily FULL_TABLE and thus have a version,
+        # so write their ACTIVATE_VERSION messages without check.
+        write_activate_version(
+            substream_def.tap_stream_id,
+            stream_versions[substream_def.tap_stream_id],
+        )
+
+    if stream_versions[stream_def.tap_stream_id] is not None:
+        write_activate_version(
+            stream_def.tap_stream_id,
+            stream_versions[stream_def.tap_stream_id],
+        )
+
+    log_stage_profiles(
+        [stream_def.tap_stream_id]
+        + [
+            substream_def.tap_stream_id
+            for substream_def in stream_def.substreams
+            if substream_def.is_selected
+        ]
+    )
+
+
+def start_stream_sync(
+    stream_def: "Stream",
+    filter_datetime: datetime,
+    checkpointer: Checkpointer,
+    state: Dict[str, Any],
+) -> _STREAM_RECORDS:
+    """Starts syncing a top-level stream's records - in windows when
+    `backfill_window_days` is configured and the stream is far enough behind,
+    or from where an interrupted FULL_TABLE sync stopped with
+    `resume_full_table`
+    """
+
+    windows = (
+        get_backfill_windows(filter_datetime) if stream_def.is_valid_incremental else []
+    )
+
+    if not windows:
+        page_cursor = get_page_cursor(stream_def, state)
+
+        if page_cursor is not None:
+            LOGGER.info(
+                "Resuming %s from page %d", stream_def.tap_stream_id, page_cursor.page
+            )
+
+        return stream_def.sync(filter_datetime, cursor=page_cursor)
+
+    LOGGER.info(
+        "Backfilling %s in %d windows", stream_def.tap_stream_id, len(windows)
+    )
+    checkpointer.bookmarks_held = True
+
+    return sync_backfill_windows(stream_def, filter_datetime, windows)
+
+
+# pylint: disable=too-many-arguments
+#pylint: disable=R0917
+def sync_stream(
+    tap_stream_id: str,
+    stream_defs: _STREAM_DEFS,
+    stream_versions: _STREAM_VERSIONS,
+    catalog: Catalog,
+    config: Dict[str, Any],
+    state: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Syncs a top-level stream, and its substreams, from start to finish"""
+
+    with profile_stream(tap_stream_id):
+        return _sync_stream(
+            tap_stream_id, stream_defs, stream_versions, catalog, config, state
+        )
+
+
+def _sync_stream(
+    tap_stream_id: str,
+    stream_defs: _STREAM_DEFS,
+    stream_versions: _STREAM_VERSIONS,
+    catalog: Catalog,
+    config: Dict[str, Any],
+    state: Dict[str, Any],
+) -> Dict[str, Any]:
+    LOGGER.info("Syncing stream: %s", tap_stream_id)
+
+    filter_datetime = prepare_stream(
+        tap_stream_id, stream_defs, stream_versions, catalog, config, state
+    )
+    stream_def = stream_defs[tap_stream_id]
+
+    LOGGER.info("Querying since: %s", filter_datetime)
+
+    state = set_currently_syncing(state, tap_stream_id)
+    checkpointer = Checkpointer.from_config(stream_def.request_handler)  # type: ignore
+    records = start_stream_sync(stream_def, filter_datetime, checkpointer, state)  # type: ignore
+
+    for record_stream_id, record in records:
+        if isinstance(record, CompletedWindow):
+            state = handle_completed_window(
+                record_stream_id, record, stream_def, state, checkpointer  # type: ignore
+            )
+
+            continue
+
+        if isinstance(record, PageCursor):
+            state = handle_page_cursor(record_stream_id, record, state)
+
+            continue
+
+        state = handle_record(
+            record_stream_id,
+            record,
+            stream_defs[record_stream_id],
+            stream_versions[record_stream_id],
+            state,
+            checkpointer,
+        )
+
+    finalize_stream(stream_def, stream_versions, state, checkpointer)  # type: ignore
+
+    return state
+
+
+# pylint: disable=too-many-arguments
+#pylint: disable=R0917
+def sync_streams_in_parallel(
+    tap_stream_ids: List[str],
+    stream_defs: _STREAM_DEFS,
+    stream_versions: _STREAM_VERSIONS,
+    catalog: Catalog,
+    config: Dict[str, Any],
+    state: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Syncs up to `max_parallel_streams` top-level streams at a time
+
+    Records are requested and transformed on worker threads, while every
+    Singer message - and therefore every state change - is written from the
+    calling thread. Each stream's records keep their order, and a stream's
+    SCHEMA messages are written before its records. Streams' bookmarks are
+    only added to the shared state at their own safe resume points, and
+    `currently_syncing` isn't set, as several streams are.
+    """
+
+    checkpointers: Dict[str, Checkpointer] = {}
+
+    def start(tap_stream_id: str) -> _STREAM_RECORDS:
+        LOGGER.info("Syncing stream: %s", tap_stream_id)
+
+        filter_datetime = prepare_stream(
+            tap_stream_id, stream_defs, stream_versions, catalog, config, state
+        )
+        checkpointers[tap_stream_id] = Checkpointer.from_config(
+            stream_defs[tap_stream_id].request_handler  # type: ignore
+        )
+
+        LOGGER.info("Querying %s since: %s", tap_stream_id, filter_datetime)
+
+        return iter_profiled(
+            start_stream_sync(
+                stream_defs[tap_stream_id],  # type: ignore
+                filter_datetime,
+                checkpointers[tap_stream_id],
+                state,
+            ),
+            tap_stream_id,
+        )
+
+    scheduler = StreamScheduler(TAP_CONFIG.max_parallel_streams)
+    jobs = (
+        (tap_stream_id, partial(start, tap_stream_id))
+        for tap_stream_id in tap_stream_ids
+    )
+
+    for scheduled in scheduler.run(jobs):
+        if scheduled.done:
+            LOGGER.info("Finished syncing stream: %s", scheduled.job_id)
+            finalize_stream(
+                stream_defs[scheduled.job_id],  # type: ignore
+                stream_versions,
+                state,
+                checkpointers[scheduled.job_id],
+            )
+            del checkpointers[scheduled.job_id]
+
+            continue
+
+        tap_stream_id, record = scheduled.item
+
+        if isinstance(record, CompletedWindow):
+            state = handle_completed_window(
+                tap_stream_id,
+                record,
+                stream_defs[tap_stream_id],  # type: ignore
+                state,
+                checkpointers[scheduled.job_id],
+            )
+
+            continue
+
+        if isinstance(record, PageCursor):
+            state = handle_page_cursor(tap_stream_id, record, state)
+
+            continue
+
+        state = handle_record(
+            tap_stream_id,
+            record,
+            stream_defs[tap_stream_id],
+            stream_versions[tap_stream_id],
+            state,
+            checkpointers[scheduled.job_id],
+        )
+
+    return state
+
+
 def sync(config: Dict[str, Any], state: Dict[str, Any], catalog: Catalog) -> None:
     # For looking up Catalog-configured streams more efficiently
     # later Singer stores catalog entries as a list and iterates
     # over it with .get_stream()
     stream_defs: Dict[str, Union["Stream", "Substream"]] = {}
     stream_versions: Dict[str, Optional[int]] = {}
+    tap_stream_ids: List[str] = []
 
     check_dependency_conflicts(catalog)
 
@@ -256,45 +683,246 @@ def sync(config: Dict[str, Any], state: Dict[str, Any], catalog: Catalog) -> Non
 
             continue
 
-        LOGGER.info("Syncing stream: %s", stream.tap_stream_id)
+        tap_stream_ids.append(stream.tap_stream_id)
 
-        filter_datetime = prepare_stream(
-            stream.tap_stream_id, stream_defs, stream_versions, catalog, config, state
+    try:
+        if TAP_CONFIG.max_parallel_streams > 1:
+            state = sync_streams_in_parallel(
+                tap_stream_ids, stream_defs, stream_versions, catalog, config, state
+            )
+        else:
+            for tap_stream_id in tap_stream_ids:
+                state = sync_stream(
+                    tap_stream_id, stream_defs, stream_versions, catalog, config, state
+                )
+    finally:
+        close_event_loop_thread()
+        close_session()
+        flush_messages()
+
+    state = set_currently_syncing(state, None)
+    write_state(state)
+
+
+def _set_rate_limit_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates the rate limiting config """
+
+    TAP_CONFIG.rate_limit_rps = config.get("rate_limit_rps")
+
+    if (
+        isinstance(TAP_CONFIG.rate_limit_rps, (int, float))
+        and TAP_CONFIG.rate_limit_rps <= 0
+    ):
+        raise ValueError(
+            "`rate_limit_rps` must be set to `null` or a number GREATER THAN 0"
         )
-        stream_def = stream_defs[stream.tap_stream_id]
 
-        LOGGER.info("Querying since: %s", filter_datetime)
+    TAP_CONFIG.rate_limit_burst = config.get("rate_limit_burst")
+    TAP_CONFIG.rate_limit_file = config.get("rate_limit_file")
 
-        for tap_stream_id, record in stream_def.sync(filter_datetime):  # type: ignore
-            state = handle_record(
-                tap_stream_id,
-                record,
-                stream_defs[tap_stream_id],
-                stream_versions[tap_stream_id],
-                state,
-            )
+    if TAP_CONFIG.rate_limit_burst is not None and (
+        not isinstance(TAP_CONFIG.rate_limit_burst, (int, float))
+        or TAP_CONFIG.rate_limit_burst < 1
+    ):
+        raise ValueError("`rate_limit_burst` must be set to `null` or a number >= 1")
 
-        write_state(state)
+    TAP_CONFIG.adaptive_rate_limit = config.get("adaptive_rate_limit", False)
+    TAP_CONFIG.rate_limit_min_rps = config.get("rate_limit_min_rps")
+    TAP_CONFIG.rate_limit_max_rps = config.get("rate_limit_max_rps")
 
-        for substream_def in stream_def.substreams:  # type: ignore
-            if not substream_def.is_selected:
-                continue
+    for key in ("rate_limit_min_rps", "rate_limit_max_rps"):
+        value = getattr(TAP_CONFIG, key)
 
-            # All substreams are necessarily FULL_TABLE and thus have a version,
-            # so write their ACTIVATE_VERSION messages without check.
-            write_activate_version(
-                substream_def.tap_stream_id,
-                stream_versions[substream_def.tap_stream_id],
-            )
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            raise ValueError(f"`{key}` must be set to `null` or a number GREATER THAN 0")
 
-        if stream_versions[stream_def.tap_stream_id] is not None:
-            write_activate_version(
-                stream_def.tap_stream_id,
-                stream_versions[stream_def.tap_stream_id],
-            )
 
-    state = set_currently_syncing(state, None)
-    write_state(state)
+def _set_concurrency_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates how many requests and streams run at once """
+
+    TAP_CONFIG.prefetch_pages = config.get("prefetch_pages") or 0
+
+    if not isinstance(TAP_CONFIG.prefetch_pages, int) or TAP_CONFIG.prefetch_pages < 0:
+        raise ValueError("`prefetch_pages` must be set to `null` or an integer >= 0")
+
+    TAP_CONFIG.max_parallel_streams = config.get("max_parallel_streams") or 1
+
+    if (
+        not isinstance(TAP_CONFIG.max_parallel_streams, int)
+        or TAP_CONFIG.max_parallel_streams < 1
+    ):
+        raise ValueError(
+            "`max_parallel_streams` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+    TAP_CONFIG.max_substream_workers = config.get("max_substream_workers") or 1
+
+    if (
+        not isinstance(TAP_CONFIG.max_substream_workers, int)
+        or TAP_CONFIG.max_substream_workers < 1
+    ):
+        raise ValueError(
+            "`max_substream_workers` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+    TAP_CONFIG.async_http = config.get("async_http", False)
+    TAP_CONFIG.max_concurrent_requests = config.get("max_concurrent_requests") or 100
+
+    if (
+        not isinstance(TAP_CONFIG.max_concurrent_requests, int)
+        or TAP_CONFIG.max_concurrent_requests < 1
+    ):
+        raise ValueError(
+            "`max_concurrent_requests` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+
+def _set_pagination_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates how pages are sized and requested """
+
+    TAP_CONFIG.adaptive_page_size = config.get("adaptive_page_size", False)
+    TAP_CONFIG.target_page_seconds = config.get("target_page_seconds") or 5
+    TAP_CONFIG.min_page_size = config.get("min_page_size") or 10
+    TAP_CONFIG.max_page_size = config.get("max_page_size") or 500
+
+    if (
+        not isinstance(TAP_CONFIG.target_page_seconds, (int, float))
+        or TAP_CONFIG.target_page_seconds <= 0
+    ):
+        raise ValueError(
+            "`target_page_seconds` must be set to `null` or a number GREATER THAN 0"
+        )
+
+    for key in ("min_page_size", "max_page_size"):
+        value = getattr(TAP_CONFIG, key)
+
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(f"`{key}` must be set to `null` or an integer GREATER THAN 0")
+
+    TAP_CONFIG.keyset_pagination = config.get("keyset_pagination", False)
+    TAP_CONFIG.resume_full_table = config.get("resume_full_table", False)
+
+
+def _set_http_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates how requests are made and their responses read """
+
+    TAP_CONFIG.http_pool_size = config.get("http_pool_size")
+
+    if TAP_CONFIG.http_pool_size is not None and (
+        not isinstance(TAP_CONFIG.http_pool_size, int) or TAP_CONFIG.http_pool_size < 1
+    ):
+        raise ValueError(
+            "`http_pool_size` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+    TAP_CONFIG.http_max_retries = config.get("http_max_retries") or 0
+
+    if (
+        not isinstance(TAP_CONFIG.http_max_retries, int)
+        or TAP_CONFIG.http_max_retries < 0
+    ):
+        raise ValueError(
+            "`http_max_retries` must be set to `null` or an integer GREATER THAN OR EQUAL TO 0"
+        )
+
+    TAP_CONFIG.http_tcp_keepalive = config.get("http_tcp_keepalive", True)
+    TAP_CONFIG.http_compression = config.get("http_compression", True)
+    TAP_CONFIG.prepared_requests = config.get("prepared_requests", False)
+
+    TAP_CONFIG.json_decoder = config.get("json_decoder") or "auto"
+
+    # Raises a ValueError for unknown or unavailable decoders
+    get_decoder(TAP_CONFIG.json_decoder)
+
+    TAP_CONFIG.stream_responses = config.get("stream_responses", False)
+
+
+def _set_backfill_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates the backfill config """
+
+    TAP_CONFIG.backfill_window_days = config.get("backfill_window_days")
+
+    if TAP_CONFIG.backfill_window_days is not None and (
+        not isinstance(TAP_CONFIG.backfill_window_days, (int, float))
+        or TAP_CONFIG.backfill_window_days <= 0
+    ):
+        raise ValueError(
+            "`backfill_window_days` must be set to `null` or a number GREATER THAN 0"
+        )
+
+    TAP_CONFIG.max_backfill_workers = config.get("max_backfill_workers") or 4
+
+    if (
+        not isinstance(TAP_CONFIG.max_backfill_workers, int)
+        or TAP_CONFIG.max_backfill_workers < 1
+    ):
+        raise ValueError(
+            "`max_backfill_workers` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+
+def _set_output_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates how Singer messages are written """
+
+    TAP_CONFIG.output_flush_bytes = config.get("output_flush_bytes") or 65536
+    TAP_CONFIG.output_flush_records = config.get("output_flush_records")
+
+    if (
+        not isinstance(TAP_CONFIG.output_flush_bytes, int)
+        or TAP_CONFIG.output_flush_bytes < 1
+    ):
+        raise ValueError(
+            "`output_flush_bytes` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+    if TAP_CONFIG.output_flush_records is not None and (
+        not isinstance(TAP_CONFIG.output_flush_records, int)
+        or TAP_CONFIG.output_flush_records < 1
+    ):
+        raise ValueError(
+            "`output_flush_records` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+    TAP_CONFIG.json_encoder = config.get("json_encoder") or "auto"
+
+    # Raises a ValueError for unknown or unavailable encoders
+    get_encoder(TAP_CONFIG.json_encoder)
+
+
+def _set_profiling_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates the profiling config """
+
+    TAP_CONFIG.profile_stages = config.get("profile_stages", False)
+    TAP_CONFIG.profile_summary_file = config.get("profile_summary_file")
+
+    if TAP_CONFIG.profile_summary_file is not None and not isinstance(
+        TAP_CONFIG.profile_summary_file, str
+    ):
+        raise ValueError("`profile_summary_file` must be set to `null` or a path")
+
+
+def _set_checkpoint_config(config: Dict[str, Any]) -> None:
+    """ Sets and validates the STATE checkpoint policy """
+
+    TAP_CONFIG.state_checkpoint_records = config.get("state_checkpoint_records")
+    TAP_CONFIG.state_checkpoint_seconds = config.get("state_checkpoint_seconds")
+    TAP_CONFIG.state_checkpoint_on_page = config.get("state_checkpoint_on_page", False)
+
+    if TAP_CONFIG.state_checkpoint_records is not None and (
+        not isinstance(TAP_CONFIG.state_checkpoint_records, int)
+        or TAP_CONFIG.state_checkpoint_records < 1
+    ):
+        raise ValueError(
+            "`state_checkpoint_records` must be set to `null` or an integer GREATER THAN 0"
+        )
+
+    if TAP_CONFIG.state_checkpoint_seconds is not None and (
+        not isinstance(TAP_CONFIG.state_checkpoint_seconds, (int, float))
+        or TAP_CONFIG.state_checkpoint_seconds <= 0
+    ):
+        raise ValueError(
+            "`state_checkpoint_seconds` must be set to `null` or a number GREATER THAN 0"
+        )
 
 
 def set_global_config(config: Dict[str, Any]) -> None:
@@ -316,19 +944,22 @@ def set_global_config(config: Dict[str, Any]) -> None:
     TAP_CONFIG.staging = config.get("staging", False)
     TAP_CONFIG.api_url = config.get("api_url")
     TAP_CONFIG.start_date = config["start_date"]
-    TAP_CONFIG.rate_limit_rps = config.get("rate_limit_rps")
 
-    if (
-        isinstance(TAP_CONFIG.rate_limit_rps, (int, float))
-        and TAP_CONFIG.rate_limit_rps <= 0
-    ):
-        raise ValueError(
-            "`rate_limit_rps` must be set to `null` or a number GREATER THAN 0"
-        )
+    _set_rate_limit_config(config)
+    _set_concurrency_config(config)
+    _set_pagination_config(config)
+    _set_http_config(config)
+    _set_backfill_config(config)
+    _set_output_config(config)
+    _set_profiling_config(config)
+    _set_checkpoint_config(config)
 
 
 @handle_top_exception(LOGGER)
 def main():
+    # Parse the --profile options, which singer doesn't know of, first
+    profiler, sys.argv[1:] = parse_profiler_args(sys.argv[1:])
+
     # Parse command line arguments
     args = parse_args(REQUIRED_CONFIG_KEYS)
 
@@ -347,7 +978,13 @@ def main():
 
         TAP_CONFIG.catalog = catalog
 
-        sync(args.config, args.state, catalog)
+        if profiler is not None:
+            start_profiler(profiler)
+
+        try:
+            sync(args.config, args.state, catalog)
+        finally:
+            stop_profiler()
 
 
 if __name__ == "__main__":
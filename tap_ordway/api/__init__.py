@@ -1 +1,2 @@
+from .aio import AsyncRequestHandler
 from .base import RequestHandler
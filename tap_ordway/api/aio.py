@@ -0,0 +1,338 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Deque,
+    Dict,
+    Generator,
+    List,
+    Mapping,
+    Optional,
+    TypeVar,
+)
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from threading import Lock, Thread
+from time import perf_counter
+from backoff import expo
+from backoff import on_exception as backoff_on_exception
+from singer import get_logger
+from singer.metrics import http_request_timer
+import tap_ordway.configs as TAP_CONFIG
+from ..profiling import StageProfile, get_stage_profile, time_stage
+from .base import RequestHandler, get_request_template
+from .consts import DEFAULT_TIMEOUT_SECS, MAX_THROTTLED_RETRIES
+from .decoding import get_decoder
+from .metrics import log_response_size
+from .pagination import Page, PageCursor, to_page
+from .ratelimit import get_retry_after
+
+LOGGER = get_logger()
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore
+
+if TYPE_CHECKING:
+    from ..base import DataContext
+    from .base import _DEFAULT_QUERY_PARAMS
+
+_T = TypeVar("_T")
+
+_RETRIED_EXCEPTIONS = (
+    (aiohttp.ClientError, asyncio.TimeoutError)
+    if aiohttp is not None
+    else (asyncio.TimeoutError,)
+)
+
+_client_sessions: Dict[asyncio.AbstractEventLoop, "aiohttp.ClientSession"] = {}
+
+
+async def get_client_session() -> "aiohttp.ClientSession":
+    """Gets the aiohttp session shared by all AsyncRequestHandlers on the
+    running event loop, pooling up to `max_concurrent_requests` connections
+    (or `http_pool_size`, if set)
+    """
+
+    loop = asyncio.get_running_loop()
+    session = _client_sessions.get(loop)
+
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=TAP_CONFIG.http_pool_size or TAP_CONFIG.max_concurrent_requests
+            ),
+            timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT_SECS),
+        )
+        _client_sessions[loop] = session
+
+    return session
+
+
+async def close_client_session() -> None:
+    """ Closes the running event loop's aiohttp session, if any """
+
+    session = _client_sessions.pop(asyncio.get_running_loop(), None)
+
+    if session is not None:
+        await session.close()
+
+
+class EventLoopThread:
+    """Runs an asyncio event loop on a daemon thread, so that synchronous
+    code - like the generators streams are synced through - can drive many
+    concurrent requests on it
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = Thread(
+            target=self.loop.run_forever, name="tap-ordway-asyncio", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coroutine: Awaitable[_T]) -> "Future[_T]":
+        """ Schedules `coroutine` on the event loop """
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)  # type: ignore
+
+    def iterate(self, iterator: AsyncIterator[_T]) -> Generator[_T, None, None]:
+        """ Consumes an async iterator from synchronous code """
+
+        try:
+            while True:
+                try:
+                    yield self.run(iterator.__anext__()).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+
+            if aclose is not None:
+                self.run(aclose()).result()
+
+    def close(self) -> None:
+        self.run(close_client_session()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_event_loop_thread: Optional[EventLoopThread] = None
+_event_loop_thread_lock = Lock()
+
+
+def get_event_loop_thread() -> EventLoopThread:
+    """ Gets the event loop all AsyncRequestHandlers are driven on """
+
+    global _event_loop_thread  # pylint: disable=global-statement
+
+    with _event_loop_thread_lock:
+        if _event_loop_thread is None:
+            _event_loop_thread = EventLoopThread()
+
+        return _event_loop_thread
+
+
+def close_event_loop_thread() -> None:
+    """ Stops the event loop started by `get_event_loop_thread`, if any """
+
+    global _event_loop_thread  # pylint: disable=global-statement
+
+    with _event_loop_thread_lock:
+        if _event_loop_thread is not None:
+            _event_loop_thread.close()
+            _event_loop_thread = None
+
+
+class AsyncRequestHandler:
+    """Handles requests to Ordway with asyncio and aiohttp
+
+    Many handlers can fetch concurrently on a single event loop, sharing
+    a pool of `max_concurrent_requests` connections. When `prefetch_pages` is
+    configured, up to that many pages - the current one included - are
+    requested concurrently, at the cost of a few empty pages past the last one.
+
+    Endpoints, query params and rate limiting are those of `request_handler`,
+    constructed from the same arguments as a RequestHandler.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if aiohttp is None:  # pragma: no cover
+            raise RuntimeError(
+                "AsyncRequestHandler requires aiohttp (pip install tap-ordway[async])"
+            )
+
+        self.request_handler = RequestHandler(*args, **kwargs)
+
+        # Pages handed to consumers of `fetch_pages`, across all calls
+        self.pages_consumed = 0
+        self._stage_profile: Optional[StageProfile] = None
+
+    @classmethod
+    def from_request_handler(
+        cls, request_handler: RequestHandler
+    ) -> "AsyncRequestHandler":
+        """ Creates an AsyncRequestHandler configured like `request_handler` """
+
+        return cls(
+            request_handler.endpoint_template,
+            page_size=request_handler.page_size,
+            sort=request_handler.sort,
+            rate_limiter=request_handler._rate_limiter,  # pylint: disable=protected-access
+            rate_controller=request_handler._rate_controller,  # pylint: disable=protected-access
+            stop_on_short_pages=request_handler.stop_on_short_pages,
+        )
+
+    def clone(self) -> "AsyncRequestHandler":
+        """ Creates an AsyncRequestHandler like this one, counting its own pages """
+
+        return type(self).from_request_handler(self.request_handler)
+
+    @property
+    def page_size(self) -> int:
+        """ The size of the pages requested, unless resuming from a cursor """
+
+        return self.request_handler.page_size
+
+    @backoff_on_exception(expo, _RETRIED_EXCEPTIONS, max_tries=3)
+    async def _get(self, path: str, params: Mapping[str, Any]) -> Page:
+        """ Perform a GET request with Ordway-related headers """
+
+        session = await get_client_session()
+        profile = self._stage_profile
+        rate_limiter = self.request_handler.rate_limiter
+        rate_controller = self.request_handler.rate_controller
+        throttled_retries = 0
+
+        # Unlike requests, aiohttp doesn't drop params set to None
+        params = {key: value for key, value in params.items() if value is not None}
+
+        while True:
+            if rate_limiter is not None:
+                await rate_limiter.acquire_async()
+
+            template = get_request_template()
+            started_at = perf_counter()
+
+            async with session.get(
+                template.get_url(path), headers=template.headers, params=params
+            ) as response:
+                if (
+                    response.status != 429
+                    or rate_controller is None
+                    or throttled_retries >= MAX_THROTTLED_RETRIES
+                ):
+                    if rate_controller is not None and response.status == 200:
+                        rate_controller.succeeded(response.headers)
+
+                    if response.status != 200:
+                        LOGGER.critical(
+                            'Ordway responded with status code "%d" and a body of "%s" for request "%s"',
+                            response.status,
+                            await response.text(),
+                            response.url,
+                        )
+
+                        response.raise_for_status()
+
+                    decode = get_decoder(TAP_CONFIG.json_decoder)
+                    content = await response.read()
+
+                    if profile is not None:
+                        profile.add("http", perf_counter() - started_at)
+
+                    log_response_size(path, response.headers, len(content))
+
+                    with time_stage(profile, "decode"):
+                        results = decode(content)
+
+                    return to_page(results, response.headers, params)
+
+                throttled_retries += 1
+                retry_after = get_retry_after(response.headers)
+
+                LOGGER.warning(
+                    'Ordway throttled request "%s", retrying after %s seconds',
+                    response.url,
+                    retry_after,
+                )
+
+                rate_controller.throttled(retry_after, endpoint=path)
+
+    async def _get_page(
+        self, endpoint: str, params: "_DEFAULT_QUERY_PARAMS"
+    ) -> List[Dict[str, Any]]:
+        with http_request_timer(endpoint=endpoint):
+            return await self._get(endpoint, params)
+
+    async def _iter_pages(
+        self, endpoint: str, params: "_DEFAULT_QUERY_PARAMS"
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """ Requests pages, starting at params["page"], until the last one """
+
+        pending: Deque["asyncio.Future[List[Dict[str, Any]]]"] = deque()
+        next_page = params["page"]
+
+        try:
+            while True:
+                while len(pending) < max(TAP_CONFIG.prefetch_pages, 1):
+                    pending.append(
+                        asyncio.ensure_future(
+                            self._get_page(endpoint, {**params, "page": next_page})
+                        )
+                    )
+                    next_page += 1
+
+                results = await pending.popleft()
+
+                yield results
+
+                if self.request_handler.is_last_page(
+                    len(results), getattr(results, "has_next", None), params["size"]
+                ):
+                    return
+        finally:
+            for task in pending:
+                if task.done() and not task.cancelled():
+                    # Pages past the last one don't matter, even if they failed
+                    task.exception()
+                else:
+                    task.cancel()
+
+    async def fetch_pages(
+        self, context: "DataContext", cursor: Optional[PageCursor] = None
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Fetches all pages constrained by `resolve_params` - starting at
+        `cursor`, if any
+        """
+
+        self._stage_profile = get_stage_profile(context.tap_stream_id)
+        pages = self._iter_pages(
+            self.request_handler.resolve_endpoint(context),
+            self.request_handler.get_default_params(context, cursor),
+        )
+
+        try:
+            async for results in pages:
+                self.pages_consumed += 1
+
+                yield results
+        finally:
+            await pages.aclose()
+
+    async def fetch(self, context: "DataContext") -> AsyncGenerator[Dict[str, Any], None]:
+        """ Fetches all records constrained by `resolve_params` """
+
+        pages = self.fetch_pages(context)
+
+        try:
+            async for results in pages:
+                for result in results:
+                    yield result
+        finally:
+            await pages.aclose()
@@ -1,19 +1,57 @@
-from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from datetime import datetime
+from time import monotonic
+from types import MappingProxyType
 from backoff import expo
 from backoff import on_exception as backoff_on_exception
-from requests import RequestException, Session
+from requests import (
+    PreparedRequest,
+    ReadTimeout,
+    Request,
+    RequestException,
+    Response,
+    Session,
+)
 from singer import get_logger
 from singer.metrics import http_request_timer
 from singer.utils import strftime
 import tap_ordway.configs as TAP_CONFIG
 from ..__version__ import __version__ as VERSION
+from ..profiling import StageProfile, get_stage_profile, time_stage
+from ..timestamps import parse_timestamp
 from .consts import (
     BASE_API_URL,
     BASE_STAGING_URL,
     DEFAULT_API_VERSION,
     DEFAULT_TIMEOUT_SECS,
+    MAX_THROTTLED_RETRIES,
+    STREAM_CHUNK_SIZE,
 )
-from .utils import ratelimit
+from .decoding import get_decoder, iter_json_array
+from .metrics import log_response_size
+from .pagesize import PageSizeController
+from .pagination import Page, PageCursor, get_has_next_page, is_last_page, to_page
+from .ratelimit import (
+    AdaptiveRateController,
+    TokenBucket,
+    get_rate_controller,
+    get_rate_limiter,
+    get_retry_after,
+)
+from .session import get_session
+from .utils import prefetch
 
 LOGGER = get_logger()
 
@@ -27,6 +65,8 @@ if TYPE_CHECKING:
         total=False,
     )
 
+_PAGES = Generator[Tuple[Optional[PageCursor], List[Dict[str, Any]]], None, None]
+
 
 def _get_headers() -> Dict[str, str]:
     """ Constructs Ordway-related headers """
@@ -38,6 +78,7 @@ def _get_headers() -> Dict[str, str]:
         "X-API-KEY": TAP_CONFIG.api_credentials["api_key"],
         "User-Agent": f"tap-ordway v{VERSION} (https://github.com/ordwaylabs/tap-ordway)",
         "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate" if TAP_CONFIG.http_compression else "identity",
     }
 
     if "company_token" in TAP_CONFIG.api_credentials:
@@ -46,6 +87,19 @@ def _get_headers() -> Dict[str, str]:
     return headers
 
 
+def _get_wire_size(response: Response) -> Optional[int]:
+    """ Gets how many bytes of a read response's body came off the connection """
+
+    try:
+        return response.raw.tell()
+    except (AttributeError, OSError):
+        return None
+
+
+def _is_read_timeout(err: Exception) -> bool:
+    return isinstance(err, ReadTimeout)
+
+
 def _get_api_version() -> str:
     """ Gets Ordway API version - formatting if necessary """
 
@@ -59,8 +113,8 @@ def _get_api_version() -> str:
     )
 
 
-def _get_url(path: str) -> str:
-    """ Constructs Ordway API URL """
+def _get_base_url() -> str:
+    """ Constructs Ordway API URL that endpoint paths are relative to """
 
     if TAP_CONFIG.api_url is not None:
         base_url = TAP_CONFIG.api_url
@@ -71,12 +125,62 @@ def _get_url(path: str) -> str:
         base_url = BASE_STAGING_URL if TAP_CONFIG.staging else BASE_API_URL
         base_url = f"{base_url}/{_get_api_version()}/"
 
+    return base_url
+
+
+def _join_url(base_url: str, path: str) -> str:
     if path.startswith("/"):
         path = path[1:]
 
     return f"{base_url}{path}"
 
 
+def _get_url(path: str) -> str:
+    """ Constructs Ordway API URL """
+
+    return _join_url(_get_base_url(), path)
+
+
+class RequestTemplate(NamedTuple):
+    """ The parts of requests to Ordway that only change with the config """
+
+    base_url: str
+    headers: Mapping[str, str]
+
+    def get_url(self, path: str) -> str:
+        return _join_url(self.base_url, path)
+
+
+_request_template: Optional[Tuple[Tuple[Any, ...], RequestTemplate]] = None
+
+
+def get_request_template() -> RequestTemplate:
+    """Gets the RequestTemplate shared by all RequestHandlers, only
+    constructing its URL and headers again once the config they come from
+    changes
+    """
+
+    global _request_template  # pylint: disable=global-statement
+
+    key = (
+        TAP_CONFIG.api_url,
+        TAP_CONFIG.staging,
+        TAP_CONFIG.api_version,
+        TAP_CONFIG.http_compression,
+        tuple(TAP_CONFIG.api_credentials.items()),
+    )
+    cached = _request_template
+
+    if cached is None or cached[0] != key:
+        cached = (
+            key,
+            RequestTemplate(_get_base_url(), MappingProxyType(_get_headers())),
+        )
+        _request_template = cached
+
+    return cached[1]
+
+
 class RequestHandler:
     """ Handles requests to Ordway """
 
@@ -85,28 +189,200 @@ class RequestHandler:
         endpoint_template: str,
         page_size: int = 50,
         sort: Optional[str] = None,
+        *,
+        rate_limiter: Optional[TokenBucket] = None,
+        rate_controller: Optional[AdaptiveRateController] = None,
+        stop_on_short_pages: bool = True,
+        session: Optional[Session] = None,
     ):
         self.endpoint_template = endpoint_template
         self.page_size = page_size
         self.sort = sort
+        self._rate_limiter = rate_limiter
+        self._rate_controller = rate_controller
+        # Whether a page with fewer results than requested - and than
+        # `largest_page` - is the last one, saving the request for the empty
+        # page after it. Endpoints returning short pages mid-way opt out.
+        self.stop_on_short_pages = stop_on_short_pages
+        # The most results a page has had, across all calls - which is the
+        # page size Ordway capped requests to, if it did
+        self.largest_page = 0
+
+        # Pages handed to consumers of `fetch`, across all calls
+        self.pages_consumed = 0
+        self._session = session
+        self._page_size_controller: Optional[PageSizeController] = None
+        self._prepared_request: Optional[
+            Tuple[RequestTemplate, Session, PreparedRequest, Dict[str, Any]]
+        ] = None
+        # Where the stages of requests are timed, with `profile_stages`
+        self._stage_profile: Optional[StageProfile] = None
+
+    @property
+    def session(self) -> Session:
+        """The Session requests are made with - defaults to the one shared by
+        all RequestHandlers
+        """
+
+        if self._session is not None:
+            return self._session
+
+        return get_session()
+
+    @property
+    def rate_limiter(self) -> Optional[TokenBucket]:
+        """The rate limiter requests wait on - defaults to the one shared by
+        all RequestHandlers
+        """
+
+        if self._rate_limiter is not None:
+            return self._rate_limiter
+
+        return get_rate_limiter()
+
+    @property
+    def rate_controller(self) -> Optional[AdaptiveRateController]:
+        """The controller adapting `rate_limiter` to throttled responses, if
+        any. Handlers with their own rate limiter only use their own controller.
+        """
+
+        if self._rate_limiter is not None:
+            return self._rate_controller
+
+        return get_rate_controller()
+
+    def clone(self) -> "RequestHandler":
+        """Creates a RequestHandler making the same requests, through the same
+        rate limiter and session, but counting its own pages and tuning its
+        own page size - for fetches running alongside this one's
+        """
+
+        return type(self)(
+            self.endpoint_template,
+            self.page_size,
+            self.sort,
+            rate_limiter=self._rate_limiter,
+            rate_controller=self._rate_controller,
+            stop_on_short_pages=self.stop_on_short_pages,
+            session=self._session,
+        )
 
-        self._exhausted = False
-        self._session = Session()
+    @property
+    def page_size_controller(self) -> Optional[PageSizeController]:
+        """The controller tuning the page size towards `target_page_seconds`,
+        if `adaptive_page_size` is enabled
+        """
+
+        if not TAP_CONFIG.adaptive_page_size:
+            return None
+
+        if self._page_size_controller is None:
+            self._page_size_controller = PageSizeController(
+                self.page_size,
+                TAP_CONFIG.target_page_seconds,
+                min_size=TAP_CONFIG.min_page_size,
+                max_size=max(TAP_CONFIG.max_page_size, self.page_size),
+                endpoint=self.endpoint_template,
+            )
 
-    @ratelimit
-    @backoff_on_exception(expo, RequestException, max_tries=3)
-    def _get(
-        self, path: str, params: Dict[str, str]
-    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
-        """ Perform a GET request with Ordway-related headers """
-
-        response = self._session.get(
-            _get_url(path),
-            headers=_get_headers(),
-            params=params,
-            timeout=DEFAULT_TIMEOUT_SECS,
+        return self._page_size_controller
+
+    def _get_prepared_request(
+        self, template: RequestTemplate, session: Session
+    ) -> Tuple[PreparedRequest, Dict[str, Any]]:
+        """Gets a GET request prepared with `template`'s headers, along with
+        the environment's settings (e.g. proxies) to send it with
+        """
+
+        cached = self._prepared_request
+
+        if cached is None or cached[0] is not template or cached[1] is not session:
+            prepared = session.prepare_request(
+                Request("GET", template.base_url, headers=dict(template.headers))
+            )
+            settings = session.merge_environment_settings(
+                template.base_url, {}, None, None, None
+            )
+            cached = (template, session, prepared, settings)
+            self._prepared_request = cached
+
+        return cached[2], cached[3]
+
+    def _send(self, path: str, params: Mapping[str, Any], stream: bool) -> Response:
+        template = get_request_template()
+        session = self.session
+
+        if not TAP_CONFIG.prepared_requests:
+            return session.get(
+                template.get_url(path),
+                headers=template.headers,
+                params=params,
+                timeout=DEFAULT_TIMEOUT_SECS,
+                stream=stream,
+            )
+
+        prepared, settings = self._get_prepared_request(template, session)
+        prepared = prepared.copy()
+        prepared.prepare_url(template.get_url(path), params)
+
+        return session.send(
+            prepared, timeout=DEFAULT_TIMEOUT_SECS, **{**settings, "stream": stream}
         )
 
+    @backoff_on_exception(expo, RequestException, max_tries=3)
+    def _request(
+        self, path: str, params: Mapping[str, Any], stream: bool = False
+    ) -> Response:
+        """Perform a GET request with Ordway-related headers, raising for
+        unsuccessful responses once retried
+        """
+
+        return self._request_once(path, params, stream)
+
+    @backoff_on_exception(
+        expo, RequestException, max_tries=3, giveup=_is_read_timeout
+    )
+    def _request_resizable(self, path: str, params: Mapping[str, Any]) -> Response:
+        """Like `_request`, but leaves timeouts to the caller - which retries
+        them with a smaller page size
+        """
+
+        return self._request_once(path, params, False)
+
+    def _request_once(
+        self, path: str, params: Mapping[str, Any], stream: bool
+    ) -> Response:
+        rate_limiter = self.rate_limiter
+        rate_controller = self.rate_controller
+        throttled_retries = 0
+
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+
+            response = self._send(path, params, stream)
+
+            if (
+                response.status_code != 429
+                or rate_controller is None
+                or throttled_retries >= MAX_THROTTLED_RETRIES
+            ):
+                break
+
+            throttled_retries += 1
+            retry_after = get_retry_after(response.headers)
+
+            LOGGER.warning(
+                'Ordway throttled request "%s", retrying after %s seconds',
+                response.request.url,
+                retry_after,
+            )
+
+            rate_controller.throttled(retry_after, endpoint=path)
+
+        if rate_controller is not None and response.status_code == 200:
+            rate_controller.succeeded(response.headers)
+
         if response.status_code != 200:
             LOGGER.critical(
                 'Ordway responded with status code "%d" and a body of "%s" for request "%s"',
@@ -117,7 +393,31 @@ class RequestHandler:
 
             response.raise_for_status()
 
-        return response.json()
+        return response
+
+    def _get(
+        self, path: str, params: Mapping[str, Any], retry_timeouts: bool = True
+    ) -> Page:
+        """Perform a GET request, decoding the whole response at once. Without
+        `retry_timeouts`, a timed out request raises ReadTimeout right away.
+        """
+
+        decode = get_decoder(TAP_CONFIG.json_decoder)
+        profile = self._stage_profile
+
+        with time_stage(profile, "http"):
+            if retry_timeouts:
+                response = self._request(path, params)
+            else:
+                response = self._request_resizable(path, params)
+            content = response.content
+
+        log_response_size(path, response.headers, len(content), _get_wire_size(response))
+
+        with time_stage(profile, "decode"):
+            results = decode(content)
+
+        return to_page(results, response.headers, params)
 
     def resolve_endpoint(self, context: "DataContext") -> str:
         if context.parent_record is None:
@@ -141,34 +441,300 @@ class RequestHandler:
                 context.filter_datetime
             )
 
+            if context.until_datetime is not None:
+                params[f"{context.stream.replication_key}<"] = strftime(
+                    context.until_datetime
+                )
+
             return params
 
         return params
 
-    def fetch(self, context: "DataContext") -> Generator[Dict[str, Any], None, None]:
-        """ Fetches all pages constrained by `resolve_params` """
-
-        self._exhausted = False
+    def get_default_params(
+        self, context: "DataContext", cursor: Optional[PageCursor] = None
+    ) -> "_DEFAULT_QUERY_PARAMS":
+        """Gets the query params of the first page to fetch - the one
+        `cursor` points to, if any
+        """
 
         default_params: "_DEFAULT_QUERY_PARAMS" = {
             "sort": self.sort,
-            "size": self.page_size,
-            "page": 1,
+            "size": self.page_size if cursor is None else cursor.size,
+            "page": 1 if cursor is None else cursor.page,
         }
         default_params.update(self.resolve_params(context))  # type: ignore
 
-        endpoint = self.resolve_endpoint(context)
+        return default_params
 
-        while not self._exhausted:
+    def _get_sized_page(
+        self,
+        endpoint: str,
+        params: "_DEFAULT_QUERY_PARAMS",
+        page_size_controller: Optional[PageSizeController],
+    ) -> Optional[Page]:
+        """Requests a page, reporting it to `page_size_controller` if any.
+        Returns None when the page timed out and should be retried with the
+        controller's smaller page size.
+        """
+
+        started_at = monotonic()
+
+        try:
             with http_request_timer(endpoint=endpoint):
-                results = self._get(endpoint, default_params)
+                if page_size_controller is None:
+                    results = self._get(endpoint, params)
+                else:
+                    results = self._get(endpoint, params, retry_timeouts=False)
+        except ReadTimeout:
+            if page_size_controller is None or not page_size_controller.timed_out(
+                params["size"]
+            ):
+                raise
+
+            return None
+
+        if page_size_controller is not None:
+            page_size_controller.record_page(
+                params["size"], len(results), monotonic() - started_at
+            )
 
-            if isinstance(results, dict):
-                results = [results]
+        return results
 
-            yield from results
+    def _iter_pages(self, endpoint: str, params: "_DEFAULT_QUERY_PARAMS") -> _PAGES:
+        """Requests pages, starting at params["page"], until the last one -
+        along with the cursor each page starts at
 
-            if len(results) == 0:
-                self._exhausted = True
-            else:
-                default_params["page"] += 1
+        When the page size shrinks to one that the next record's offset
+        isn't a multiple of, the page of that size holding the record is
+        requested, and the records before it - already yielded - are skipped.
+        """
+
+        params = params.copy()
+        page_size_controller = self.page_size_controller
+        offset = (params["page"] - 1) * params["size"]
+
+        while True:
+            if page_size_controller is not None:
+                params["size"] = page_size_controller.page_size_at(
+                    offset, params["size"]
+                )
+                params["page"] = offset // params["size"] + 1
+
+            results = self._get_sized_page(endpoint, params, page_size_controller)
+
+            if results is None:
+                continue
+
+            skipped = offset - (params["page"] - 1) * params["size"]
+
+            yield PageCursor(params["page"], params["size"]), (
+                results[skipped:] if skipped else results
+            )
+
+            if self.is_last_page(
+                len(results), getattr(results, "has_next", None), params["size"]
+            ):
+                return
+
+            offset = params["page"] * params["size"]
+            params["page"] += 1
+
+    def is_last_page(self, count: int, has_next: Optional[bool], size: int) -> bool:
+        """Whether no page should be requested after one of `count` results,
+        requested with `size`
+        """
+
+        largest_page = self.largest_page
+        self.largest_page = max(largest_page, count)
+
+        return is_last_page(
+            count, has_next, size, largest_page if self.stop_on_short_pages else None
+        )
+
+    def get_keyset_fields(self, context: "DataContext") -> Optional[Tuple[str, str]]:
+        """Gets the (replication key, tie-breaker) fields to seek by when
+        `keyset_pagination` is enabled and the stream is sorted by them
+        """
+
+        if not TAP_CONFIG.keyset_pagination or not context.stream.is_valid_incremental:
+            return None
+
+        sort = (self.sort or "").split(",")
+
+        if len(sort) != 2 or sort[0] != context.stream.replication_key:
+            return None
+
+        return sort[0], sort[1]
+
+    def _iter_keyset_pages(
+        self,
+        endpoint: str,
+        params: "_DEFAULT_QUERY_PARAMS",
+        keyset_fields: Tuple[str, str],
+    ) -> _PAGES:
+        """Requests pages like `_iter_pages`, but seeks past the last record
+        rather than paging through a single, ever deeper, offset
+
+        Ordway's `{replication_key}>` filter is exclusive, and so would skip
+        the records sharing the last record's replication key that didn't fit
+        its page. Each page instead moves a `{replication_key}>=` filter up to
+        that value, and skips the records at it which were already yielded
+        (by their tie-breaker, e.g. `id`). Only when more than a page of
+        records share a value does the page number grow, within that value.
+        """
+
+        replication_key, tie_breaker = keyset_fields
+        params = params.copy()
+        page_size_controller = self.page_size_controller
+        bound: Optional[datetime] = None
+        seen_at_bound: Set[Any] = set()
+
+        def get_value(record: Dict[str, Any]) -> Optional[datetime]:
+            value = record.get(replication_key)
+
+            return parse_timestamp(value) if value is not None else None
+
+        while True:
+            if page_size_controller is not None:
+                params["size"] = page_size_controller.page_size
+
+            # Records yielded at the bound come first, sorted by tie-breaker
+            params["page"] = len(seen_at_bound) // params["size"] + 1
+
+            results = self._get_sized_page(endpoint, params, page_size_controller)
+
+            if results is None:
+                continue
+
+            has_next = getattr(results, "has_next", None)
+            new_results = [
+                result
+                for result in results
+                if get_value(result) != bound
+                or result.get(tie_breaker) not in seen_at_bound
+            ]
+
+            if results:
+                last_value = get_value(results[-1])
+
+                if last_value != bound and last_value is not None:
+                    bound = last_value
+                    seen_at_bound = set()
+                    params.pop(f"{replication_key}>", None)  # type: ignore
+                    params[f"{replication_key}>="] = strftime(bound)  # type: ignore
+
+                seen_at_bound.update(
+                    result.get(tie_breaker)
+                    for result in results
+                    if get_value(result) == bound
+                )
+
+            # Page numbers are relative to the bound, so they can't be resumed from
+            yield None, new_results
+
+            if not new_results or self.is_last_page(
+                len(results), has_next, params["size"]
+            ):
+                return
+
+    def _iter_streamed_records(
+        self,
+        endpoint: str,
+        params: "_DEFAULT_QUERY_PARAMS",
+        yield_cursors: bool = False,
+    ) -> Generator[Union[Dict[str, Any], PageCursor], None, None]:
+        """Like `_iter_pages`, but yields each page's records as they're
+        parsed off the response, rather than once the whole page is decoded
+        """
+
+        params = params.copy()
+
+        while True:
+            # Only times the request until its headers are received, as the
+            # body is read while the records are being consumed
+            with http_request_timer(endpoint=endpoint), time_stage(
+                self._stage_profile, "http"
+            ):
+                response = self._request(endpoint, params, stream=True)
+
+            self.pages_consumed += 1
+            count = 0
+            decoded_size = 0
+
+            def iter_chunks() -> Generator[bytes, None, None]:
+                nonlocal decoded_size
+
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    decoded_size += len(chunk)
+
+                    yield chunk
+
+            if yield_cursors:
+                yield PageCursor(params["page"], params["size"])
+
+            try:
+                for result in iter_json_array(iter_chunks()):
+                    count += 1
+
+                    yield result
+            finally:
+                response.close()
+
+            log_response_size(
+                endpoint, response.headers, decoded_size, _get_wire_size(response)
+            )
+
+            if self.is_last_page(
+                count,
+                get_has_next_page(response.headers, params["page"], params["size"]),
+                params["size"],
+            ):
+                return
+
+            params["page"] += 1
+
+    def fetch(
+        self,
+        context: "DataContext",
+        cursor: Optional[PageCursor] = None,
+        yield_cursors: bool = False,
+    ) -> Generator[Dict[str, Any], None, None]:
+        """Fetches all pages constrained by `resolve_params` - starting at
+        `cursor`, if any. With `yield_cursors`, each page's records are
+        preceded by the PageCursor it starts at.
+
+        When `prefetch_pages` is configured, up to that many pages are
+        requested on a background thread while the current page is consumed.
+        When `stream_responses` is, records are instead parsed as each page
+        is received, one page at a time. Otherwise, `keyset_pagination` seeks
+        through sorted INCREMENTAL streams rather than paging by number.
+        """
+
+        self._stage_profile = get_stage_profile(context.tap_stream_id)
+        default_params = self.get_default_params(context, cursor)
+        endpoint = self.resolve_endpoint(context)
+
+        if TAP_CONFIG.stream_responses:
+            yield from self._iter_streamed_records(  # type: ignore
+                endpoint, default_params, yield_cursors
+            )
+
+            return
+
+        keyset_fields = self.get_keyset_fields(context)
+
+        if keyset_fields is not None:
+            pages = self._iter_keyset_pages(endpoint, default_params, keyset_fields)
+        else:
+            pages = self._iter_pages(endpoint, default_params)
+
+        if TAP_CONFIG.prefetch_pages:
+            pages = prefetch(pages, TAP_CONFIG.prefetch_pages)
+
+        for page_cursor, results in pages:
+            self.pages_consumed += 1
+
+            if yield_cursors and page_cursor is not None:
+                yield page_cursor  # type: ignore
+
+            yield from results
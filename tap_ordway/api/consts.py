@@ -7,3 +7,13 @@ BASE_STAGING_URL = f"https://{BASE_STAGING_URL}/api"
 DEFAULT_API_VERSION = "v1"
 
 DEFAULT_TIMEOUT_SECS = 30
+
+# Starting rate for `adaptive_rate_limit` when `rate_limit_rps` isn't set
+DEFAULT_ADAPTIVE_RATE_LIMIT_RPS = 5
+
+# How many throttled (429) responses in a row a request is retried for
+# when `adaptive_rate_limit` is enabled
+MAX_THROTTLED_RETRIES = 10
+
+# How many bytes of a response are read at a time with `stream_responses`
+STREAM_CHUNK_SIZE = 65536
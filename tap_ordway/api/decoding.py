@@ -0,0 +1,153 @@
+from typing import Any, Callable, Generator, Iterable, List
+import codecs
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_DECODER = Callable[[bytes], Any]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# JSONArrayParser states
+_BEFORE_ARRAY = 0
+_BEFORE_FIRST_ITEM = 1
+_BEFORE_ITEM = 2
+_AFTER_ITEM = 3
+_DONE = 4
+
+
+def decode_json(data: bytes) -> Any:
+    """ Decodes a response body with the standard library's json """
+
+    return json.loads(data)
+
+
+def decode_orjson(data: bytes) -> Any:
+    """Decodes a response body with orjson, falling back to `decode_json`
+    for anything orjson rejects (e.g. integers beyond 64 bits)
+    """
+
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return decode_json(data)
+
+
+def get_decoder(name: str = "auto") -> _DECODER:
+    """Gets the response decoder named by the `json_decoder` config property
+
+    "auto" picks orjson when it's installed, and json otherwise.
+    """
+
+    if name == "orjson" or (name == "auto" and orjson is not None):
+        if orjson is None:
+            raise ValueError('`json_decoder` "orjson" requires orjson')
+
+        return decode_orjson
+
+    if name in ("auto", "json"):
+        return decode_json
+
+    raise ValueError(f'Unknown `json_decoder` "{name}"')
+
+
+class JSONArrayParser:
+    """Incrementally parses the elements of a JSON array fed in chunks
+
+    Each element is returned as soon as it's been fully received, so only the
+    element being received has to be held in memory - rather than the whole
+    array. A top-level object is returned as a single element, once complete.
+    """
+
+    def __init__(self):
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._state = _BEFORE_ARRAY
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """ Parses `chunk`, returning the elements completed by it """
+
+        self._buffer += self._text_decoder.decode(chunk)
+
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """Parses whatever is left, raising a ValueError if the array is
+        incomplete
+        """
+
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        items = self._parse(final=True)
+
+        if self._state != _DONE:
+            raise ValueError("Incomplete JSON array")
+
+        return items
+
+    def _parse(self, final: bool) -> List[Any]:
+        items = []
+        buffer = self._buffer
+        position = 0
+
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()  # type: ignore
+
+            if position == len(buffer):
+                break
+
+            char = buffer[position]
+
+            if self._state == _DONE:
+                raise ValueError(f"Extra data after JSON array at {position}")
+
+            if self._state == _BEFORE_ARRAY and char == "[":
+                self._state = _BEFORE_FIRST_ITEM
+                position += 1
+            elif self._state == _BEFORE_FIRST_ITEM and char == "]":
+                self._state = _DONE
+                position += 1
+            elif self._state == _AFTER_ITEM:
+                if char not in ",]":
+                    raise ValueError(f"Expected ',' or ']' at {position}")
+
+                self._state = _BEFORE_ITEM if char == "," else _DONE
+                position += 1
+            elif self._state == _BEFORE_ARRAY and not final:
+                # Not an array, so it can only be parsed as a whole
+                break
+            else:
+                try:
+                    item, end = self._json_decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+
+                    break
+
+                # A number may carry on in the next chunk
+                if end == len(buffer) and not final:
+                    break
+
+                items.append(item)
+                position = end
+                self._state = _DONE if self._state == _BEFORE_ARRAY else _AFTER_ITEM
+
+        self._buffer = buffer[position:]
+
+        return items
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Generator[Any, None, None]:
+    """ Yields the elements of a JSON array received in `chunks` """
+
+    parser = JSONArrayParser()
+
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+    yield from parser.close()
@@ -0,0 +1,64 @@
+from typing import Mapping, Optional
+from singer import get_logger
+from singer.metrics import Point, Tag
+from singer.metrics import log as log_metric
+
+LOGGER = get_logger()
+
+# Bytes of response bodies as received, i.e. before decompression
+RESPONSE_BYTES = "http_response_bytes"
+# Bytes of response bodies once decompressed
+RESPONSE_DECODED_BYTES = "http_response_decoded_bytes"
+
+
+def get_content_encoding(headers: Mapping[str, str]) -> str:
+    """ Gets a response's Content-Encoding, "identity" when uncompressed """
+
+    return headers.get("Content-Encoding") or "identity"
+
+
+def get_encoded_size(
+    headers: Mapping[str, str], decoded_size: int, wire_size: Optional[int] = None
+) -> Optional[int]:
+    """Gets how many bytes a response body took to transfer - None when that
+    can't be told
+
+    `wire_size` is what the HTTP client counted off the connection, if it
+    counts them. Otherwise the Content-Length header is used, which chunked
+    responses don't have.
+    """
+
+    if isinstance(wire_size, int):
+        return wire_size
+
+    content_length = headers.get("Content-Length")
+
+    if content_length is not None:
+        try:
+            return int(content_length)
+        except ValueError:
+            pass
+
+    if get_content_encoding(headers) == "identity":
+        return decoded_size
+
+    return None
+
+
+def log_response_size(
+    endpoint: str,
+    headers: Mapping[str, str],
+    decoded_size: int,
+    wire_size: Optional[int] = None,
+) -> None:
+    """Logs a response's body size before and after decompression, as the
+    `http_response_bytes` and `http_response_decoded_bytes` singer metrics
+    """
+
+    tags = {Tag.endpoint: endpoint, "content_encoding": get_content_encoding(headers)}
+    encoded_size = get_encoded_size(headers, decoded_size, wire_size)
+
+    if encoded_size is not None:
+        log_metric(LOGGER, Point("counter", RESPONSE_BYTES, encoded_size, tags))
+
+    log_metric(LOGGER, Point("counter", RESPONSE_DECODED_BYTES, decoded_size, tags))
@@ -0,0 +1,104 @@
+from threading import Lock
+from singer import get_logger
+from singer.metrics import Point, Tag
+from singer.metrics import log as log_metric
+
+LOGGER = get_logger()
+
+
+class PageSizeController:
+    """Tunes an endpoint's page size towards `target_seconds` per page
+
+    Full pages fetched in under half the target double the size, and pages
+    taking longer than the target halve it (rounding down), within
+    `min_size` and `max_size`. Timeouts halve it too, and lower `max_size`
+    below the size that timed out.
+
+    Ordway pages by number, i.e. page N of size S starts at record
+    (N - 1) * S. So a fetch only grows to a new size at an offset that is a
+    multiple of it, where the new page number addresses exactly the records
+    that follow. Smaller sizes apply right away, from the page holding the
+    offset.
+
+    The current size is logged as the `page_size` singer metric.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        target_seconds: float,
+        *,
+        min_size: int = 1,
+        max_size: int = 500,
+        endpoint: str = "",
+    ):
+        self.page_size = initial_size
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.endpoint = endpoint
+
+        self._lock = Lock()
+
+    def _set_page_size(self, size: int, reason: str) -> None:
+        LOGGER.info(
+            'Changing page size of "%s" from %d to %d (%s)',
+            self.endpoint,
+            self.page_size,
+            size,
+            reason,
+        )
+
+        self.page_size = size
+        log_metric(
+            LOGGER, Point("gauge", "page_size", size, {Tag.endpoint: self.endpoint})
+        )
+
+    def _shrunk(self, size: int) -> int:
+        return max(self.min_size, size // 2)
+
+    def page_size_at(self, offset: int, current_size: int) -> int:
+        """ Gets the page size to request the records from `offset` on with """
+
+        page_size = self.page_size
+
+        if page_size < current_size or offset % page_size == 0:
+            return page_size
+
+        return current_size
+
+    def record_page(self, size: int, count: int, seconds: float) -> None:
+        """ Handles a page of `count` records requested with `size` """
+
+        with self._lock:
+            # Pages requested with a stale size say little about the current one
+            if size != self.page_size:
+                return
+
+            if seconds > self.target_seconds and size > self.min_size:
+                self._set_page_size(self._shrunk(size), f"page took {seconds:.2f}s")
+            elif (
+                count >= size
+                and seconds < self.target_seconds / 2
+                and size * 2 <= self.max_size
+            ):
+                self._set_page_size(size * 2, f"page took {seconds:.2f}s")
+
+    def timed_out(self, size: int) -> bool:
+        """Handles a page requested with `size` timing out, returning whether
+        it's worth retrying with a smaller size
+        """
+
+        with self._lock:
+            if self.page_size < size:
+                # Another fetch shrank it already
+                return True
+
+            if size <= self.min_size:
+                return False
+
+            # Never growing back into timeouts
+            self.max_size = self._shrunk(size)
+            self._set_page_size(self.max_size, "request timed out")
+
+            return True
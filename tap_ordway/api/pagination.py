@@ -0,0 +1,99 @@
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+from requests.utils import parse_header_links
+
+
+class Page(List[Dict[str, Any]]):
+    """A page of results, along with whether its response said there's a
+    page after it (None when it didn't say)
+    """
+
+    has_next: Optional[bool] = None
+
+
+def _get_int_header(headers: Mapping[str, str], *names: str) -> Optional[int]:
+    for name in names:
+        value = headers.get(name)
+
+        if value is not None:
+            try:
+                return int(value)
+            except ValueError:
+                pass
+
+    return None
+
+
+def get_has_next_page(
+    headers: Mapping[str, str], page: Optional[int], size: Optional[int]
+) -> Optional[bool]:
+    """Reads whether there's a page after `page` from a response's
+    pagination headers, if it has any - i.e. a Link header, or the total
+    amount of records or pages
+    """
+
+    link = headers.get("Link")
+
+    if link:
+        return any(
+            "next" in parsed.get("rel", "").split() for parsed in parse_header_links(link)
+        )
+
+    if page is None or size is None:
+        return None
+
+    total_pages = _get_int_header(headers, "X-Total-Pages", "Total-Pages")
+
+    if total_pages is not None:
+        return page < total_pages
+
+    total = _get_int_header(headers, "X-Total-Count", "X-Total", "Total")
+
+    if total is not None:
+        return page * size < total
+
+    return None
+
+
+def is_last_page(
+    count: int,
+    has_next: Optional[bool],
+    size: int,
+    largest_page: Optional[int] = None,
+) -> bool:
+    """Whether no page should be requested after one of `count` results
+
+    That's the case when it's empty, when its response's pagination
+    headers say so (`has_next`) or when it's short - i.e. has fewer results
+    than both `size` and `largest_page`, the most results a page of the
+    endpoint had so far. Ordway may return fewer results than requested
+    when it caps the page size, but then only its last page has fewer than
+    that cap. Short pages aren't trusted without a `largest_page`.
+    """
+
+    if count == 0:
+        return True
+
+    if has_next is not None:
+        return not has_next
+
+    return largest_page is not None and count < min(size, largest_page)
+
+
+def to_page(
+    results: Any, headers: Mapping[str, str], params: Mapping[str, Any]
+) -> Page:
+    """ Wraps decoded results in a Page, reading its pagination headers """
+
+    page = Page([results] if isinstance(results, dict) else results)
+    page.has_next = get_has_next_page(headers, params.get("page"), params.get("size"))
+
+    return page
+
+
+class PageCursor(NamedTuple):
+    """The page a fetch may be resumed from, once every record before it
+    has been handled
+    """
+
+    page: int
+    size: int
@@ -0,0 +1,388 @@
+from typing import Iterator, Mapping, Optional, Tuple, Union
+import asyncio
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+import os
+from threading import Lock
+from time import monotonic, sleep, time
+from singer import get_logger
+from singer.metrics import DEFAULT_LOG_INTERVAL, Point, Tag
+from singer.metrics import log as log_metric
+import tap_ordway.configs as TAP_CONFIG
+from .consts import DEFAULT_ADAPTIVE_RATE_LIMIT_RPS
+
+LOGGER = get_logger()
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+class TokenBucket:
+    """A token bucket rate limiter safe to share between threads and
+    asyncio tasks
+
+    Tokens are replenished at `rate` per second, up to `capacity` - which
+    determines how large a burst of requests may be. Acquiring reserves
+    tokens immediately, possibly going into debt, and then waits until the
+    debt is paid off. This keeps waiters in first come, first served order.
+    """
+
+    def __init__(
+        self, rate: Union[int, float], capacity: Union[int, float, None] = None
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be GREATER THAN 0")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+
+        if self.capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self._lock = Lock()
+        self._tokens = self.capacity
+        self._updated_at = self._clock()
+
+    def _clock(self) -> float:
+        return monotonic()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    def _load(self) -> Tuple[float, float]:
+        return self._tokens, self._updated_at
+
+    def _store(self, tokens: float, updated_at: float) -> None:
+        self._tokens = tokens
+        self._updated_at = updated_at
+
+    def set_rate(self, rate: Union[int, float]) -> None:
+        """ Changes the replenishment rate from here on out """
+
+        if rate <= 0:
+            raise ValueError("rate must be GREATER THAN 0")
+
+        with self._locked():
+            # Settle the tokens accrued at the previous rate first
+            self._store(*self._refill())
+            self.rate = float(rate)
+
+    def pause(self, seconds: float) -> None:
+        """ Makes sure nothing is acquired for at least `seconds` """
+
+        with self._locked():
+            available, now = self._refill()
+            self._store(min(available, -seconds * self.rate), now)
+
+    def _refill(self) -> Tuple[float, float]:
+        now = self._clock()
+        tokens, updated_at = self._load()
+        elapsed = max(now - updated_at, 0)
+
+        return min(self.capacity, tokens + elapsed * self.rate), now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Reserves `tokens` and returns how many seconds to wait before
+        they may be used
+        """
+
+        with self._locked():
+            available, now = self._refill()
+            available -= tokens
+            self._store(available, now)
+
+        return max(-available / self.rate, 0)
+
+    def acquire(self, tokens: float = 1) -> None:
+        """ Blocks until `tokens` are available """
+
+        wait = self.reserve(tokens)
+
+        if wait > 0:
+            sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1) -> None:
+        """ Waits, without blocking the event loop, until `tokens` are available """
+
+        wait = self.reserve(tokens)
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """A TokenBucket whose state is kept in a file, shared by every process
+    on the host using the same `path`
+
+    The file is locked with `fcntl.flock` while being read and updated, so
+    this is only available on POSIX systems.
+    """
+
+    def __init__(
+        self,
+        rate: Union[int, float],
+        capacity: Union[int, float, None] = None,
+        path: str = "",
+    ):
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError("FileTokenBucket requires fcntl (POSIX only)")
+
+        if not path:
+            raise ValueError("path is required")
+
+        self.path = path
+        self._fd: Optional[int] = None
+
+        super().__init__(rate, capacity)
+
+    def _clock(self) -> float:
+        # Processes don't share a monotonic clock
+        return time()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _load(self) -> Tuple[float, float]:
+        os.lseek(self._fd, 0, os.SEEK_SET)  # type: ignore
+        content = os.read(self._fd, 64).decode()  # type: ignore
+
+        try:
+            tokens, updated_at = content.split()
+            return float(tokens), float(updated_at)
+        except ValueError:
+            # New or corrupted file - start with a full bucket
+            return self.capacity, self._clock()
+
+    def _store(self, tokens: float, updated_at: float) -> None:
+        content = f"{tokens!r} {updated_at!r}".encode()
+        os.lseek(self._fd, 0, os.SEEK_SET)  # type: ignore
+        os.ftruncate(self._fd, 0)  # type: ignore
+        os.write(self._fd, content)  # type: ignore
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def get_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Gets how many seconds the API asked us to wait from a response's
+    `Retry-After` header, or its rate limit headers once none are remaining
+    """
+
+    retry_after = headers.get("Retry-After")
+
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+
+        try:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time(), 0)
+        except (TypeError, ValueError):
+            return None
+
+    for prefix in ("RateLimit", "X-RateLimit"):
+        if headers.get(f"{prefix}-Remaining") != "0":
+            continue
+
+        try:
+            reset = float(headers[f"{prefix}-Reset"])
+        except (KeyError, ValueError):
+            continue
+
+        # Some APIs send an epoch timestamp rather than delta seconds
+        if reset > 1e9:
+            reset -= time()
+
+        return max(reset, 0)
+
+    return None
+
+
+class AdaptiveRateController:
+    """Adjusts a TokenBucket's rate using AIMD (additive increase,
+    multiplicative decrease)
+
+    Each throttled response multiplies the rate by `decrease_factor` -
+    at most once per `decrease_cooldown` seconds, since concurrent requests
+    tend to be throttled together - and pauses the bucket for as long as the
+    API asked. Each successful response adds `increase_rps / rate`, growing
+    the rate by roughly `increase_rps` per second of requests.
+
+    The current rate and throttling events are logged as singer metrics.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        *,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_rps: float = 1.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.bucket = bucket
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.decrease_factor = decrease_factor
+        self.increase_rps = increase_rps
+        self.decrease_cooldown = decrease_cooldown
+
+        self.throttled_count = 0
+
+        self._lock = Lock()
+        self._decreased_at: Optional[float] = None
+        self._logged_rate_at = monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def _set_rate(self, rate: float) -> None:
+        if self.max_rate is not None:
+            rate = min(rate, self.max_rate)
+
+        self.bucket.set_rate(max(rate, self.min_rate))
+
+    def _log_rate(self) -> None:
+        self._logged_rate_at = monotonic()
+        log_metric(LOGGER, Point("gauge", "rate_limit_rps", self.rate, {}))
+
+    def throttled(
+        self, retry_after: Optional[float] = None, endpoint: Optional[str] = None
+    ) -> None:
+        """ Handles a throttled (429) response """
+
+        with self._lock:
+            self.throttled_count += 1
+            now = monotonic()
+
+            if (
+                self._decreased_at is None
+                or now - self._decreased_at >= self.decrease_cooldown
+            ):
+                self._decreased_at = now
+                self._set_rate(self.rate * self.decrease_factor)
+                self._log_rate()
+
+        if retry_after is not None:
+            self.bucket.pause(retry_after)
+
+        log_metric(
+            LOGGER,
+            Point(
+                "counter",
+                "http_throttled",
+                1,
+                {Tag.endpoint: endpoint, "retry_after": retry_after},
+            ),
+        )
+
+    def succeeded(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Handles a successful response, pausing the bucket if its headers
+        say no requests are remaining
+        """
+
+        with self._lock:
+            self._set_rate(self.rate + self.increase_rps / self.rate)
+
+            if monotonic() - self._logged_rate_at >= DEFAULT_LOG_INTERVAL:
+                self._log_rate()
+
+        if headers is not None:
+            retry_after = get_retry_after(headers)
+
+            if retry_after is not None:
+                self.bucket.pause(retry_after)
+
+
+_rate_limiter: Optional[TokenBucket] = None
+_rate_controller: Optional[AdaptiveRateController] = None
+_rate_limiter_config: Optional[tuple] = None
+_rate_limiter_lock = Lock()
+
+
+def _configure_rate_limiter() -> None:
+    global _rate_limiter, _rate_controller, _rate_limiter_config  # pylint: disable=global-statement
+
+    config = (
+        TAP_CONFIG.rate_limit_rps,
+        TAP_CONFIG.rate_limit_burst,
+        TAP_CONFIG.rate_limit_file,
+        TAP_CONFIG.adaptive_rate_limit,
+        TAP_CONFIG.rate_limit_min_rps,
+        TAP_CONFIG.rate_limit_max_rps,
+    )
+
+    if config == _rate_limiter_config:
+        return
+
+    rate, capacity, path, adaptive, min_rate, max_rate = config
+
+    if rate is None and adaptive:
+        rate = DEFAULT_ADAPTIVE_RATE_LIMIT_RPS
+
+    if rate is None:
+        _rate_limiter = None
+        _rate_controller = None
+        _rate_limiter_config = config
+        return
+
+    if path is not None:
+        _rate_limiter = FileTokenBucket(rate, capacity, path=path)
+    else:
+        _rate_limiter = TokenBucket(rate, capacity)
+
+    if adaptive:
+        if min_rate is None:
+            min_rate = min(rate, 0.5)
+
+        _rate_controller = AdaptiveRateController(
+            _rate_limiter, min_rate=min_rate, max_rate=max_rate
+        )
+    else:
+        _rate_controller = None
+
+    _rate_limiter_config = config
+
+
+def get_rate_limiter() -> Optional[TokenBucket]:
+    """Gets the rate limiter shared by all RequestHandlers, based on the
+    `rate_limit_rps`, `rate_limit_burst` and `rate_limit_file` config
+    properties
+
+    Returns None when rate limiting is disabled.
+    """
+
+    with _rate_limiter_lock:
+        _configure_rate_limiter()
+
+        return _rate_limiter
+
+
+def get_rate_controller() -> Optional[AdaptiveRateController]:
+    """Gets the controller adapting the shared rate limiter, if
+    `adaptive_rate_limit` is enabled
+    """
+
+    with _rate_limiter_lock:
+        _configure_rate_limiter()
+
+        return _rate_controller
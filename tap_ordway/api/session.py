@@ -0,0 +1,124 @@
+from typing import Any, Optional, Tuple
+import socket
+from threading import Lock
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+import tap_ordway.configs as TAP_CONFIG
+
+# Server errors retried by `http_max_retries`. Throttled (429) responses
+# are left to RequestHandler's rate controller, even with a Retry-After.
+_RETRIED_STATUSES = (500, 502, 503, 504)
+
+_session: Optional[Session] = None
+_session_config: Optional[Tuple[Any, ...]] = None
+_session_lock = Lock()
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """ An HTTPAdapter enabling TCP keep-alive on its connections """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+
+        super().init_poolmanager(*args, **kwargs)
+
+
+def get_concurrency() -> int:
+    """Gets the amount of requests the tap may make at once through the
+    shared Session, given its `max_parallel_streams`, `max_backfill_workers`,
+    `prefetch_pages` and `max_substream_workers`
+    """
+
+    backfill_workers = (
+        TAP_CONFIG.max_backfill_workers if TAP_CONFIG.backfill_window_days else 1
+    )
+    # The thread consuming a fetch, plus the one prefetching its pages
+    fetch_threads = 2 if TAP_CONFIG.prefetch_pages else 1
+    substream_workers = (
+        TAP_CONFIG.max_substream_workers if TAP_CONFIG.max_substream_workers > 1 else 0
+    )
+
+    return (
+        TAP_CONFIG.max_parallel_streams
+        * backfill_workers
+        * (fetch_threads + substream_workers)
+    )
+
+
+def create_session(
+    pool_size: int, max_retries: int = 0, tcp_keepalive: bool = True
+) -> Session:
+    """Creates a Session keeping up to `pool_size` connections to the API
+    alive, retrying failed connections and server errors `max_retries` times
+    """
+
+    session = Session()
+    adapter_class = KeepAliveAdapter if tcp_keepalive else HTTPAdapter
+    adapter = adapter_class(
+        # Requests are all made to a single host
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=max_retries,
+            # Read timeouts are left to RequestHandler, which may shrink the
+            # page size - and would otherwise only see a ConnectionError
+            read=False,
+            backoff_factor=0.5,
+            status_forcelist=_RETRIED_STATUSES,
+            # Otherwise, 429s with a Retry-After would be retried too, sleeping
+            # in the pool where the rate controller can't see them
+            respect_retry_after_header=False,
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        ),
+    )
+
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_session() -> Session:
+    """Gets the Session shared by all RequestHandlers, based on the
+    `http_pool_size`, `http_max_retries` and `http_tcp_keepalive` config
+    properties
+
+    Sharing a single connection pool lets connections - and their TLS
+    sessions - be reused across streams, rather than each stream opening its
+    own.
+    """
+
+    global _session, _session_config  # pylint: disable=global-statement
+
+    config = (
+        TAP_CONFIG.http_pool_size or get_concurrency(),
+        TAP_CONFIG.http_max_retries,
+        TAP_CONFIG.http_tcp_keepalive,
+    )
+
+    with _session_lock:
+        if _session is None or config != _session_config:
+            if _session is not None:
+                _session.close()
+
+            _session = create_session(*config)
+            _session_config = config
+
+        return _session
+
+
+def close_session() -> None:
+    """ Closes the shared Session's connections """
+
+    global _session, _session_config  # pylint: disable=global-statement
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+            _session_config = None
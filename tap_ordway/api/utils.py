@@ -1,32 +1,76 @@
-from typing import Callable, Deque
-from collections import deque
-from functools import wraps
-from time import sleep, time
-import tap_ordway.configs as TAP_CONFIG
+from typing import Any, Generator, Iterable, TypeVar
+from queue import Empty, Full, Queue
+from threading import Event, Thread
 
-# Modified from `singer.utils.ratelimit`
-def ratelimit(func) -> Callable:
-    """Decorator for rate limiting requests based on the `rate_limit_rps` property in config"""
-    times: Deque[float] = deque()
+_T = TypeVar("_T")
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        one_second = 1
-        limit = TAP_CONFIG.rate_limit_rps
+# How long a producer blocked on a full queue waits before re-checking
+# whether its consumer has gone away.
+_POLL_SECS = 0.1
 
-        # In effect, user disabled rate limiting
-        if limit is not None:
-            if len(times) >= limit:
-                tim0 = times.pop()
-                tim = time()
 
-                sleep_time = one_second - (tim - tim0)
+def put_until_stopped(queue: "Queue", item: Any, stopped: Event) -> bool:
+    """Puts `item` on a bounded `queue`, waiting for room until `stopped` is
+    set. Returns whether it was put.
+    """
 
-                if sleep_time > 0:
-                    sleep(sleep_time)
+    while not stopped.is_set():
+        try:
+            queue.put(item, timeout=_POLL_SECS)
+            return True
+        except Full:
+            continue
 
-            times.appendleft(time())
+    return False
 
-        return func(*args, **kwargs)
 
-    return wrapper
+class _PrefetchEnd:
+    """ Sentinel marking the end of a prefetched iterable """
+
+
+def prefetch(iterable: Iterable[_T], depth: int) -> Generator[_T, None, None]:
+    """Iterates over `iterable` on a background thread, staying at most
+    `depth` items ahead of the consumer.
+
+    Items are yielded in their original order. Exceptions raised while
+    iterating are re-raised in the consumer, and closing the generator
+    stops the background thread.
+    """
+
+    buffer: "Queue" = Queue(maxsize=depth)
+    stopped = Event()
+
+    def worker() -> None:
+        try:
+            for item in iterable:
+                if not put_until_stopped(buffer, (False, item), stopped):
+                    return
+        except BaseException as err:  # pylint: disable=broad-except
+            put_until_stopped(buffer, (True, err), stopped)
+            return
+
+        put_until_stopped(buffer, (True, _PrefetchEnd), stopped)
+
+    thread = Thread(target=worker, name="tap-ordway-prefetch", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            is_final, item = buffer.get()
+
+            if is_final:
+                if item is _PrefetchEnd:
+                    return
+
+                raise item
+
+            yield item
+    finally:
+        stopped.set()
+
+        # Unblock a worker waiting on a full buffer
+        try:
+            while True:
+                buffer.get_nowait()
+        except Empty:
+            pass
@@ -0,0 +1,98 @@
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, NamedTuple, Optional, Tuple, Union
+from datetime import datetime, timedelta
+from functools import partial
+from singer.utils import now, strftime
+import tap_ordway.configs as TAP_CONFIG
+from .scheduler import StreamScheduler
+
+if TYPE_CHECKING:
+    from .streams.base import Stream
+
+# Ordway filters by the replication key are exclusive, so windows overlap
+# by this much to not miss records right on a window's boundary.
+_WINDOW_OVERLAP = timedelta(microseconds=1)
+
+
+class BackfillWindow(NamedTuple):
+    """A range of an INCREMENTAL stream's replication key, exclusive on
+    both ends. The last window of a backfill has no `end`.
+    """
+
+    start: datetime
+    end: Optional[datetime] = None
+
+
+class CompletedWindow(NamedTuple):
+    """Marks that every record of a backfill window has been yielded
+
+    `bookmark` is the replication key value a sync may safely resume from,
+    and `is_last` is True for the last window before the open-ended one.
+    """
+
+    bookmark: str
+    is_last: bool
+
+
+def get_backfill_windows(filter_datetime: datetime) -> List[BackfillWindow]:
+    """Splits the replication key's range, from `filter_datetime` onwards,
+    into `backfill_window_days` sized windows
+
+    Returns an empty list when backfilling is disabled or the range fits into
+    a single window.
+    """
+
+    if not TAP_CONFIG.backfill_window_days:
+        return []
+
+    window_size = timedelta(days=TAP_CONFIG.backfill_window_days)
+    until = now()
+
+    if until - filter_datetime <= window_size:
+        return []
+
+    windows = []
+    start = filter_datetime
+    end = filter_datetime + window_size
+
+    while end < until:
+        windows.append(BackfillWindow(start, end))
+        start = end - _WINDOW_OVERLAP
+        end += window_size
+
+    windows.append(BackfillWindow(start))
+
+    return windows
+
+
+def sync_backfill_windows(
+    stream_def: "Stream", filter_datetime: datetime, windows: List[BackfillWindow]
+) -> Generator[Tuple[str, Union[Dict[str, Any], CompletedWindow]], None, None]:
+    """Syncs up to `max_backfill_workers` of a stream's windows at a time
+
+    Records are yielded window by window, oldest first, each window followed
+    by a CompletedWindow - except for the last, open-ended one.
+    """
+
+    scheduler = StreamScheduler(TAP_CONFIG.max_backfill_workers)
+    jobs = (
+        (
+            f"{stream_def.tap_stream_id}-{i}",
+            partial(stream_def.sync, filter_datetime, window),
+        )
+        for i, window in enumerate(windows)
+    )
+    index = 0
+
+    for scheduled in scheduler.run_in_order(jobs):
+        if not scheduled.done:
+            yield scheduled.item
+            continue
+
+        window = windows[index]
+        index += 1
+
+        if window.end is not None:
+            yield stream_def.tap_stream_id, CompletedWindow(
+                strftime(window.end - _WINDOW_OVERLAP),
+                is_last=index == len(windows) - 1,
+            )
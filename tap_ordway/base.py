@@ -12,3 +12,5 @@ class DataContext(NamedTuple):
     stream: Union["Stream", "Substream"]
     filter_datetime: "datetime"
     parent_record: Optional[Dict[str, Any]] = None
+    # Exclusive upper bound of the replication key, when backfilling a window
+    until_datetime: Optional["datetime"] = None
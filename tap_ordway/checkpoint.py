@@ -0,0 +1,87 @@
+from typing import TYPE_CHECKING, Optional, Union
+from time import monotonic
+import tap_ordway.configs as TAP_CONFIG
+
+if TYPE_CHECKING:
+    from .api import AsyncRequestHandler, RequestHandler
+
+    _REQUEST_HANDLER = Union[RequestHandler, AsyncRequestHandler]
+
+
+class Checkpointer:
+    """Decides when an INCREMENTAL stream's STATE should be written
+
+    A checkpoint is due once `every_records` records have been handled,
+    `every_seconds` have elapsed, or - with `on_page_boundary` - once
+    `request_handler` has moved on to another page since the last checkpoint.
+    When no policy is configured, a checkpoint is due after every record.
+
+    While `bookmarks_held` is set - e.g. while backfilling windows, whose
+    bookmarks only advance once a window completes - records don't advance
+    the stream's bookmark.
+
+    `pending_bookmark` is the replication key of the last record handled,
+    which isn't safe to resume from - and so is kept out of the state - until
+    a record with another value is handled, or the stream's sync completes.
+    """
+
+    def __init__(
+        self,
+        every_records: Optional[int] = None,
+        every_seconds: Optional[float] = None,
+        on_page_boundary: bool = False,
+        request_handler: Optional["_REQUEST_HANDLER"] = None,
+    ):
+        if every_records is None and every_seconds is None and not on_page_boundary:
+            every_records = 1
+
+        self.every_records = every_records
+        self.every_seconds = every_seconds
+        self.on_page_boundary = on_page_boundary and request_handler is not None
+        self.request_handler = request_handler
+        self.bookmarks_held = False
+        self.pending_bookmark: Optional[str] = None
+
+        self._records = 0
+        self._checkpointed_at = monotonic()
+        self._page = self._current_page()
+
+    @classmethod
+    def from_config(
+        cls, request_handler: Optional["_REQUEST_HANDLER"] = None
+    ) -> "Checkpointer":
+        return cls(
+            every_records=TAP_CONFIG.state_checkpoint_records,
+            every_seconds=TAP_CONFIG.state_checkpoint_seconds,
+            on_page_boundary=TAP_CONFIG.state_checkpoint_on_page,
+            request_handler=request_handler,
+        )
+
+    def _current_page(self) -> int:
+        if self.request_handler is None:
+            return 0
+
+        return self.request_handler.pages_consumed
+
+    @property
+    def is_due(self) -> bool:
+        if self.every_records is not None and self._records >= self.every_records:
+            return True
+
+        if (
+            self.every_seconds is not None
+            and monotonic() - self._checkpointed_at >= self.every_seconds
+        ):
+            return True
+
+        return self.on_page_boundary and self._current_page() != self._page
+
+    def record_handled(self) -> None:
+        self._records += 1
+
+    def checkpointed(self) -> None:
+        """ Resets the policy's counters after STATE has been written """
+
+        self._records = 0
+        self._checkpointed_at = monotonic()
+        self._page = self._current_page()
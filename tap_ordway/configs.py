@@ -11,3 +11,36 @@ staging = False
 api_url: Optional[str] = None
 start_date: str
 rate_limit_rps: Union[int, float, None] = None
+rate_limit_burst: Union[int, float, None] = None
+rate_limit_file: Optional[str] = None
+adaptive_rate_limit = False
+rate_limit_min_rps: Union[int, float, None] = None
+rate_limit_max_rps: Union[int, float, None] = None
+prefetch_pages = 0
+max_parallel_streams = 1
+state_checkpoint_records: Optional[int] = None
+state_checkpoint_seconds: Union[int, float, None] = None
+state_checkpoint_on_page = False
+max_substream_workers = 1
+async_http = False
+max_concurrent_requests = 100
+backfill_window_days: Union[int, float, None] = None
+max_backfill_workers = 4
+output_flush_bytes = 65536
+output_flush_records: Optional[int] = None
+json_encoder = "auto"
+json_decoder = "auto"
+stream_responses = False
+adaptive_page_size = False
+target_page_seconds: Union[int, float] = 5
+min_page_size = 10
+max_page_size = 500
+keyset_pagination = False
+resume_full_table = False
+http_pool_size: Optional[int] = None
+http_max_retries = 0
+http_tcp_keepalive = True
+http_compression = True
+prepared_requests = False
+profile_stages = False
+profile_summary_file: Optional[str] = None
@@ -2,12 +2,13 @@ from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 import json
 from inflection import pluralize, underscore
 from kafka import KafkaConsumer
-from singer import get_logger, write_state
+from singer import get_logger
 import tap_ordway.configs as TAP_CONFIG
 from tap_ordway import filter_record, handle_record, prepare_stream
 from tap_ordway.base import DataContext
+from tap_ordway.profiling import profile_stream
 from tap_ordway.streams import EndpointSubstream, ResponseSubstream, Stream
-from tap_ordway.utils import get_filter_datetime
+from tap_ordway.utils import get_filter_datetime, write_state
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -56,13 +57,14 @@ def listen_topic(config, state):
                 stream_defs[tap_stream_id], TAP_CONFIG.start_date, state
             )
 
-        process_stream(
-            stream_defs[tap_stream_id],
-            stream_versions[tap_stream_id],
-            state,
-            json_message,
-            filter_datetime,
-        )
+        with profile_stream(tap_stream_id):
+            process_stream(
+                stream_defs[tap_stream_id],
+                stream_versions[tap_stream_id],
+                state,
+                json_message,
+                filter_datetime,
+            )
 
 
 def process_stream(
@@ -112,13 +114,12 @@ def process_stream(
             with stream_def.transformer_class() as transformer:
                 for record in transformer.transform(
                     record,
-                    stream_def.schema_dict,
+                    stream_def.compiled_schema,
                     context=DataContext(
                         stream=stream_def,
                         filter_datetime=filter_datetime,
                         tap_stream_id=stream_id,
                     ),
-                    metadata=stream_def.mapped_metadata,
                 ):
                     state = handle_record(
                         stream_id, record, stream_def, stream_version, state
@@ -137,9 +138,8 @@ def process_stream(
             with stream_def.transformer_class() as transformer:
                 records = transformer.transform(
                     record,
-                    stream_def.schema_dict,
+                    stream_def.compiled_schema,
                     context=context,
-                    metadata=stream_def.mapped_metadata,
                 )
 
                 for record in records:
@@ -0,0 +1,197 @@
+from typing import Any, Callable, List, Optional, TextIO, Tuple
+from decimal import Decimal
+import sys
+from threading import Lock
+from singer.messages import Message, RecordMessage, StateMessage, format_message
+import tap_ordway.configs as TAP_CONFIG
+from .profiling import StageProfile, get_stage_profile, time_stage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# Raw JSON fragments are what allow orjson to write Decimals exactly
+HAS_ORJSON = orjson is not None and hasattr(orjson, "Fragment")
+
+_ENCODER = Callable[[Message], bytes]
+
+
+def encode_simplejson(message: Message) -> bytes:
+    """ Encodes a message exactly like singer's `write_message` """
+
+    return format_message(message).encode("ascii")
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        # Same as simplejson's use_decimal
+        return orjson.Fragment(str(obj))
+
+    raise TypeError
+
+
+def encode_orjson(message: Message) -> bytes:
+    """Encodes a message with orjson - as compact, UTF-8 JSON
+
+    Decimals are written as precisely as by `encode_simplejson`, which is
+    fallen back to for anything else orjson can't encode (e.g. integers
+    beyond 64 bits).
+    """
+
+    try:
+        return orjson.dumps(
+            message.asdict(), default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )
+    except TypeError:
+        return encode_simplejson(message)
+
+
+def get_encoder(name: str = "auto") -> _ENCODER:
+    """Gets the message encoder named by the `json_encoder` config property
+
+    "auto" picks orjson when it's installed, and simplejson otherwise.
+    """
+
+    if name == "orjson" or (name == "auto" and HAS_ORJSON):
+        if not HAS_ORJSON:
+            raise ValueError('`json_encoder` "orjson" requires orjson>=3.9')
+
+        return encode_orjson
+
+    if name in ("auto", "simplejson"):
+        return encode_simplejson
+
+    raise ValueError(f'Unknown `json_encoder` "{name}"')
+
+
+class MessageWriter:
+    """Writes Singer messages to stdout in batches
+
+    singer's `write_message` serializes, writes and flushes each message on
+    its own. Instead, messages serialized by `encoder` are buffered until
+    `flush_bytes` bytes or `flush_records` RECORD messages are pending, and
+    then written with a single write and flush. STATE messages flush the
+    buffer right away, so no STATE is held back - and none is ever written
+    before the records preceding it.
+    """
+
+    def __init__(
+        self,
+        flush_bytes: int = 65536,
+        flush_records: Optional[int] = None,
+        stream: Optional[TextIO] = None,
+        encoder: _ENCODER = encode_simplejson,
+    ):
+        self.flush_bytes = flush_bytes
+        self.flush_records = flush_records
+        self.encoder = encoder
+        self._stream = stream
+
+        self._lock = Lock()
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._buffered_records = 0
+        self._profile: Optional[StageProfile] = None
+
+    @property
+    def stream(self) -> TextIO:
+        # Looked up on every write, so redirecting stdout keeps working
+        return self._stream if self._stream is not None else sys.stdout
+
+    def write_message(self, message: Message) -> None:
+        if isinstance(message, RecordMessage):
+            # Writes are attributed to the stream of the last record buffered
+            self._profile = get_stage_profile(message.stream)
+
+        profile = self._profile
+
+        with time_stage(profile, "serialize"):
+            line = self.encoder(message) + b"\n"
+
+        with self._lock:
+            self._buffer.append(line)
+            self._buffered_bytes += len(line)
+
+            if isinstance(message, RecordMessage):
+                self._buffered_records += 1
+
+            if (
+                isinstance(message, StateMessage)
+                or self._buffered_bytes >= self.flush_bytes
+                or (
+                    self.flush_records is not None
+                    and self._buffered_records >= self.flush_records
+                )
+            ):
+                with time_stage(profile, "write"):
+                    self._flush()
+
+    def _flush(self) -> None:
+        stream = self.stream
+        binary_stream = getattr(stream, "buffer", None)
+
+        if self._buffer:
+            data = b"".join(self._buffer)
+            self._buffer = []
+            self._buffered_bytes = 0
+            self._buffered_records = 0
+
+            # Skip re-encoding through the text layer when possible
+            if binary_stream is not None:
+                stream.flush()
+                binary_stream.write(data)
+            else:
+                stream.write(data.decode("utf-8"))
+
+        if binary_stream is not None:
+            binary_stream.flush()
+        else:
+            stream.flush()
+
+    def flush(self) -> None:
+        """ Writes out any buffered messages """
+
+        with self._lock:
+            self._flush()
+
+
+_message_writer: Optional[MessageWriter] = None
+_message_writer_config: Optional[Tuple[int, Optional[int], str]] = None
+_message_writer_lock = Lock()
+
+
+def get_message_writer() -> MessageWriter:
+    """Gets the MessageWriter all Singer messages are written through, based
+    on the `output_flush_bytes`, `output_flush_records` and `json_encoder`
+    config properties
+    """
+
+    global _message_writer, _message_writer_config  # pylint: disable=global-statement
+
+    config = (
+        TAP_CONFIG.output_flush_bytes,
+        TAP_CONFIG.output_flush_records,
+        TAP_CONFIG.json_encoder,
+    )
+
+    with _message_writer_lock:
+        if _message_writer is None or config != _message_writer_config:
+            if _message_writer is not None:
+                _message_writer.flush()
+
+            flush_bytes, flush_records, json_encoder = config
+            _message_writer = MessageWriter(
+                flush_bytes, flush_records, encoder=get_encoder(json_encoder)
+            )
+            _message_writer_config = config
+
+        return _message_writer
+
+
+def flush_messages() -> None:
+    """ Writes out any buffered Singer messages """
+
+    with _message_writer_lock:
+        if _message_writer is not None:
+            _message_writer.flush()
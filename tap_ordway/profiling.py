@@ -0,0 +1,518 @@
+from typing import (
+    Any,
+    ContextManager,
+    Counter,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+from abc import ABC, abstractmethod
+import argparse
+import collections
+import cProfile
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import pstats
+import sys
+from threading import Event, Lock, Thread, get_ident
+from time import perf_counter
+from singer import get_logger
+from singer.metrics import Point
+from singer.metrics import log as log_metric
+import tap_ordway.configs as TAP_CONFIG
+
+LOGGER = get_logger()
+
+_T = TypeVar("_T")
+
+# Durations are bucketed by powers of two microseconds, up to about 9 minutes
+_BUCKETS = 30
+
+_NULL_TIMER: ContextManager[None] = nullcontext()
+
+
+class StageHistogram:
+    """ Durations of a single stage """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Bucket i counts durations below 2 ** i microseconds
+        self.buckets = [0] * _BUCKETS
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[min(int(seconds * 1e6).bit_length(), _BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Gets the duration `fraction` of the stage's durations are within,
+        rounded up to its bucket's upper bound
+        """
+
+        threshold = fraction * self.count
+        seen = 0
+
+        for index, count in enumerate(self.buckets):
+            seen += count
+
+            if count and seen >= threshold:
+                return min(2 ** index / 1e6, self.max)
+
+        return self.max
+
+    def summarize(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p90_ms": round(self.percentile(0.9) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class StageTimer:
+    """ Adds the duration of a `with` block to a StageProfile """
+
+    __slots__ = ("profile", "stage", "started_at")
+
+    def __init__(self, profile: "StageProfile", stage: str):
+        self.profile = profile
+        self.stage = stage
+        self.started_at = 0.0
+
+    def __enter__(self) -> None:
+        self.started_at = perf_counter()
+
+    def __exit__(self, *_) -> None:
+        self.profile.add(self.stage, perf_counter() - self.started_at)
+
+
+class StageProfile:
+    """ Histograms of how long each stage of a stream's sync took """
+
+    def __init__(self):
+        self.stages: Dict[str, StageHistogram] = {}
+        self._lock = Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.stages.get(stage)
+
+            if histogram is None:
+                histogram = self.stages[stage] = StageHistogram()
+
+            histogram.add(seconds)
+
+    def timer(self, stage: str) -> StageTimer:
+        return StageTimer(self, stage)
+
+    def iter_timed(self, iterable: Iterable[_T], stage: str) -> Iterator[_T]:
+        """ Times how long each item of `iterable` takes to be produced """
+
+        iterator = iter(iterable)
+
+        while True:
+            started_at = perf_counter()
+
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+
+            self.add(stage, perf_counter() - started_at)
+
+            yield item
+
+    def summarize(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                stage: histogram.summarize()
+                for stage, histogram in sorted(self.stages.items())
+            }
+
+
+_profiles: Dict[str, StageProfile] = {}
+_summaries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_profiles_lock = Lock()
+
+
+def get_stage_profile(tap_stream_id: str) -> Optional[StageProfile]:
+    """Gets the StageProfile of a stream's sync, if `profile_stages` is
+    enabled
+    """
+
+    if not TAP_CONFIG.profile_stages:
+        return None
+
+    profile = _profiles.get(tap_stream_id)
+
+    if profile is None:
+        with _profiles_lock:
+            profile = _profiles.setdefault(tap_stream_id, StageProfile())
+
+    return profile
+
+
+def time_stage(profile: Optional[StageProfile], stage: str) -> ContextManager[None]:
+    """ Times a `with` block as `stage` of `profile`, unless it's None """
+
+    if profile is None:
+        return _NULL_TIMER
+
+    return profile.timer(stage)
+
+
+def log_stage_profiles(tap_stream_ids: List[str]) -> None:
+    """Logs the stage durations of finished streams as `stage_duration`
+    singer metrics, and adds them to the `profile_summary_file`
+    """
+
+    if not TAP_CONFIG.profile_stages:
+        return
+
+    with _profiles_lock:
+        profiles = {
+            tap_stream_id: _profiles.pop(tap_stream_id)
+            for tap_stream_id in tap_stream_ids
+            if tap_stream_id in _profiles
+        }
+
+    for tap_stream_id, profile in profiles.items():
+        summary = profile.summarize()
+        _summaries[tap_stream_id] = summary
+
+        for stage, stats in summary.items():
+            log_metric(
+                LOGGER,
+                Point(
+                    "histogram",
+                    "stage_duration",
+                    stats["total_seconds"],
+                    {"stream": tap_stream_id, "stage": stage, **stats},
+                ),
+            )
+
+    if TAP_CONFIG.profile_summary_file is not None and profiles:
+        with open(TAP_CONFIG.profile_summary_file, "w") as summary_file:
+            json.dump(_summaries, summary_file, indent=2, sort_keys=True)
+
+
+class Profiler(ABC):
+    """Profiles the sync of each stream, writing each stream's profile and a
+    summary of its `top` hottest functions to `directory`
+    """
+
+    extension = ""
+
+    def __init__(self, directory: str, top: int = 30):
+        self.directory = directory
+        self.top = top
+
+    def start(self) -> None:
+        pass
+
+    @abstractmethod
+    def profile_stream(self, tap_stream_id: str) -> ContextManager[None]:
+        """ Profiles a `with` block as part of a stream's sync """
+
+    @abstractmethod
+    def write_stream(self, tap_stream_id: str, path: str, summary_file) -> None:
+        pass
+
+    @abstractmethod
+    def stream_ids(self) -> List[str]:
+        pass
+
+    def stop(self) -> None:
+        """ Writes every stream's profile and summary """
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        for tap_stream_id in self.stream_ids():
+            path = os.path.join(self.directory, tap_stream_id + self.extension)
+
+            with open(
+                os.path.join(self.directory, f"{tap_stream_id}.txt"), "w"
+            ) as summary_file:
+                self.write_stream(tap_stream_id, path, summary_file)
+
+        LOGGER.info("Wrote profiles to %s", os.path.abspath(self.directory))
+
+
+class DeterministicProfiler(Profiler):
+    """Profiles every function call made by the threads syncing streams with
+    cProfile - but not by the threads they fetch pages or substreams on
+
+    From Python 3.12 on, cProfile follows every thread and only one profile
+    may be enabled at a time, so streams can't be profiled in parallel.
+    """
+
+    extension = ".prof"
+
+    def __init__(self, directory: str, top: int = 30):
+        super().__init__(directory, top)
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._lock = Lock()
+
+    def start(self) -> None:
+        if sys.version_info >= (3, 12) and TAP_CONFIG.max_parallel_streams > 1:
+            raise ValueError(
+                "--profile cprofile can't profile parallel streams on Python 3.12+, "
+                "set `max_parallel_streams` to 1 or use --profile sample"
+            )
+
+    def profile_stream(self, tap_stream_id: str) -> ContextManager[None]:
+        # A profile can only follow one thread's calls at a time
+        key = (tap_stream_id, get_ident())
+
+        with self._lock:
+            profile = self._profiles.setdefault(key, cProfile.Profile())
+
+        return _EnabledProfile(profile, tap_stream_id)
+
+    def stream_ids(self) -> List[str]:
+        return list(dict.fromkeys(tap_stream_id for tap_stream_id, _ in self._profiles))
+
+    def write_stream(self, tap_stream_id: str, path: str, summary_file) -> None:
+        stats = pstats.Stats(
+            *(
+                profile
+                for (profiled_stream_id, _), profile in self._profiles.items()
+                if profiled_stream_id == tap_stream_id
+            ),
+            stream=summary_file,
+        )
+        stats.dump_stats(path)
+        stats.sort_stats("tottime").print_stats(self.top)
+
+
+class _EnabledProfile:
+    """Enables a cProfile profile within a `with` block
+
+    Unlike a generator-based context manager, it leaves no frame of its own
+    in the profile.
+    """
+
+    __slots__ = ("profile", "tap_stream_id", "enabled")
+
+    def __init__(self, profile: cProfile.Profile, tap_stream_id: str):
+        self.profile = profile
+        self.tap_stream_id = tap_stream_id
+        self.enabled = False
+
+    def __enter__(self) -> None:
+        try:
+            self.profile.enable()
+            self.enabled = True
+        except ValueError:
+            # Another profiler is already active, e.g. on Python 3.12+
+            LOGGER.warning(
+                "Not profiling %s, another profiler is active", self.tap_stream_id
+            )
+
+    def __exit__(self, *_) -> None:
+        if self.enabled:
+            self.profile.disable()
+
+
+def _get_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler(Profiler):
+    """Samples the stacks of every thread each `interval` seconds
+
+    Samples are attributed to the stream a thread is syncing or, for other
+    threads (e.g. those fetching pages or substreams), to the only stream
+    being synced - or to `_other` while several are. Stacks are written in
+    the collapsed format of flamegraph.pl and speedscope.
+    """
+
+    extension = ".collapsed"
+
+    def __init__(self, directory: str, top: int = 30, interval: float = 0.01):
+        super().__init__(directory, top)
+        self.interval = interval
+        self._stacks: Dict[str, Counter[Tuple[str, ...]]] = {}
+        self._threads: Dict[int, str] = {}
+        self._labels: Dict[Any, str] = {}
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        self._thread = Thread(target=self._run, name="tap-ordway-profiler", daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def profile_stream(self, tap_stream_id: str) -> Iterator[None]:
+        thread_id = get_ident()
+
+        with self._lock:
+            previous = self._threads.get(thread_id)
+            self._threads[thread_id] = tap_stream_id
+            self._stacks.setdefault(tap_stream_id, collections.Counter())
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                if previous is None:
+                    del self._threads[thread_id]
+                else:
+                    self._threads[thread_id] = previous
+
+    def _get_stack(self, frame) -> Tuple[str, ...]:
+        labels = self._labels
+        stack = []
+
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+
+            if label is None:
+                label = labels[code] = _get_label(code)
+
+            stack.append(label)
+            frame = frame.f_back
+
+        stack.reverse()
+
+        return tuple(stack)
+
+    def sample(self) -> None:
+        """ Records the current stack of every thread, except the profiler's """
+
+        own_thread_id = get_ident()
+
+        with self._lock:
+            threads = dict(self._threads)
+
+        if not threads:
+            return
+
+        streams = set(threads.values())
+        default = streams.pop() if len(streams) == 1 else "_other"
+        stacks = [
+            (threads.get(thread_id, default), self._get_stack(frame))
+            for thread_id, frame in sys._current_frames().items()  # pylint: disable=protected-access
+            if thread_id != own_thread_id
+        ]
+
+        with self._lock:
+            for tap_stream_id, stack in stacks:
+                self._stacks.setdefault(tap_stream_id, collections.Counter())[stack] += 1
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+
+        super().stop()
+
+    def stream_ids(self) -> List[str]:
+        return [
+            tap_stream_id for tap_stream_id, stacks in self._stacks.items() if stacks
+        ]
+
+    def write_stream(self, tap_stream_id: str, path: str, summary_file) -> None:
+        stacks = self._stacks[tap_stream_id]
+        own: Counter[str] = collections.Counter()
+        total: Counter[str] = collections.Counter()
+
+        with open(path, "w") as collapsed_file:
+            for stack, count in stacks.most_common():
+                collapsed_file.write(f"{';'.join(stack)} {count}\n")
+                own[stack[-1]] += count
+
+                for label in set(stack):
+                    total[label] += count
+
+        samples = sum(stacks.values())
+        summary_file.write(
+            f"{samples} samples of {tap_stream_id}, every {self.interval * 1000:g}ms\n\n"
+            f"{'own %':>7} {'total %':>7}  function\n"
+        )
+
+        for label, count in own.most_common(self.top):
+            summary_file.write(
+                f"{count / samples * 100:>7.1f} {total[label] / samples * 100:>7.1f}  {label}\n"
+            )
+
+
+_profiler: Optional[Profiler] = None
+
+
+def parse_profiler_args(argv: Sequence[str]) -> Tuple[Optional[Profiler], List[str]]:
+    """Parses the `--profile` options out of command line arguments, getting
+    the Profiler they ask for and the remaining arguments
+    """
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", choices=("sample", "cprofile"))
+    parser.add_argument("--profile-dir", default="profiles")
+    parser.add_argument("--profile-top", type=int, default=30)
+    parser.add_argument("--profile-interval", type=float, default=10.0)
+    args, remaining = parser.parse_known_args(argv)
+
+    if args.profile == "sample":
+        profiler: Optional[Profiler] = SamplingProfiler(
+            args.profile_dir, args.profile_top, args.profile_interval / 1000
+        )
+    elif args.profile == "cprofile":
+        profiler = DeterministicProfiler(args.profile_dir, args.profile_top)
+    else:
+        profiler = None
+
+    return profiler, remaining
+
+
+def start_profiler(profiler: Profiler) -> None:
+    global _profiler  # pylint: disable=global-statement
+
+    profiler.start()
+    _profiler = profiler
+
+
+def stop_profiler() -> None:
+    """ Stops profiling, if it was started, and writes the profiles """
+
+    global _profiler  # pylint: disable=global-statement
+
+    profiler, _profiler = _profiler, None
+
+    if profiler is not None:
+        profiler.stop()
+
+
+def profile_stream(tap_stream_id: str) -> ContextManager[None]:
+    """ Profiles a `with` block as part of a stream's sync, if profiling """
+
+    if _profiler is None:
+        return _NULL_TIMER
+
+    return _profiler.profile_stream(tap_stream_id)
+
+
+def iter_profiled(iterable: Iterable[_T], tap_stream_id: str) -> Iterator[_T]:
+    """Profiles producing each item of `iterable` as part of a stream's sync,
+    on whichever thread consumes it
+    """
+
+    with profile_stream(tap_stream_id):
+        yield from iterable
@@ -0,0 +1,172 @@
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from collections import deque
+from queue import Queue
+from threading import Event, Thread
+from singer import get_logger
+from .api.utils import put_until_stopped
+
+LOGGER = get_logger()
+
+# pylint: disable=invalid-name
+_JOB = Tuple[str, Callable[[], Iterable[Any]]]
+
+
+class ScheduledItem(NamedTuple):
+    """An item produced by a scheduled job
+
+    `done` is True for the final item of each job, in which case `item`
+    is None.
+    """
+
+    job_id: str
+    item: Any = None
+    done: bool = False
+
+
+class _JobFailed(NamedTuple):
+    job_id: str
+    error: BaseException
+
+
+class StreamScheduler:
+    """Runs up to `max_workers` jobs at a time on worker threads and funnels
+    everything they produce through the thread iterating over `run`.
+
+    Each job is a `(job_id, start)` pair. `start` is invoked on the
+    consuming thread right before the job is scheduled - so it may safely
+    write Singer messages - and returns the iterable that's consumed on a
+    worker thread. Items of a single job are delivered in order.
+    """
+
+    def __init__(self, max_workers: int, buffer_size: int = 1000):
+        if max_workers < 1:
+            raise ValueError("max_workers must be GREATER THAN 0")
+
+        self.max_workers = max_workers
+        self._queue: "Queue" = Queue(maxsize=buffer_size)
+        self._stopped = Event()
+        self._threads: Dict[str, Thread] = {}
+
+    def _put(self, value: Any, queue: Optional["Queue"] = None) -> bool:
+        return put_until_stopped(
+            self._queue if queue is None else queue, value, self._stopped
+        )
+
+    def _work(
+        self, job_id: str, items: Iterable[Any], queue: Optional["Queue"] = None
+    ) -> None:
+        try:
+            for item in items:
+                if not self._put(ScheduledItem(job_id, item), queue):
+                    return
+        except BaseException as err:  # pylint: disable=broad-except
+            self._put(_JobFailed(job_id, err), queue)
+            return
+
+        self._put(ScheduledItem(job_id, done=True), queue)
+
+    def _start(self, job: _JOB, queue: Optional["Queue"] = None) -> None:
+        job_id, start = job
+        thread = Thread(
+            target=self._work,
+            args=(job_id, start(), queue),
+            name=f"tap-ordway-{job_id}",
+            daemon=True,
+        )
+        self._threads[job_id] = thread
+        thread.start()
+
+    def _start_next(
+        self, jobs: Iterator[_JOB], queue: Optional["Queue"] = None
+    ) -> bool:
+        job: Optional[_JOB] = next(jobs, None)
+
+        if job is None:
+            return False
+
+        self._start(job, queue)
+        return True
+
+    def run(self, jobs: Iterable[_JOB]) -> Generator[ScheduledItem, None, None]:
+        """Schedules `jobs` and yields their items as they're produced
+
+        A failing job stops the scheduler and its exception is re-raised.
+        """
+
+        pending = iter(jobs)
+        running = 0
+
+        try:
+            while running < self.max_workers and self._start_next(pending):
+                running += 1
+
+            while running > 0:
+                value = self._queue.get()
+
+                if isinstance(value, _JobFailed):
+                    LOGGER.critical('Stream "%s" failed', value.job_id)
+                    raise value.error
+
+                yield value
+
+                if value.done:
+                    del self._threads[value.job_id]
+                    running -= 1
+
+                    if self._start_next(pending):
+                        running += 1
+        finally:
+            self._stopped.set()
+
+    def run_in_order(
+        self, jobs: Iterable[_JOB]
+    ) -> Generator[ScheduledItem, None, None]:
+        """Schedules `jobs` like `run`, but yields every item of a job -
+        including its final, `done` item - before any item of the next job
+
+        Up to `max_workers` jobs run ahead of the one being yielded, each
+        buffering at most `buffer_size` items.
+        """
+
+        pending = iter(jobs)
+        queues: Deque["Queue"] = deque()
+
+        def start_next() -> bool:
+            queue: "Queue" = Queue(maxsize=self._queue.maxsize)
+
+            if not self._start_next(pending, queue):
+                return False
+
+            queues.append(queue)
+            return True
+
+        try:
+            while len(queues) < self.max_workers and start_next():
+                pass
+
+            while queues:
+                value = queues[0].get()
+
+                if isinstance(value, _JobFailed):
+                    LOGGER.critical('Job "%s" failed', value.job_id)
+                    raise value.error
+
+                yield value
+
+                if value.done:
+                    del self._threads[value.job_id]
+                    queues.popleft()
+                    start_next()
+        finally:
+            self._stopped.set()
@@ -2,30 +2,47 @@ from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Deque,
     Dict,
     Generator,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Sequence,
     Tuple,
     Type,
+    Union,
 )
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
 from singer import get_logger
 from singer.metadata import to_map as mdata_to_map
+import tap_ordway.configs as TAP_CONFIG
+from ..api.aio import AsyncRequestHandler, get_event_loop_thread
+from ..api.pagination import PageCursor
 from ..base import DataContext
-from ..utils import denest
+from ..profiling import get_stage_profile, time_stage
+from ..transformers.compiled import CompiledSchema
+from ..utils import iter_denest
 
 if TYPE_CHECKING:
     from datetime import datetime
     from singer.catalog import Catalog, CatalogEntry
     from ..api import RequestHandler
+    from ..backfill import BackfillWindow
     from ..transformers import RecordTransformer
 
 LOGGER = get_logger()
 
 # pylint: disable=invalid-name
 _FILTER_HOOK = Callable[[Dict[str, str], DataContext], bool]
+_SUBSTREAM_FUTURES = Dict[str, "Future[List[Tuple[str, Dict[str, Any]]]]"]
+# Records, preceded by the PageCursor of each page with `resume_full_table`
+_RECORDS = Iterable[Union[Dict[str, Any], PageCursor]]
+_PIPELINED_RECORD = Tuple[Union[Dict[str, Any], PageCursor], _SUBSTREAM_FUTURES]
 
 
 def _attach_tap_stream_id(
@@ -58,6 +75,7 @@ class StreamABC(ABC):
 
         self.mapped_metadata = mdata_to_map(self.catalog_entry.metadata)
         self.schema_dict = self.catalog_entry.schema.to_dict()
+        self.compiled_schema = CompiledSchema(self.schema_dict, self.mapped_metadata)
         self.filter_hook: _FILTER_HOOK = (
             (lambda *_, **__: False) if filter_hook is None else filter_hook
         )
@@ -144,19 +162,31 @@ class EndpointSubstream(Substream):
 
     @property
     @abstractmethod
-    def request_handler(self) -> "RequestHandler":
+    def request_handler(self) -> Union["RequestHandler", AsyncRequestHandler]:
         pass
 
+    def _get_context(
+        self, parent_record: Dict[str, Any], filter_datetime: "datetime"
+    ) -> DataContext:
+        return DataContext(
+            stream=self,
+            filter_datetime=filter_datetime,
+            parent_record=parent_record,
+            tap_stream_id=self.tap_stream_id,
+        )
+
     def sync(
         self, parent_record: Dict[str, Any], filter_datetime: "datetime"
     ) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
+        if isinstance(self.request_handler, AsyncRequestHandler):
+            yield from get_event_loop_thread().run(
+                self.sync_async(parent_record, filter_datetime)
+            ).result()
+
+            return
+
         with self.transformer_class() as transformer:
-            context = DataContext(
-                stream=self,
-                filter_datetime=filter_datetime,
-                parent_record=parent_record,
-                tap_stream_id=self.tap_stream_id,
-            )
+            context = self._get_context(parent_record, filter_datetime)
 
             for record in self.request_handler.fetch(context=context):
                 if self.filter_hook(record, context):
@@ -166,12 +196,40 @@ class EndpointSubstream(Substream):
                     self.tap_stream_id,
                     transformer.transform(
                         record,
-                        self.schema_dict,
+                        self.compiled_schema,
                         context=context,
-                        metadata=self.mapped_metadata,
                     ),
                 )
 
+    async def sync_async(
+        self, parent_record: Dict[str, Any], filter_datetime: "datetime"
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Syncs all of the substream's records given the `parent_record`,
+        using its AsyncRequestHandler
+        """
+
+        records: List[Tuple[str, Dict[str, Any]]] = []
+
+        with self.transformer_class() as transformer:
+            context = self._get_context(parent_record, filter_datetime)
+
+            async for record in self.request_handler.fetch(context=context):  # type: ignore
+                if self.filter_hook(record, context):
+                    continue
+
+                records.extend(
+                    _attach_tap_stream_id(
+                        self.tap_stream_id,
+                        transformer.transform(
+                            record,
+                            self.compiled_schema,
+                            context=context,
+                        ),
+                    )
+                )
+
+        return records
+
 
 class Stream(StreamABC):
     substream_definitions: List[Type[Substream]] = []
@@ -188,7 +246,7 @@ class Stream(StreamABC):
 
     @property
     @abstractmethod
-    def request_handler(self) -> "RequestHandler":
+    def request_handler(self) -> Union["RequestHandler", AsyncRequestHandler]:
         pass
 
     @property
@@ -208,34 +266,175 @@ class Stream(StreamABC):
         ]
 
     def sync(
-        self, filter_datetime: "datetime"
+        self,
+        filter_datetime: "datetime",
+        window: Optional["BackfillWindow"] = None,
+        cursor: Optional[PageCursor] = None,
     ) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
+        """Syncs the stream's records, and their substreams', since
+        `filter_datetime` - or only those within a backfill `window`
+
+        With `resume_full_table`, FULL_TABLE streams start at `cursor`, if
+        any, and yield the PageCursor of each page before its records.
+        """
+
+        yield_cursors = TAP_CONFIG.resume_full_table and not self.is_valid_incremental
+        request_handler = self.request_handler
+
+        # Backfill windows are synced alongside each other, so all but the
+        # open-ended one - whose pages the stream's checkpoints follow - fetch
+        # with a handler of their own
+        if window is not None and window.end is not None:
+            request_handler = request_handler.clone()
+
         with self.transformer_class() as transformer:
             context = DataContext(
                 stream=self,
-                filter_datetime=filter_datetime,
+                filter_datetime=filter_datetime if window is None else window.start,
                 tap_stream_id=self.tap_stream_id,
+                until_datetime=None if window is None else window.end,
             )
 
-            for record in self.request_handler.fetch(context=context):
-                yield from self.sync_substreams(record, filter_datetime)
+            if isinstance(request_handler, AsyncRequestHandler):
+                pages = get_event_loop_thread().iterate(
+                    request_handler.fetch_pages(context=context, cursor=cursor)
+                )
+
+                if yield_cursors:
+                    start = cursor or PageCursor(1, request_handler.page_size)
+                    records: _RECORDS = chain.from_iterable(
+                        chain([PageCursor(start.page + index, start.size)], page)
+                        for index, page in enumerate(pages)
+                    )
+                else:
+                    records = chain.from_iterable(pages)
+            else:
+                records = request_handler.fetch(
+                    context=context, cursor=cursor, yield_cursors=yield_cursors
+                )
+
+            pipelined: Iterator[_PIPELINED_RECORD]
+
+            if (
+                TAP_CONFIG.max_substream_workers > 1 or TAP_CONFIG.async_http
+            ) and any(
+                isinstance(substream, EndpointSubstream) and substream.is_selected
+                for substream in self.substreams
+            ):
+                pipelined = self._pipeline_endpoint_substreams(
+                    records, filter_datetime
+                )
+            else:
+                pipelined = ((record, {}) for record in records)
+
+            profile = get_stage_profile(self.tap_stream_id)
+
+            if profile is not None:
+                pipelined = profile.iter_timed(pipelined, "fetch_wait")
+
+            for record, substream_futures in pipelined:
+                if isinstance(record, PageCursor):
+                    yield self.tap_stream_id, record  # type: ignore
+
+                    continue
+
+                yield from self.sync_substreams(
+                    record, filter_datetime, substream_futures
+                )
+
+                with time_stage(profile, "filter_hook"):
+                    filtered = self.filter_hook(record, context)
 
                 # Skip primary stream if record is filtered,
                 # but give substreams a chance to perform
                 # their own filtering.
-                if self.filter_hook(record, context):
+                if filtered:
                     continue
 
                 yield from _attach_tap_stream_id(
                     self.tap_stream_id,
                     transformer.transform(
                         record,
-                        self.schema_dict,
+                        self.compiled_schema,
                         context=context,
-                        metadata=self.mapped_metadata,
                     ),
                 )
 
+    def _pipeline_endpoint_substreams(
+        self, records: _RECORDS, filter_datetime: "datetime"
+    ) -> Iterator[_PIPELINED_RECORD]:
+        """Submits the EndpointSubstream syncs of upcoming parent records to a
+        pool of `max_substream_workers` threads - or, with `async_http`, to the
+        event loop, for up to `max_concurrent_requests` parent records at once
+
+        Parent records are yielded in their original order alongside the
+        futures of their substream records, staying at most twice the pool's
+        size (or `max_concurrent_requests`) ahead of the consumer.
+        """
+
+        endpoint_substreams = [
+            substream
+            for substream in self.substreams
+            if isinstance(substream, EndpointSubstream) and substream.is_selected
+        ]
+        executor: Optional[ThreadPoolExecutor] = None
+
+        if all(
+            isinstance(substream.request_handler, AsyncRequestHandler)
+            for substream in endpoint_substreams
+        ):
+            event_loop_thread = get_event_loop_thread()
+            max_pending = TAP_CONFIG.max_concurrent_requests
+
+            def submit(substream: EndpointSubstream, record: Dict[str, Any]) -> Future:
+                return event_loop_thread.run(
+                    substream.sync_async(record, filter_datetime)
+                )
+
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=TAP_CONFIG.max_substream_workers,
+                thread_name_prefix=f"tap-ordway-{self.tap_stream_id}",
+            )
+            max_pending = TAP_CONFIG.max_substream_workers * 2
+
+            def submit(substream: EndpointSubstream, record: Dict[str, Any]) -> Future:
+                return executor.submit(  # type: ignore
+                    lambda: list(substream.sync(record, filter_datetime))
+                )
+
+        pending: Deque[_PIPELINED_RECORD] = deque()
+
+        try:
+            for record in records:
+                if isinstance(record, PageCursor):
+                    pending.append((record, {}))
+
+                    continue
+
+                pending.append(
+                    (
+                        record,
+                        {
+                            substream.tap_stream_id: submit(substream, record)
+                            for substream in endpoint_substreams
+                        },
+                    )
+                )
+
+                if len(pending) >= max_pending:
+                    yield pending.popleft()
+
+            while pending:
+                yield pending.popleft()
+        finally:
+            for _, futures in pending:
+                for future in futures.values():
+                    future.cancel()
+
+            if executor is not None:
+                executor.shutdown(wait=True)
+
     def sync_sub_records(
         self,
         substream: ResponseSubstream,
@@ -251,26 +450,37 @@ class Stream(StreamABC):
             tap_stream_id=substream.tap_stream_id,
         )
 
-        denested_value = denest(parent_record, substream.path)
+        profile = get_stage_profile(substream.tap_stream_id)
 
         with substream.transformer_class() as transformer:
-            for sub_record in denested_value:
-                if self.filter_hook(sub_record, context):
+            for sub_record in iter_denest(parent_record, substream.path):
+                with time_stage(profile, "filter_hook"):
+                    filtered = self.filter_hook(sub_record, context)
+
+                if filtered:
                     continue
 
                 yield from _attach_tap_stream_id(
                     substream.tap_stream_id,
                     transformer.transform(
                         sub_record,
-                        substream.schema_dict,
+                        substream.compiled_schema,
                         context=context,
-                        metadata=substream.mapped_metadata,
                     ),
                 )
 
     def sync_substreams(
-        self, parent_record: Dict[str, Any], filter_datetime: "datetime"
+        self,
+        parent_record: Dict[str, Any],
+        filter_datetime: "datetime",
+        substream_futures: Optional[_SUBSTREAM_FUTURES] = None,
     ) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
+        """Syncs all selected substreams given the `parent_record`
+
+        EndpointSubstream records found in `substream_futures` are taken from
+        there rather than synced in place.
+        """
+
         for substream in self.substreams:
             if not isinstance(substream, Substream):
                 raise TypeError(
@@ -285,4 +495,10 @@ class Stream(StreamABC):
                     substream, parent_record, filter_datetime
                 )
             elif isinstance(substream, EndpointSubstream):
-                yield from substream.sync(parent_record, filter_datetime)
+                if (
+                    substream_futures is not None
+                    and substream.tap_stream_id in substream_futures
+                ):
+                    yield from substream_futures[substream.tap_stream_id].result()
+                else:
+                    yield from substream.sync(parent_record, filter_datetime)
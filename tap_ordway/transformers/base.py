@@ -1,10 +1,20 @@
-from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Optional, Union
-from decimal import Decimal
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    Optional,
+    Union,
+)
 from inspect import isgeneratorfunction
 from inflection import singularize
 from singer.transform import NO_INTEGER_DATETIME_PARSING, Transformer
 from ..base import DataContext
+from ..profiling import get_stage_profile, time_stage
 from ..utils import get_company_id
+from .compiled import CompiledSchema, transform_number
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -49,13 +59,7 @@ class PrecisionSafeTransformer(Transformer):
             if self.pre_hook:
                 data = self.pre_hook(data, typ, schema)
 
-            if isinstance(data, str):
-                data = data.replace(",", "")
-
-            try:
-                return True, Decimal(data)
-            except:  # pylint: disable=bare-except
-                return False, None
+            return transform_number(data)
 
         # pylint: disable=protected-access
         return super()._transform(data, typ, schema, path)
@@ -123,19 +127,51 @@ class RecordTransformer:
 
         return data
 
+    def _transform_schema(self, data: Dict[str, Any], schema, metadata=None):
+        if isinstance(schema, CompiledSchema):
+            return schema.transform(data, self._schema_transformer)
+
+        return self._schema_transformer.transform(data, schema, metadata)
+
     def transform(
         self,
         data: Dict[str, Any],
-        schema,
+        schema: Union[Dict[str, Any], CompiledSchema],
         context: DataContext,
         metadata=None,
     ) -> Generator[Dict[str, Any], None, None]:
+        """Transforms `data` according to `schema`
+
+        `schema` may be a CompiledSchema - such as a stream's
+        `compiled_schema` - in which case `metadata` is ignored in favor of
+        the metadata it was compiled with.
+        """
+
+        profile = get_stage_profile(context.tap_stream_id)
+
+        # pre_transform only returns a generator when it's a generator function
         if isgeneratorfunction(self.pre_transform):
-            for pretransformed_data in self.pre_transform(data, context):
-                yield self._schema_transformer.transform(
+            pretransformed: Iterator[Dict[str, Any]] = self.pre_transform(  # type: ignore[assignment]
+                data, context
+            )
+
+            if profile is not None:
+                pretransformed = profile.iter_timed(pretransformed, "pre_transform")
+
+            for pretransformed_data in pretransformed:
+                with time_stage(profile, "schema_transform"):
+                    transformed = self._transform_schema(
+                        pretransformed_data, schema, metadata
+                    )
+
+                yield transformed
+        else:
+            with time_stage(profile, "pre_transform"):
+                pretransformed_data = self.pre_transform(data, context)  # type: ignore[assignment]
+
+            with time_stage(profile, "schema_transform"):
+                transformed = self._transform_schema(
                     pretransformed_data, schema, metadata
                 )
-        else:
-            yield self._schema_transformer.transform(
-                self.pre_transform(data, context), schema, metadata
-            )
+
+            yield transformed
@@ -0,0 +1,388 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from decimal import Decimal
+import re
+from singer import get_logger
+from singer.transform import (
+    Error,
+    SchemaKey,
+    SchemaMismatch,
+    Transformer,
+    breadcrumb_path,
+)
+
+LOGGER = get_logger()
+
+# pylint: disable=invalid-name
+_RESULT = Tuple[bool, Any]
+_NODE = Callable[[Any, Transformer, List[Any]], _RESULT]
+_CONVERTER = Callable[[Any, Transformer, List[Any]], _RESULT]
+_BREADCRUMB = Tuple[str, ...]
+
+
+def transform_number(data: Any) -> _RESULT:
+    """Converts `data` to a Decimal as opposed to singer's float"""
+
+    if isinstance(data, str):
+        data = data.replace(",", "")
+
+    try:
+        return True, Decimal(data)
+    except:  # pylint: disable=bare-except
+        return False, None
+
+
+def _identity(data: Any, _, __) -> _RESULT:
+    return True, data
+
+
+def _compile_converter(typ: str, schema: Dict[str, Any]) -> _CONVERTER:
+    """Compiles PrecisionSafeTransformer._transform for a single type"""
+
+    # Mirrors PrecisionSafeTransformer._transform, which handles numbers
+    # before considering any format.
+    if typ == "number":
+
+        def convert_number(data, transformer, _):
+            if transformer.pre_hook:
+                data = transformer.pre_hook(data, typ, schema)
+
+            return transform_number(data)
+
+        return convert_number
+
+    convert = _compile_conversion(typ, schema)
+
+    def convert_with_pre_hook(data, transformer, path):
+        if transformer.pre_hook:
+            data = transformer.pre_hook(data, typ, schema)
+
+        return convert(data, transformer, path)
+
+    return convert_with_pre_hook
+
+
+# pylint: disable=too-many-return-statements
+def _compile_conversion(typ: str, schema: Dict[str, Any]) -> _CONVERTER:
+    """Compiles singer's Transformer._transform, after its pre_hook call"""
+
+    if typ == "null":
+        return lambda data, _, __: (
+            (True, None) if data is None or data == "" else (False, None)
+        )
+
+    if schema.get("format") == "date-time":
+
+        def convert_datetime(data, transformer, _):
+            # pylint: disable=protected-access
+            data = transformer._transform_datetime(data)
+
+            return (False, None) if data is None else (True, data)
+
+        return convert_datetime
+
+    if schema.get("format") == "singer.decimal":
+        return lambda data, _, __: _transform_singer_decimal(data)
+
+    if typ == "object":
+        return _compile_object(
+            schema.get("properties", {}), schema.get(SchemaKey.pattern_properties)
+        )
+
+    if typ == "array":
+        return _compile_array(schema)
+
+    if typ == "string":
+        return lambda data, _, __: _transform_string(data)
+
+    if typ == "integer":
+        return lambda data, _, __: _transform_integer(data)
+
+    if typ == "boolean":
+        return lambda data, _, __: _transform_boolean(data)
+
+    return lambda _, __, ___: (False, None)
+
+
+def _transform_singer_decimal(data: Any) -> _RESULT:
+    if data is None:
+        return False, None
+
+    if isinstance(data, (str, float, int)):
+        try:
+            return True, str(Decimal(str(data)))
+        except:  # pylint: disable=bare-except
+            return False, None
+    elif isinstance(data, Decimal):
+        try:
+            if data.is_snan():
+                return True, "NaN"
+
+            return True, str(data)
+        except:  # pylint: disable=bare-except
+            return False, None
+
+    return False, None
+
+
+def _transform_string(data: Any) -> _RESULT:
+    if data is None:
+        return False, None
+
+    try:
+        return True, str(data)
+    except:  # pylint: disable=bare-except
+        return False, None
+
+
+def _transform_integer(data: Any) -> _RESULT:
+    if isinstance(data, str):
+        data = data.replace(",", "")
+
+    try:
+        return True, int(data)
+    except:  # pylint: disable=bare-except
+        return False, None
+
+
+def _transform_boolean(data: Any) -> _RESULT:
+    if isinstance(data, str) and data.lower() == "false":
+        return True, False
+
+    try:
+        return True, bool(data)
+    except:  # pylint: disable=bare-except
+        return False, None
+
+
+def _compile_object(
+    properties: Dict[str, Any], pattern_properties: Optional[Dict[str, Any]]
+) -> _CONVERTER:
+    if properties == {} and not pattern_properties:
+        return lambda data, _, __: (isinstance(data, dict), data)
+
+    property_nodes = {key: compile_node(value) for key, value in properties.items()}
+    patterns = [
+        (pattern, sub_schema, compile_node(sub_schema))
+        for pattern, sub_schema in (pattern_properties or {}).items()
+    ]
+
+    def pattern_node(key: str) -> Optional[_NODE]:
+        matches = [
+            (sub_schema, node)
+            for pattern, sub_schema, node in patterns
+            if re.match(pattern, key)
+        ]
+
+        if not matches:
+            return None
+
+        return _compile_any_of(
+            {"anyOf": [sub_schema for sub_schema, _ in matches]},
+            [node for _, node in matches],
+        )
+
+    def convert_object(data, transformer, path):
+        if not isinstance(data, dict):
+            return False, data
+
+        result = {}
+        success = True
+
+        for key, value in data.items():
+            node = property_nodes.get(key)
+
+            if node is None and patterns:
+                node = pattern_node(key)
+
+            if node is None:
+                transformer.removed.add(".".join(map(str, path + [key])))
+                continue
+
+            path.append(key)
+            sub_success, result[key] = node(value, transformer, path)
+            path.pop()
+
+            success = success and sub_success
+
+        return success, result
+
+    return convert_object
+
+
+def _compile_array(schema: Dict[str, Any]) -> _CONVERTER:
+    items_node: Optional[_NODE] = (
+        compile_node(schema["items"]) if "items" in schema else None
+    )
+
+    def convert_array(data, transformer, path):
+        # singer looks schema["items"] up before checking the data's type
+        node: _NODE = items_node if items_node is not None else schema["items"]
+
+        if not isinstance(data, list):
+            return False, data
+
+        result = []
+        success = True
+
+        for i, row in enumerate(data):
+            path.append(i)
+            sub_success, subdata = node(row, transformer, path)
+            path.pop()
+
+            success = success and sub_success
+            result.append(subdata)
+
+        return success, result
+
+    return convert_array
+
+
+def _compile_any_of(schema: Dict[str, Any], nodes: List[_NODE]) -> _NODE:
+    def transform_any_of(data, transformer, path):
+        for node in nodes:
+            success, transformed_data = node(data, transformer, path)
+
+            if success:
+                return success, transformed_data
+
+        transformer.errors.append(
+            Error(list(path), data, schema, logging_level=LOGGER.level)
+        )
+        return False, None
+
+    return transform_any_of
+
+
+def _move_null_type_last(schema: Dict[str, Any]) -> None:
+    types = schema["type"]
+
+    if isinstance(types, list) and "null" in types:
+        # Replaced rather than mutated, as streams may be synced concurrently
+        schema["type"] = [typ for typ in types if typ != "null"] + ["null"]
+
+
+def compile_node(schema: Dict[str, Any]) -> _NODE:
+    """Compiles singer's Transformer.transform_recur for `schema`"""
+
+    if "anyOf" in schema:
+        return _compile_any_of(
+            schema, [compile_node(sub_schema) for sub_schema in schema["anyOf"]]
+        )
+
+    if "type" not in schema:
+        return _identity
+
+    types = schema["type"]
+    if not isinstance(types, list):
+        types = [types]
+
+    # singer always tries "null" last
+    if "null" in types:
+        types = list(types)
+        types.remove("null")
+        types.append("null")
+
+    converters = [_compile_converter(typ, schema) for typ in types]
+    reordered_types = False
+
+    def transform_types(data, transformer, path):
+        nonlocal reordered_types
+
+        # singer moves "null" to the end of the schema's own type list when
+        # first transforming against it, which shows in Error messages.
+        if not reordered_types:
+            _move_null_type_last(schema)
+            reordered_types = True
+
+        for convert in converters:
+            success, transformed_data = convert(data, transformer, path)
+
+            if success:
+                return success, transformed_data
+
+        transformer.errors.append(
+            Error(list(path), data, schema, logging_level=LOGGER.level)
+        )
+        return False, None
+
+    return transform_types
+
+
+def _breadcrumb_prefixes(metadata: Dict[_BREADCRUMB, Any]) -> Set[_BREADCRUMB]:
+    prefixes = set()
+
+    for breadcrumb in metadata:
+        for i in range(len(breadcrumb)):
+            prefixes.add(breadcrumb[:i])
+
+    return prefixes
+
+
+class CompiledSchema:
+    """A stream's schema and metadata compiled for transforming records
+
+    singer's Transformer interprets the schema anew for every record and
+    property. Instead, the schema is walked once into a tree of closures
+    performing the exact same conversions, pre_hook calls and bookkeeping.
+
+    `transform` is equivalent to `transformer.transform(data, schema, metadata)`,
+    using `transformer` only for its configuration (pre_hook and
+    integer_datetime_fmt) and to track removed/filtered paths and errors.
+    """
+
+    def __init__(
+        self,
+        schema: Dict[str, Any],
+        metadata: Optional[Dict[_BREADCRUMB, Dict[str, Any]]] = None,
+    ):
+        self.schema = schema
+        self.metadata = metadata or {}
+
+        # Filtering below a breadcrumb is a no-op unless some metadata is
+        # nested beneath it.
+        self._filtered_prefixes = _breadcrumb_prefixes(self.metadata)
+        self._node = compile_node(schema)
+
+    def _filter_data_by_metadata(
+        self, data: Any, transformer: Transformer, parent: _BREADCRUMB = ()
+    ) -> Any:
+        """ Equivalent to Transformer.filter_data_by_metadata """
+
+        if parent not in self._filtered_prefixes:
+            return data
+
+        if isinstance(data, dict):
+            for field_name in list(data.keys()):
+                breadcrumb = parent + ("properties", field_name)
+                field_metadata = self.metadata.get(breadcrumb, {})
+                inclusion = field_metadata.get("inclusion")
+
+                if inclusion == "automatic":
+                    continue
+
+                if field_metadata.get("selected") is False or inclusion == "unsupported":
+                    data.pop(field_name, None)
+                    transformer.filtered.add(breadcrumb_path(breadcrumb))
+                else:
+                    data[field_name] = self._filter_data_by_metadata(
+                        data[field_name], transformer, breadcrumb
+                    )
+
+        if isinstance(data, list):
+            breadcrumb = parent + ("items",)
+            data = [
+                self._filter_data_by_metadata(d, transformer, breadcrumb) for d in data
+            ]
+
+        return data
+
+    def transform(self, data: Any, transformer: Transformer) -> Any:
+        if self.metadata:
+            data = self._filter_data_by_metadata(data, transformer)
+
+        success, transformed_data = self._node(data, transformer, [])
+
+        if not success:
+            raise SchemaMismatch(transformer.errors)
+
+        return transformed_data
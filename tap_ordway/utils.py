@@ -1,10 +1,19 @@
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+from itertools import chain
 from time import time
 from inflection import underscore
 from singer.bookmarks import get_bookmark
-from singer.messages import ActivateVersionMessage, RecordMessage, write_message
-from singer.utils import now, strptime_to_utc
+from singer.messages import (
+    ActivateVersionMessage,
+    RecordMessage,
+    SchemaMessage,
+    StateMessage,
+)
+from singer.utils import now
 import tap_ordway.configs
+from .api.pagination import PageCursor
+from .output import get_message_writer
+from .timestamps import parse_timestamp
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -23,11 +32,29 @@ def print_record(
 ):
     """ Writes record data to stdout """
 
-    write_message(
+    get_message_writer().write_message(
         RecordMessage(tap_stream_id, record, version, time_extracted=now())
     )  # pragma: no cover
 
 
+def write_state(value: Dict[str, Any]) -> None:
+    """ Writes a STATE message to stdout, along with any buffered messages """
+
+    get_message_writer().write_message(StateMessage(value=value))
+
+
+def write_schema(
+    stream_name: str, schema: Dict[str, Any], key_properties: List[str]
+) -> None:
+    """ Writes a SCHEMA message to stdout """
+
+    get_message_writer().write_message(
+        SchemaMessage(
+            stream=stream_name, schema=schema, key_properties=key_properties
+        )
+    )
+
+
 def get_full_table_version() -> int:
     """ Generates a version for FULL_TABLE streams """
 
@@ -59,15 +86,38 @@ def get_filter_datetime(
             state, stream.tap_stream_id, stream.replication_key, filter_datetime_str
         )
 
-    filter_datetime = strptime_to_utc(filter_datetime_str)
+    filter_datetime = parse_timestamp(filter_datetime_str)
 
     return filter_datetime
 
 
+def get_page_cursor(
+    stream: "StreamABC", state: Dict[str, Any]
+) -> Optional[PageCursor]:
+    """Retrieves the page an interrupted FULL_TABLE sync of the stream may
+    be resumed from, if `resume_full_table` is enabled
+    """
+
+    if not tap_ordway.configs.resume_full_table or stream.is_valid_incremental:
+        return None
+
+    page_cursor = get_bookmark(state, stream.tap_stream_id, "page_cursor")
+
+    if not isinstance(page_cursor, dict):
+        return None
+
+    try:
+        return PageCursor(int(page_cursor["page"]), int(page_cursor["size"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
 def write_activate_version(tap_stream_id: str, version: Optional[int]) -> None:
     """ Writes an ACTIVATE_VERSION message to stdout """
 
-    write_message(ActivateVersionMessage(tap_stream_id, version))  # pragma: no cover
+    get_message_writer().write_message(
+        ActivateVersionMessage(tap_stream_id, version)
+    )  # pragma: no cover
 
 
 def denest(obj: Dict[str, Any], path: Tuple[str, ...]) -> List[Dict[str, Any]]:
@@ -92,23 +142,29 @@ def denest(obj: Dict[str, Any], path: Tuple[str, ...]) -> List[Dict[str, Any]]:
         }]
     """
 
-    if len(path) == 0:
-        return [obj]
+    return list(iter_denest(obj, path))
 
-    results: List[Any] = []
 
-    val = obj.get(path[0])
+def iter_denest(
+    obj: Dict[str, Any], path: Tuple[str, ...]
+) -> Iterator[Dict[str, Any]]:
+    """Lazily denest a dictionary, iterating over what `denest` returns
+    without copying any list along the path
+    """
 
-    if val is None:
-        return results
+    if len(path) == 0:
+        return iter((obj,))
+
+    val = obj.get(path[0])
+    rest = path[1:]
 
     if isinstance(val, list):
-        for elem in val:
-            results = results + denest(elem, path[1:])  # type: ignore
-    elif isinstance(val, dict):
-        if len(path) == 1:
-            results.append(val)
-        else:
-            results = results + denest(val, path[1:])  # type: ignore
-
-    return results
+        if not rest:
+            return iter(val)
+
+        return chain.from_iterable(iter_denest(elem, rest) for elem in val)
+
+    if isinstance(val, dict):
+        return iter_denest(val, rest)
+
+    return iter(())
@@ -0,0 +1,148 @@
+from unittest import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from tap_ordway.api import AsyncRequestHandler, RequestHandler
+from tap_ordway.api.aio import EventLoopThread
+
+
+class AsyncRequestHandlerTestCase(TestCase):
+    def setUp(self):
+        self.request_handler = AsyncRequestHandler(
+            "/charges", page_size=45, stop_on_short_pages=False
+        )
+        self.mocked_data_context = MagicMock()
+
+        self.get_patcher = patch.object(
+            AsyncRequestHandler, "_get", new_callable=AsyncMock
+        )
+        self.mocked_get = self.get_patcher.start()
+
+    def tearDown(self):
+        self.get_patcher.stop()
+
+    def fetch(self):
+        async def collect():
+            return [
+                record
+                async for record in self.request_handler.fetch(self.mocked_data_context)
+            ]
+
+        with patch.object(
+            self.request_handler.request_handler, "resolve_params", return_value={}
+        ):
+            return asyncio.run(collect())
+
+    def test_from_request_handler(self):
+        rate_limiter = MagicMock()
+        request_handler = RequestHandler(
+            "/customers/{id}/payment_methods",
+            page_size=10,
+            sort="id",
+            rate_limiter=rate_limiter,
+            stop_on_short_pages=False,
+        )
+
+        async_request_handler = AsyncRequestHandler.from_request_handler(
+            request_handler
+        )
+
+        self.assertIsNot(async_request_handler.request_handler, request_handler)
+        self.assertEqual(
+            async_request_handler.request_handler.endpoint_template,
+            "/customers/{id}/payment_methods",
+        )
+        self.assertEqual(async_request_handler.page_size, 10)
+        self.assertEqual(async_request_handler.request_handler.sort, "id")
+        self.assertIs(async_request_handler.request_handler.rate_limiter, rate_limiter)
+        self.assertFalse(async_request_handler.request_handler.stop_on_short_pages)
+
+    @patch("tap_ordway.api.aio.TAP_CONFIG")
+    def test_fetch_requests_pages_until_empty(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 0
+        self.mocked_get.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+
+        self.assertListEqual(self.fetch(), [{"id": 1}, {"id": 2}, {"id": 3}])
+        self.assertListEqual(
+            [call_args[0][1] for call_args in self.mocked_get.call_args_list],
+            [
+                {"sort": None, "size": 45, "page": 1},
+                {"sort": None, "size": 45, "page": 2},
+                {"sort": None, "size": 45, "page": 3},
+            ],
+        )
+        self.assertEqual(self.request_handler.pages_consumed, 3)
+
+    @patch("tap_ordway.api.aio.TAP_CONFIG")
+    def test_fetch_with_prefetch_pages_keeps_record_order(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 4
+
+        async def get_page(_, params):
+            # Later pages respond first
+            await asyncio.sleep(0.001 * (10 - params["page"] % 10))
+
+            return [{"id": params["page"]}] if params["page"] <= 10 else []
+
+        self.mocked_get.side_effect = get_page
+
+        self.assertListEqual(self.fetch(), [{"id": i} for i in range(1, 11)])
+        self.assertEqual(self.request_handler.pages_consumed, 11)
+
+    @patch("tap_ordway.api.aio.TAP_CONFIG")
+    def test_fetch_with_prefetch_pages_stops_on_short_pages(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 2
+        self.request_handler.request_handler.stop_on_short_pages = True
+        self.mocked_get.side_effect = lambda _, params: (
+            [{"id": i} for i in range(45)] if params["page"] == 1 else [{"id": 45}]
+        )
+
+        self.assertEqual(len(self.fetch()), 46)
+        self.assertEqual(self.request_handler.pages_consumed, 2)
+
+    @patch("tap_ordway.api.aio.TAP_CONFIG")
+    def test_fetch_with_prefetch_pages_limits_pages_in_flight(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 2
+        in_flight = 0
+        max_in_flight = 0
+
+        async def get_page(_, params):
+            nonlocal in_flight, max_in_flight
+
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+            return [{"id": params["page"]}] if params["page"] <= 5 else []
+
+        self.mocked_get.side_effect = get_page
+
+        self.assertEqual(len(self.fetch()), 5)
+        self.assertEqual(max_in_flight, 2)
+
+    @patch("tap_ordway.api.aio.TAP_CONFIG")
+    def test_fetch_with_prefetch_pages_raises_request_errors(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 2
+        self.mocked_get.side_effect = [[{"id": 1}], ValueError("failed"), []]
+
+        with self.assertRaises(ValueError):
+            self.fetch()
+
+
+class EventLoopThreadTestCase(TestCase):
+    def test_iterate(self):
+        async def count(n):
+            for i in range(n):
+                await asyncio.sleep(0)
+                yield i
+
+        event_loop_thread = EventLoopThread()
+
+        try:
+            self.assertListEqual(
+                list(event_loop_thread.iterate(count(5))), [0, 1, 2, 3, 4]
+            )
+            self.assertEqual(
+                event_loop_thread.run(asyncio.sleep(0, "done")).result(), "done"
+            )
+        finally:
+            event_loop_thread.close()
@@ -2,8 +2,17 @@ from unittest import TestCase
 from unittest.mock import MagicMock, patch
 from datetime import datetime
 from pytz import UTC
-from requests.exceptions import RequestException
-from tap_ordway.api.base import RequestHandler, _get_api_version, _get_headers, _get_url
+from requests import Session
+from requests.exceptions import ReadTimeout, RequestException
+from tap_ordway.api.base import (
+    RequestHandler,
+    RequestTemplate,
+    _get_api_version,
+    _get_headers,
+    _get_url,
+    get_request_template,
+)
+from tap_ordway.api.pagination import Page, PageCursor
 
 
 @patch("tap_ordway.api.base.TAP_CONFIG")
@@ -31,6 +40,7 @@ def test_get_headers(mocked_tap_config):
         "X-API-KEY": "secret123",
         "User-Agent": "tap-ordway v1.0.0 (https://github.com/ordwaylabs/tap-ordway)",
         "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
     }
 
     assert _get_headers() == expected_results
@@ -41,6 +51,12 @@ def test_get_headers(mocked_tap_config):
 
     assert _get_headers() == expected_results
 
+    # Test without compression
+    mocked_tap_config.http_compression = False
+    expected_results["Accept-Encoding"] = "identity"
+
+    assert _get_headers() == expected_results
+
 
 class GetURLTestCase(TestCase):
     def setUp(self):
@@ -82,16 +98,62 @@ class GetURLTestCase(TestCase):
         self.assertEqual(_get_url("/charges"), expected_url)
 
 
+@patch("tap_ordway.api.base.TAP_CONFIG")
+class GetRequestTemplateTestCase(TestCase):
+    def setUp(self):
+        self.get_headers_patcher = patch(
+            "tap_ordway.api.base._get_headers", return_value={"X-API-KEY": "secret123"}
+        )
+        self.mocked_get_headers = self.get_headers_patcher.start()
+        self.template_patcher = patch("tap_ordway.api.base._request_template", None)
+        self.template_patcher.start()
+
+    def tearDown(self):
+        self.get_headers_patcher.stop()
+        self.template_patcher.stop()
+
+    def _configure(self, mocked_tap_config):
+        mocked_tap_config.api_url = "https://test.ordwaylabs.com/api/v22"
+        mocked_tap_config.staging = False
+        mocked_tap_config.api_version = None
+        mocked_tap_config.http_compression = True
+        mocked_tap_config.api_credentials = {"api_key": "secret123"}
+
+    def test_reuses_template_until_config_changes(self, mocked_tap_config):
+        self._configure(mocked_tap_config)
+        template = get_request_template()
+
+        self.assertIs(get_request_template(), template)
+        self.assertEqual(self.mocked_get_headers.call_count, 1)
+        self.assertEqual(
+            template.get_url("/charges"), "https://test.ordwaylabs.com/api/v22/charges"
+        )
+
+        mocked_tap_config.api_credentials = {"api_key": "secret456"}
+
+        self.assertIsNot(get_request_template(), template)
+        self.assertEqual(self.mocked_get_headers.call_count, 2)
+
+    def test_headers_are_immutable(self, mocked_tap_config):
+        self._configure(mocked_tap_config)
+
+        with self.assertRaises(TypeError):
+            get_request_template().headers["X-API-KEY"] = "secret456"
+
+
 class RequestHandlerTestCase(TestCase):
     def setUp(self):
         self.get_patcher = patch(
             "tap_ordway.api.base.RequestHandler._get", autospec=True
         )
         self.mocked_get = self.get_patcher.start()
-        self.request_handler = RequestHandler("/charges", page_size=45)
+        self.request_handler = RequestHandler(
+            "/charges", page_size=45, stop_on_short_pages=False
+        )
 
         self.mocked_data_context = MagicMock()
         self.mocked_data_context.parent_record = None
+        self.mocked_data_context.until_datetime = None
 
     def tearDown(self):
         self.get_patcher.stop()
@@ -170,3 +232,448 @@ class RequestHandlerTestCase(TestCase):
             self.mocked_get.assert_called_once_with(
                 self.request_handler, "/charges", {"sort": None, "size": 45, "page": 1}
             )
+
+    def test_fetch_requests_pages_until_empty(self):
+        self.mocked_get.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(self.mocked_data_context))
+
+        self.assertListEqual(results, [{"id": 1}, {"id": 2}, {"id": 3}])
+        self.assertEqual(self.mocked_get.call_count, 3)
+
+    def test_fetch_stops_on_short_pages(self):
+        """Ensure no request is made for the empty page after a short one"""
+
+        self.request_handler.stop_on_short_pages = True
+        self.mocked_get.side_effect = [[{"id": i} for i in range(45)], [{"id": 45}]]
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(self.mocked_data_context))
+
+        self.assertEqual(len(results), 46)
+        self.assertEqual(self.mocked_get.call_count, 2)
+        self.assertEqual(self.request_handler.pages_consumed, 2)
+
+    def test_fetch_keeps_going_past_pages_capped_by_ordway(self):
+        """Ensure pages Ordway returned fewer results for than requested
+        aren't taken for the last one, as long as they're as large as any
+        """
+
+        self.request_handler.stop_on_short_pages = True
+        records = [{"id": i} for i in range(45)]
+        # Ordway only returns 20 records at a time
+        self.mocked_get.side_effect = lambda _, __, params: records[
+            (params["page"] - 1) * 20 : params["page"] * 20
+        ]
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(self.mocked_data_context))
+
+        self.assertListEqual(results, records)
+        self.assertEqual(self.mocked_get.call_count, 3)
+
+    def test_fetch_stops_when_pagination_headers_say_so(self):
+        last_page = Page({"id": i} for i in range(45))
+        last_page.has_next = False
+        self.mocked_get.side_effect = [last_page]
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(self.mocked_data_context))
+
+        self.assertEqual(len(results), 45)
+        self.assertEqual(self.mocked_get.call_count, 1)
+
+    def test_fetch_from_cursor_yields_page_cursors(self):
+        self.mocked_get.side_effect = [[{"id": 1}], [{"id": 2}], []]
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(
+                self.request_handler.fetch(
+                    self.mocked_data_context,
+                    cursor=PageCursor(page=3, size=10),
+                    yield_cursors=True,
+                )
+            )
+
+        self.assertListEqual(
+            results,
+            [
+                PageCursor(3, 10),
+                {"id": 1},
+                PageCursor(4, 10),
+                {"id": 2},
+                PageCursor(5, 10),
+            ],
+        )
+
+    @patch("tap_ordway.api.base.TAP_CONFIG")
+    def test_fetch_with_prefetch_pages_keeps_record_order(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 2
+        mocked_tap_config.stream_responses = False
+        mocked_tap_config.adaptive_page_size = False
+        requested_pages = []
+
+        def get_page(_, __, params):
+            requested_pages.append(params["page"])
+            return [{"id": params["page"]}] if params["page"] <= 10 else []
+
+        self.mocked_get.side_effect = get_page
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(self.mocked_data_context))
+
+        self.assertListEqual(results, [{"id": i} for i in range(1, 11)])
+        self.assertListEqual(requested_pages, list(range(1, 12)))
+
+    @patch("tap_ordway.api.base.TAP_CONFIG")
+    def test_fetch_with_prefetch_pages_raises_request_errors(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 2
+        mocked_tap_config.stream_responses = False
+        mocked_tap_config.adaptive_page_size = False
+        self.mocked_get.side_effect = [[{"id": 1}], RequestException("failed")]
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            records = self.request_handler.fetch(self.mocked_data_context)
+
+            self.assertDictEqual(next(records), {"id": 1})
+
+            with self.assertRaises(RequestException):
+                next(records)
+
+
+    @patch("tap_ordway.api.base.TAP_CONFIG")
+    def test_fetch_with_adaptive_page_size_keeps_offsets(self, mocked_tap_config):
+        """Ensure changing the page size mid-fetch neither skips nor repeats
+        records, including when a page times out
+        """
+
+        mocked_tap_config.prefetch_pages = 0
+        mocked_tap_config.stream_responses = False
+        mocked_tap_config.adaptive_page_size = True
+        mocked_tap_config.target_page_seconds = 5
+        mocked_tap_config.min_page_size = 10
+        mocked_tap_config.max_page_size = 180
+        records = [{"id": i} for i in range(1000)]
+        requests = []
+
+        def get_page(_, __, params, retry_timeouts=True):
+            self.assertFalse(retry_timeouts)
+            requests.append((params["page"], params["size"]))
+
+            if params["size"] == 180:
+                raise ReadTimeout("timed out")
+
+            offset = (params["page"] - 1) * params["size"]
+            return records[offset : offset + params["size"]]
+
+        self.mocked_get.side_effect = get_page
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(self.mocked_data_context))
+
+        self.assertListEqual(results, records)
+        # Grows once aligned, then shrinks back once 180 times out
+        self.assertListEqual(
+            requests,
+            [(1, 45), (2, 45), (2, 90), (2, 180)]
+            + [(page, 90) for page in range(3, 14)],
+        )
+
+    @patch("tap_ordway.api.base.TAP_CONFIG")
+    def test_fetch_with_adaptive_page_size_shrinks_to_unaligned_sizes(
+        self, mocked_tap_config
+    ):
+        """Ensure shrinking to a size the offset isn't a multiple of requests
+        the page holding the offset, skipping the records already yielded
+        """
+
+        mocked_tap_config.prefetch_pages = 0
+        mocked_tap_config.stream_responses = False
+        mocked_tap_config.adaptive_page_size = True
+        mocked_tap_config.target_page_seconds = 5
+        mocked_tap_config.min_page_size = 10
+        mocked_tap_config.max_page_size = 45
+        records = [{"id": i} for i in range(100)]
+        requests = []
+
+        def get_page(_, __, params, retry_timeouts=True):
+            requests.append((params["page"], params["size"]))
+
+            if params["size"] == 45 and params["page"] == 2:
+                raise ReadTimeout("timed out")
+
+            offset = (params["page"] - 1) * params["size"]
+            return records[offset : offset + params["size"]]
+
+        self.mocked_get.side_effect = get_page
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(self.mocked_data_context))
+
+        self.assertListEqual(results, records)
+        # Page 3 of 22 starts at record 44, one before the first one left
+        self.assertListEqual(
+            requests,
+            [(1, 45), (2, 45)] + [(page, 22) for page in range(3, 7)],
+        )
+
+
+@patch("tap_ordway.api.base.TAP_CONFIG")
+class RequestHandlerKeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.get_patcher = patch(
+            "tap_ordway.api.base.RequestHandler._get", autospec=True
+        )
+        self.mocked_get = self.get_patcher.start()
+        self.request_handler = RequestHandler("/invoices", page_size=4, sort="updated_date,id")
+
+        self.context = MagicMock(
+            parent_record=None,
+            filter_datetime=datetime(2019, 12, 31, tzinfo=UTC),
+            until_datetime=None,
+        )
+        self.context.stream.is_valid_incremental = True
+        self.context.stream.replication_key = "updated_date"
+
+        # 5 records share 2020-01-03, more than fit a page
+        self.records = [
+            {"id": f"INV-{i:02}", "updated_date": f"2020-01-0{day}T00:00:00.000Z"}
+            for i, day in enumerate([1, 2, 2, 3, 3, 3, 3, 3, 4, 5])
+        ]
+        self.requests = []
+
+        def get_page(_, __, params):
+            """ Filters, sorts and pages like Ordway """
+
+            if "updated_date>=" in params:
+                self.assertNotIn("updated_date>", params)
+                operator = ">="
+            else:
+                operator = ">"
+
+            bound = params[f"updated_date{operator}"]
+            self.requests.append((operator, bound, params["page"]))
+            matching = sorted(
+                (
+                    record
+                    for record in self.records
+                    if record["updated_date"][:19] > bound[:19]
+                    or (operator == ">=" and record["updated_date"][:19] == bound[:19])
+                ),
+                key=lambda record: (record["updated_date"], record["id"]),
+            )
+            offset = (params["page"] - 1) * params["size"]
+
+            return matching[offset : offset + params["size"]]
+
+        self.mocked_get.side_effect = get_page
+
+    def tearDown(self):
+        self.get_patcher.stop()
+
+    def configure(self, mocked_tap_config):
+        mocked_tap_config.prefetch_pages = 0
+        mocked_tap_config.stream_responses = False
+        mocked_tap_config.adaptive_page_size = False
+        mocked_tap_config.keyset_pagination = True
+
+    def test_get_keyset_fields(self, mocked_tap_config):
+        self.configure(mocked_tap_config)
+
+        self.assertTupleEqual(
+            self.request_handler.get_keyset_fields(self.context), ("updated_date", "id")
+        )
+
+        mocked_tap_config.keyset_pagination = False
+        self.assertIsNone(self.request_handler.get_keyset_fields(self.context))
+
+    def test_fetch_seeks_past_last_record(self, mocked_tap_config):
+        self.configure(mocked_tap_config)
+
+        results = list(self.request_handler.fetch(self.context))
+
+        self.assertListEqual(results, self.records)
+        self.assertListEqual(
+            [(operator, bound[:10], page) for operator, bound, page in self.requests],
+            [
+                (">", "2019-12-31", 1),
+                (">=", "2020-01-03", 1),
+                # Only paged within 2020-01-03, as it spans more than a page
+                (">=", "2020-01-03", 2),
+            ],
+        )
+
+    def test_fetch_keeps_records_sharing_a_key_across_pages(self, mocked_tap_config):
+        """Ensure records sharing the last key of a page, which didn't fit
+        it, aren't skipped by seeking past that key
+        """
+
+        self.configure(mocked_tap_config)
+        self.records = [
+            {"id": f"INV-{i:02}", "updated_date": f"2020-01-0{day}T00:00:00.000Z"}
+            for i, day in enumerate([1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 4])
+        ]
+
+        results = list(self.request_handler.fetch(self.context))
+
+        self.assertListEqual(results, self.records)
+        self.assertListEqual(
+            [(operator, bound[:10], page) for operator, bound, page in self.requests],
+            [
+                (">", "2019-12-31", 1),
+                (">=", "2020-01-02", 1),
+                (">=", "2020-01-02", 2),
+                (">=", "2020-01-03", 1),
+                (">=", "2020-01-03", 2),
+            ],
+        )
+
+    def test_fetch_neither_skips_nor_repeats_records_updated_mid_sync(
+        self, mocked_tap_config
+    ):
+        self.configure(mocked_tap_config)
+        records = self.request_handler.fetch(self.context)
+        results = [next(records) for _ in range(4)]
+
+        # Page numbers would shift every record after it by one
+        updated = self.records.pop(1)
+        self.records.append({**updated, "updated_date": "2020-01-06T00:00:00.000Z"})
+
+        results.extend(records)
+
+        self.assertListEqual(
+            [result["id"] for result in results],
+            [f"INV-{i:02}" for i in range(10)] + ["INV-01"],
+        )
+
+
+@patch(
+    "tap_ordway.api.base.get_request_template",
+    return_value=RequestTemplate("https://api.ordwaylabs.com/api/v1/", {}),
+)
+class RequestHandlerThrottlingTestCase(TestCase):
+    def setUp(self):
+        self.rate_limiter = MagicMock()
+        self.rate_controller = MagicMock()
+        self.request_handler = RequestHandler(
+            "/charges",
+            rate_limiter=self.rate_limiter,
+            rate_controller=self.rate_controller,
+        )
+        self.session_patcher = patch.object(self.request_handler, "_session")
+        self.mocked_session = self.session_patcher.start()
+
+    def tearDown(self):
+        self.session_patcher.stop()
+
+    def test_retries_throttled_requests(self, *_):
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "2"})
+        succeeded = MagicMock(status_code=200, headers={})
+        succeeded.content = b'[{"id": 1}]'
+        self.mocked_session.get.side_effect = [throttled, throttled, succeeded]
+
+        results = self.request_handler._get("/charges", {})  # pylint: disable=protected-access
+
+        self.assertListEqual(results, [{"id": 1}])
+        self.assertEqual(self.rate_limiter.acquire.call_count, 3)
+        self.assertEqual(self.rate_controller.throttled.call_count, 2)
+        self.rate_controller.throttled.assert_called_with(2.0, endpoint="/charges")
+        self.rate_controller.succeeded.assert_called_once_with({})
+
+    @patch("tap_ordway.api.base.TAP_CONFIG")
+    def test_fetch_with_stream_responses_parses_pages_as_received(
+        self, mocked_tap_config, *_
+    ):
+        mocked_tap_config.stream_responses = True
+        mocked_tap_config.prepared_requests = False
+        self.request_handler.stop_on_short_pages = False
+        pages = [b'[{"id": 1}, {"id": 2}]', b'{"id": 3}', b"[]"]
+        responses = []
+
+        for page in pages:
+            response = MagicMock(status_code=200, headers={})
+            # Split mid-record, so records must be parsed across chunks
+            response.iter_content.return_value = [page[:5], page[5:]]
+            responses.append(response)
+
+        requested_pages = []
+
+        def get(*_, params, **__):
+            requested_pages.append(params["page"])
+            return responses[params["page"] - 1]
+
+        self.mocked_session.get.side_effect = get
+        context = MagicMock(parent_record=None)
+
+        with patch.object(self.request_handler, "resolve_params", return_value={}):
+            results = list(self.request_handler.fetch(context))
+
+        self.assertListEqual(results, [{"id": 1}, {"id": 2}, {"id": 3}])
+        self.assertListEqual(requested_pages, [1, 2, 3])
+        self.assertEqual(self.request_handler.pages_consumed, 3)
+
+        for response in responses:
+            response.close.assert_called_once()
+
+    def test_get_reads_pagination_headers(self, *_):
+        response = MagicMock(
+            status_code=200,
+            headers={"Link": '<https://api.ordwaylabs.com/api/v1/charges?page=1>; rel="prev"'},
+            content=b'[{"id": 1}]',
+        )
+        self.mocked_session.get.return_value = response
+
+        results = self.request_handler._get("/charges", {"page": 2, "size": 1})  # pylint: disable=protected-access
+
+        self.assertListEqual(results, [{"id": 1}])
+        self.assertIs(results.has_next, False)
+
+    def test_does_not_retry_throttled_requests_without_controller(self, *_):
+        self.request_handler._rate_controller = None  # pylint: disable=protected-access
+        throttled = MagicMock(status_code=429, headers={})
+        throttled.raise_for_status.side_effect = RequestException("throttled")
+        self.mocked_session.get.return_value = throttled
+
+        with patch("tap_ordway.api.base.expo", return_value=iter(lambda: 0, 1)):
+            with self.assertRaises(RequestException):
+                self.request_handler._get("/charges", {})  # pylint: disable=protected-access
+
+    def test_get_without_retry_timeouts_raises_first_timeout(self, *_):
+        self.mocked_session.get.side_effect = ReadTimeout("timed out")
+
+        with self.assertRaises(ReadTimeout):
+            self.request_handler._get("/charges", {}, retry_timeouts=False)  # pylint: disable=protected-access
+
+        self.assertEqual(self.mocked_session.get.call_count, 1)
+
+    @patch("tap_ordway.api.base.TAP_CONFIG")
+    def test_prepared_requests_only_vary_url(self, mocked_tap_config, *_):
+        mocked_tap_config.prepared_requests = True
+        mocked_tap_config.json_decoder = "json"
+        session = Session()
+        self.request_handler._session = session  # pylint: disable=protected-access
+        sent = []
+
+        def send(prepared, **kwargs):
+            sent.append((prepared, kwargs))
+            response = MagicMock(status_code=200, headers={})
+            response.content = b"[]"
+            return response
+
+        with patch.object(session, "send", side_effect=send), patch.object(
+            session, "prepare_request", wraps=session.prepare_request
+        ) as mocked_prepare_request:
+            for page in (1, 2):
+                self.request_handler._get("/charges", {"page": page, "size": 10})  # pylint: disable=protected-access
+
+        self.assertEqual(mocked_prepare_request.call_count, 1)
+        self.assertEqual(
+            [prepared.url for prepared, _ in sent],
+            [
+                "https://api.ordwaylabs.com/api/v1/charges?page=1&size=10",
+                "https://api.ordwaylabs.com/api/v1/charges?page=2&size=10",
+            ],
+        )
+        self.assertEqual(sent[0][0].method, "GET")
+        self.assertFalse(sent[0][1]["stream"])
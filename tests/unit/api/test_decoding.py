@@ -0,0 +1,85 @@
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+import json
+from tap_ordway.api.decoding import (
+    JSONArrayParser,
+    decode_json,
+    decode_orjson,
+    get_decoder,
+    iter_json_array,
+    orjson,
+)
+
+PAGE = json.dumps(
+    [
+        {"id": "INV-1", "total": 12.5, "lines": [{"amount": 1e-7}], "paid": True},
+        {"id": "INV-2", "total": 100, "customer": None, "name": "Café ☃"},
+    ],
+    ensure_ascii=False,
+).encode("utf-8")
+
+
+class JSONArrayParserTestCase(TestCase):
+    def test_parses_elements_across_any_chunking(self):
+        for chunk_size in (1, 2, 7, len(PAGE)):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = [
+                    PAGE[i : i + chunk_size] for i in range(0, len(PAGE), chunk_size)
+                ]
+
+                self.assertListEqual(list(iter_json_array(chunks)), json.loads(PAGE))
+
+    def test_returns_elements_once_received(self):
+        parser = JSONArrayParser()
+
+        self.assertListEqual(parser.feed(b'[{"id": 1}, {"id"'), [{"id": 1}])
+        self.assertListEqual(parser.feed(b': 2}, 12'), [{"id": 2}])
+        self.assertListEqual(parser.feed(b"34"), [])
+        self.assertListEqual(parser.feed(b"]"), [1234])
+        self.assertListEqual(parser.close(), [])
+
+    def test_with_empty_array(self):
+        self.assertListEqual(list(iter_json_array([b" [ ", b"] "])), [])
+
+    def test_with_object(self):
+        """Ensure a top-level object is returned whole, like a one-element array"""
+
+        self.assertListEqual(
+            list(iter_json_array([b'{"id"', b': "1"}'])), [{"id": "1"}]
+        )
+
+    def test_raises_for_invalid_json(self):
+        for chunks in ([b'[{"id": 1}'], [b'[{"id": 1} {"id": 2}]'], [b"[1]", b"[2]"]):
+            with self.subTest(chunks=chunks):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array(chunks))
+
+
+class GetDecoderTestCase(TestCase):
+    def test_with_json(self):
+        self.assertIs(get_decoder("json"), decode_json)
+
+    @skipIf(orjson is None, "orjson isn't installed")
+    def test_with_auto_and_orjson(self):
+        self.assertIs(get_decoder("auto"), decode_orjson)
+        self.assertIs(get_decoder("orjson"), decode_orjson)
+
+    @patch("tap_ordway.api.decoding.orjson", None)
+    def test_with_auto_without_orjson(self):
+        self.assertIs(get_decoder("auto"), decode_json)
+
+        with self.assertRaises(ValueError):
+            get_decoder("orjson")
+
+    def test_with_unknown_decoder(self):
+        with self.assertRaises(ValueError):
+            get_decoder("yaml")
+
+
+@skipIf(orjson is None, "orjson isn't installed")
+class DecodeOrjsonTestCase(TestCase):
+    def test_matches_json(self):
+        self.assertListEqual(decode_orjson(PAGE), decode_json(PAGE))
+
+    def test_falls_back_to_json_for_big_integers(self):
+        self.assertListEqual(decode_orjson(b"[%d]" % 2 ** 70), [2 ** 70])
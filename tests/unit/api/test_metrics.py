@@ -0,0 +1,44 @@
+from unittest import TestCase
+from unittest.mock import patch
+from tap_ordway.api.metrics import get_encoded_size, log_response_size
+
+
+class GetEncodedSizeTestCase(TestCase):
+    def test_prefers_wire_size(self):
+        self.assertEqual(
+            get_encoded_size({"Content-Length": "10", "Content-Encoding": "gzip"}, 50, 12),
+            12,
+        )
+
+    def test_falls_back_to_content_length(self):
+        self.assertEqual(
+            get_encoded_size({"Content-Length": "10", "Content-Encoding": "gzip"}, 50),
+            10,
+        )
+
+    def test_uncompressed_responses_use_decoded_size(self):
+        self.assertEqual(get_encoded_size({}, 50), 50)
+
+    def test_unknown_for_chunked_compressed_responses(self):
+        self.assertIsNone(get_encoded_size({"Content-Encoding": "gzip"}, 50))
+
+
+@patch("tap_ordway.api.metrics.log_metric")
+class LogResponseSizeTestCase(TestCase):
+    def test_logs_both_sizes(self, mocked_log_metric):
+        log_response_size("/invoices", {"Content-Encoding": "gzip"}, 50, 12)
+
+        points = [call.args[1] for call in mocked_log_metric.call_args_list]
+
+        self.assertEqual(
+            [(point.metric, point.value) for point in points],
+            [("http_response_bytes", 12), ("http_response_decoded_bytes", 50)],
+        )
+        self.assertEqual(
+            points[0].tags, {"endpoint": "/invoices", "content_encoding": "gzip"}
+        )
+
+    def test_skips_unknown_encoded_size(self, mocked_log_metric):
+        log_response_size("/invoices", {"Content-Encoding": "gzip"}, 50)
+
+        self.assertEqual(mocked_log_metric.call_count, 1)
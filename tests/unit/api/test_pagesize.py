@@ -0,0 +1,65 @@
+from unittest import TestCase
+from unittest.mock import patch
+from tap_ordway.api.pagesize import PageSizeController
+
+
+@patch("tap_ordway.api.pagesize.log_metric")
+class PageSizeControllerTestCase(TestCase):
+    def setUp(self):
+        self.controller = PageSizeController(
+            50, target_seconds=4, min_size=10, max_size=200, endpoint="/invoices"
+        )
+
+    def test_grows_on_fast_full_pages_up_to_max_size(self, _):
+        for size in (50, 100, 200, 200):
+            self.controller.record_page(size, size, 1.0)
+
+        self.assertEqual(self.controller.page_size, 200)
+
+    def test_does_not_grow_on_short_or_slow_pages(self, _):
+        self.controller.record_page(50, 49, 1.0)
+        self.controller.record_page(50, 50, 3.0)
+
+        self.assertEqual(self.controller.page_size, 50)
+
+    def test_shrinks_on_slow_pages_down_to_min_size(self, mocked_log_metric):
+        for size in (50, 25, 12, 10):
+            self.controller.record_page(size, size, 5.0)
+
+        # Odd sizes round down, without going below min_size
+        self.assertEqual(self.controller.page_size, 10)
+        self.assertEqual(mocked_log_metric.call_count, 3)
+
+    def test_ignores_pages_of_stale_sizes(self, _):
+        self.controller.record_page(100, 100, 1.0)
+
+        self.assertEqual(self.controller.page_size, 50)
+
+    def test_timed_out_shrinks_and_caps_growth(self, _):
+        self.assertTrue(self.controller.timed_out(50))
+        self.assertEqual(self.controller.page_size, 25)
+
+        self.controller.record_page(25, 25, 1.0)
+        self.assertEqual(self.controller.page_size, 25)
+
+        self.assertTrue(self.controller.timed_out(25))
+        self.assertEqual(self.controller.page_size, 12)
+
+        self.assertTrue(self.controller.timed_out(12))
+        self.assertFalse(self.controller.timed_out(10))
+        self.assertEqual(self.controller.page_size, 10)
+
+    def test_page_size_at_only_switches_at_aligned_offsets(self, _):
+        self.controller.record_page(50, 50, 1.0)
+
+        self.assertEqual(self.controller.page_size_at(50, 50), 50)
+        self.assertEqual(self.controller.page_size_at(100, 50), 100)
+
+    def test_page_size_at_shrinks_at_any_offset(self, _):
+        self.controller.timed_out(50)
+
+        self.assertEqual(self.controller.page_size_at(50, 50), 25)
+
+        self.controller.timed_out(25)
+
+        self.assertEqual(self.controller.page_size_at(50, 25), 12)
@@ -0,0 +1,57 @@
+from unittest import TestCase
+from requests.structures import CaseInsensitiveDict
+from tap_ordway.api.pagination import get_has_next_page, is_last_page, to_page
+
+
+class GetHasNextPageTestCase(TestCase):
+    def test_with_link_header(self):
+        link = (
+            '<https://api.ordwaylabs.com/api/v1/invoices?page=1>; rel="prev", '
+            '<https://api.ordwaylabs.com/api/v1/invoices?page=3>; rel="next"'
+        )
+
+        self.assertTrue(get_has_next_page({"Link": link}, 2, 50))
+        self.assertFalse(get_has_next_page({"Link": link.split(", ")[0]}, 2, 50))
+
+    def test_with_totals(self):
+        for headers, page, expected in [
+            ({"x-total-count": "100"}, 1, True),
+            ({"x-total-count": "100"}, 2, False),
+            ({"X-Total-Pages": "3"}, 2, True),
+            ({"X-Total-Pages": "3"}, 3, False),
+        ]:
+            with self.subTest(headers=headers, page=page):
+                self.assertIs(
+                    get_has_next_page(CaseInsensitiveDict(headers), page, 50), expected
+                )
+
+    def test_without_pagination_headers(self):
+        self.assertIsNone(get_has_next_page({}, 1, 50))
+        self.assertIsNone(get_has_next_page({"X-Total-Count": "?"}, 1, 50))
+        self.assertIsNone(get_has_next_page({"X-Total-Count": "100"}, None, None))
+
+
+class IsLastPageTestCase(TestCase):
+    def test_is_last_page(self):
+        for args, expected in [
+            ((0, True, 50, 50), True),
+            ((50, None, 50, 50), False),
+            ((49, None, 50, 50), True),
+            ((49, None, 50, 0), False),
+            ((49, True, 50, 50), False),
+            ((50, False, 50, 50), True),
+            ((49, None, 50), False),
+            # Ordway capped the page size to 20
+            ((20, None, 50, 20), False),
+            ((19, None, 50, 20), True),
+        ]:
+            with self.subTest(args=args):
+                self.assertIs(is_last_page(*args), expected)
+
+
+class ToPageTestCase(TestCase):
+    def test_wraps_objects(self):
+        page = to_page({"id": 1}, {"X-Total-Count": "1"}, {"page": 1, "size": 50})
+
+        self.assertListEqual(page, [{"id": 1}])
+        self.assertIs(page.has_next, False)
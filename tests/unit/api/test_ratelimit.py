@@ -0,0 +1,234 @@
+from unittest import TestCase
+from unittest.mock import patch
+import asyncio
+from os.path import join
+from tempfile import TemporaryDirectory
+from threading import Thread
+from tap_ordway.api.ratelimit import (
+    AdaptiveRateController,
+    FileTokenBucket,
+    TokenBucket,
+    get_rate_controller,
+    get_rate_limiter,
+    get_retry_after,
+)
+
+
+class TokenBucketTestCase(TestCase):
+    def setUp(self):
+        self.clock_patcher = patch.object(TokenBucket, "_clock", return_value=100.0)
+        self.mocked_clock = self.clock_patcher.start()
+
+    def tearDown(self):
+        self.clock_patcher.stop()
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+        with self.assertRaises(ValueError):
+            TokenBucket(5, capacity=0.5)
+
+    def test_allows_bursts_up_to_capacity(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+
+        self.assertListEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+    def test_refills_at_rate(self):
+        bucket = TokenBucket(rate=2, capacity=2)
+        bucket.reserve(2)
+
+        self.mocked_clock.return_value = 100.5
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+
+        # Never refills past capacity
+        self.mocked_clock.return_value = 200
+        self.assertListEqual([bucket.reserve() for _ in range(3)], [0, 0, 0.5])
+
+    def test_set_rate(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.reserve()
+
+        bucket.set_rate(4)
+        self.assertEqual(bucket.reserve(), 0.25)
+
+    @patch("tap_ordway.api.ratelimit.sleep")
+    def test_acquire_sleeps_off_debt(self, mocked_sleep):
+        bucket = TokenBucket(rate=4, capacity=1)
+
+        bucket.acquire()
+        mocked_sleep.assert_not_called()
+
+        bucket.acquire()
+        mocked_sleep.assert_called_once_with(0.25)
+
+    @patch("tap_ordway.api.ratelimit.asyncio.sleep")
+    def test_acquire_async(self, mocked_sleep):
+        bucket = TokenBucket(rate=4, capacity=1)
+
+        async def acquire_twice():
+            await bucket.acquire_async()
+            await bucket.acquire_async()
+
+        asyncio.run(acquire_twice())
+
+        mocked_sleep.assert_called_once_with(0.25)
+
+    def test_thread_safety(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        waits = []
+
+        def reserve_many():
+            for _ in range(100):
+                waits.append(bucket.reserve())
+
+        threads = [Thread(target=reserve_many) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Each reservation waits one second more than the previous one
+        self.assertListEqual(sorted(waits), [float(i) for i in range(400)])
+
+
+class FileTokenBucketTestCase(TestCase):
+    @patch.object(FileTokenBucket, "_clock", return_value=100.0)
+    def test_shares_state_through_file(self, _):
+        with TemporaryDirectory() as tmp_dir:
+            path = join(tmp_dir, "ratelimit")
+            first = FileTokenBucket(rate=1, capacity=2, path=path)
+            second = FileTokenBucket(rate=1, capacity=2, path=path)
+
+            try:
+                self.assertEqual(first.reserve(), 0)
+                self.assertEqual(second.reserve(), 0)
+                self.assertEqual(first.reserve(), 1)
+                self.assertEqual(second.reserve(), 2)
+            finally:
+                first.close()
+                second.close()
+
+
+@patch("tap_ordway.api.ratelimit.TAP_CONFIG")
+def test_get_rate_limiter(mocked_tap_config):
+    mocked_tap_config.rate_limit_rps = None
+    mocked_tap_config.rate_limit_burst = None
+    mocked_tap_config.rate_limit_file = None
+    mocked_tap_config.adaptive_rate_limit = False
+    mocked_tap_config.rate_limit_min_rps = None
+    mocked_tap_config.rate_limit_max_rps = None
+    assert get_rate_limiter() is None
+    assert get_rate_controller() is None
+
+    mocked_tap_config.rate_limit_rps = 5
+    rate_limiter = get_rate_limiter()
+    assert isinstance(rate_limiter, TokenBucket)
+    assert rate_limiter.capacity == 5
+    assert get_rate_limiter() is rate_limiter
+
+    mocked_tap_config.rate_limit_burst = 10
+    assert get_rate_limiter().capacity == 10
+
+
+@patch("tap_ordway.api.ratelimit.TAP_CONFIG")
+def test_get_rate_controller(mocked_tap_config):
+    mocked_tap_config.rate_limit_rps = None
+    mocked_tap_config.rate_limit_burst = None
+    mocked_tap_config.rate_limit_file = None
+    mocked_tap_config.adaptive_rate_limit = True
+    mocked_tap_config.rate_limit_min_rps = None
+    mocked_tap_config.rate_limit_max_rps = 20
+
+    rate_controller = get_rate_controller()
+    assert isinstance(rate_controller, AdaptiveRateController)
+    assert rate_controller.bucket is get_rate_limiter()
+    assert rate_controller.max_rate == 20
+
+
+@patch("tap_ordway.api.ratelimit.time", return_value=1000.0)
+def test_get_retry_after(_):
+    assert get_retry_after({}) is None
+    assert get_retry_after({"Retry-After": "2.5"}) == 2.5
+    assert get_retry_after({"Retry-After": "Thu, 01 Jan 1970 00:16:50 GMT"}) == 10
+    assert get_retry_after({"Retry-After": "soon"}) is None
+    assert get_retry_after({"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "5"}) is None
+    assert get_retry_after({"RateLimit-Remaining": "0", "RateLimit-Reset": "5"}) == 5
+    assert (
+        get_retry_after({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1000000007"})
+        == 1000000007 - 1000.0
+    )
+
+
+@patch("tap_ordway.api.ratelimit.log_metric")
+class AdaptiveRateControllerTestCase(TestCase):
+    def setUp(self):
+        self.monotonic_patcher = patch(
+            "tap_ordway.api.ratelimit.monotonic", return_value=100.0
+        )
+        self.mocked_monotonic = self.monotonic_patcher.start()
+        self.bucket = TokenBucket(rate=8, capacity=1)
+        self.rate_controller = AdaptiveRateController(
+            self.bucket, min_rate=1, max_rate=10
+        )
+
+    def tearDown(self):
+        self.monotonic_patcher.stop()
+
+    def test_throttled_decreases_multiplicatively_once_per_cooldown(self, _):
+        self.rate_controller.throttled()
+        self.assertEqual(self.rate_controller.rate, 4)
+
+        # Requests throttled at the same time only count once
+        self.rate_controller.throttled()
+        self.assertEqual(self.rate_controller.rate, 4)
+
+        self.mocked_monotonic.return_value = 101.0
+        self.rate_controller.throttled()
+        self.assertEqual(self.rate_controller.rate, 2)
+
+        self.mocked_monotonic.return_value = 102.0
+        self.rate_controller.throttled()
+        self.mocked_monotonic.return_value = 103.0
+        self.rate_controller.throttled()
+        self.assertEqual(self.rate_controller.rate, 1)
+        self.assertEqual(self.rate_controller.throttled_count, 5)
+
+    def test_throttled_pauses_for_retry_after(self, _):
+        self.bucket.reserve()
+        self.rate_controller.throttled(retry_after=3)
+
+        self.assertEqual(self.bucket.reserve(), 3.25)
+
+    def test_throttled_logs_metrics(self, mocked_log_metric):
+        self.rate_controller.throttled(retry_after=3, endpoint="/invoices")
+
+        points = [call_args[0][1] for call_args in mocked_log_metric.call_args_list]
+        self.assertListEqual(
+            [(point.metric, point.value) for point in points],
+            [("rate_limit_rps", 4), ("http_throttled", 1)],
+        )
+        self.assertDictEqual(
+            points[1].tags, {"endpoint": "/invoices", "retry_after": 3}
+        )
+
+    def test_succeeded_increases_additively(self, _):
+        self.rate_controller.succeeded()
+        self.assertEqual(self.rate_controller.rate, 8.125)
+
+        for _ in range(100):
+            self.rate_controller.succeeded()
+
+        self.assertEqual(self.rate_controller.rate, 10)
+
+    def test_succeeded_pauses_when_no_requests_remain(self, _):
+        self.bucket.reserve()
+        self.rate_controller.succeeded(
+            {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2"}
+        )
+
+        self.assertAlmostEqual(self.bucket.reserve(), 2 + 1 / 8.125)
@@ -0,0 +1,151 @@
+from unittest import TestCase
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread
+from requests import ReadTimeout
+from tap_ordway.api.base import RequestHandler, RequestTemplate
+from tap_ordway.api.session import (
+    KeepAliveAdapter,
+    close_session,
+    create_session,
+    get_concurrency,
+    get_session,
+)
+
+
+@patch("tap_ordway.api.session.TAP_CONFIG")
+class GetConcurrencyTestCase(TestCase):
+    def test_defaults_to_one_request(self, mocked_config):
+        mocked_config.max_parallel_streams = 1
+        mocked_config.backfill_window_days = None
+        mocked_config.prefetch_pages = 0
+        mocked_config.max_substream_workers = 1
+
+        self.assertEqual(get_concurrency(), 1)
+
+    def test_multiplies_parallel_work(self, mocked_config):
+        mocked_config.max_parallel_streams = 2
+        mocked_config.backfill_window_days = 30
+        mocked_config.max_backfill_workers = 3
+        mocked_config.prefetch_pages = 2
+        mocked_config.max_substream_workers = 4
+
+        self.assertEqual(get_concurrency(), 2 * 3 * (2 + 4))
+
+
+class CreateSessionTestCase(TestCase):
+    def serve(self, handler_class) -> int:
+        """ Serves `handler_class` until the test ends, returning its port """
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        server.daemon_threads = True
+        Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        return server.server_port
+
+    def test_mounts_sized_adapter(self):
+        session = create_session(8, max_retries=2)
+        adapter = session.get_adapter("https://api.ordwaylabs.com")
+
+        self.assertIsInstance(adapter, KeepAliveAdapter)
+        self.assertEqual(adapter._pool_maxsize, 8)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertNotIn(429, adapter.max_retries.status_forcelist)
+
+    def test_does_not_retry_read_timeouts(self):
+        """Ensure a slow response raises ReadTimeout right away, rather than
+        being retried by the pool into a ConnectionError
+        """
+
+        responded = Event()
+        requests = []
+
+        class SlowHandler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                requests.append(self.path)
+                responded.wait(5)
+
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"[]")
+
+            def log_message(self, *_):
+                pass
+
+        port = self.serve(SlowHandler)
+        self.addCleanup(responded.set)
+
+        request_handler = RequestHandler("/invoices", session=create_session(1, 2))
+        template = RequestTemplate(f"http://127.0.0.1:{port}/", {})
+
+        with patch(
+            "tap_ordway.api.base.get_request_template", return_value=template
+        ), patch("tap_ordway.api.base.DEFAULT_TIMEOUT_SECS", 0.2):
+            with self.assertRaises(ReadTimeout):
+                request_handler._get("/invoices", {}, retry_timeouts=False)  # pylint: disable=protected-access
+
+        self.assertListEqual(requests, ["/invoices"])
+
+    def test_does_not_retry_throttled_requests(self):
+        """Ensure a 429 with a Retry-After reaches the caller - and its rate
+        controller - rather than being retried by the pool
+        """
+
+        requests = []
+
+        class ThrottlingHandler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                requests.append(self.path)
+
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *_):
+                pass
+
+        port = self.serve(ThrottlingHandler)
+        session = create_session(1, max_retries=2)
+
+        response = session.get(f"http://127.0.0.1:{port}/invoices", timeout=5)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertListEqual(requests, ["/invoices"])
+
+    def test_without_tcp_keepalive(self):
+        session = create_session(1, tcp_keepalive=False)
+
+        self.assertNotIsInstance(
+            session.get_adapter("https://api.ordwaylabs.com"), KeepAliveAdapter
+        )
+
+
+@patch("tap_ordway.api.session.TAP_CONFIG")
+class GetSessionTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(close_session)
+
+    def _configure(self, mocked_config, pool_size):
+        mocked_config.http_pool_size = pool_size
+        mocked_config.http_max_retries = 0
+        mocked_config.http_tcp_keepalive = True
+
+    def test_shares_session_until_config_changes(self, mocked_config):
+        self._configure(mocked_config, 4)
+        session = get_session()
+
+        self.assertIs(get_session(), session)
+        self.assertIs(RequestHandler("/invoices").session, session)
+
+        mocked_config.http_pool_size = 16
+
+        self.assertIsNot(get_session(), session)
+
+    def test_handler_session_overrides_shared_one(self, mocked_config):
+        self._configure(mocked_config, 4)
+        session = create_session(1)
+
+        self.assertIs(RequestHandler("/invoices", session=session).session, session)
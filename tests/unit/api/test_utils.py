@@ -0,0 +1,21 @@
+from unittest import TestCase
+from queue import Queue
+from threading import Event, Timer
+from tap_ordway.api.utils import put_until_stopped
+
+
+class PutUntilStoppedTestCase(TestCase):
+    def test_puts_when_there_is_room(self):
+        queue: "Queue" = Queue(maxsize=1)
+
+        self.assertTrue(put_until_stopped(queue, 1, Event()))
+        self.assertEqual(queue.get_nowait(), 1)
+
+    def test_gives_up_once_stopped(self):
+        queue: "Queue" = Queue(maxsize=1)
+        queue.put(0)
+        stopped = Event()
+        Timer(0.05, stopped.set).start()
+
+        self.assertFalse(put_until_stopped(queue, 1, stopped))
+        self.assertEqual(queue.qsize(), 1)
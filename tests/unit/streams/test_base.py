@@ -1,7 +1,17 @@
 from unittest import TestCase
 from unittest.mock import MagicMock, Mock, patch
+import asyncio
+from datetime import datetime
+from pytz import UTC
 from tests.utils import generate_catalog
-from tap_ordway.streams.base import ResponseSubstream, Stream, Substream
+from tap_ordway.api import AsyncRequestHandler, RequestHandler
+from tap_ordway.api.pagination import PageCursor
+from tap_ordway.streams.base import (
+    EndpointSubstream,
+    ResponseSubstream,
+    Stream,
+    Substream,
+)
 
 
 class StreamTestCase(TestCase):
@@ -113,3 +123,188 @@ class StreamTestCase(TestCase):
 
         self.assertEqual(test_stream.replication_key, "modified_at")
         self.assertEqual(test_stream.replication_method, "FULL_TABLE")
+
+
+class StreamEndpointSubstreamTestCase(TestCase):
+    def setUp(self):
+        def fetch_notes(context):
+            parent_id = context.parent_record["id"]
+            return [{"id": f"{parent_id}-note-{i}"} for i in range(3)]
+
+        def transform(record, *_, **__):
+            yield record
+
+        test_transformer_class = MagicMock()
+        transformer = test_transformer_class.return_value.__enter__.return_value
+        transformer.transform.side_effect = transform
+
+        class TestEndpointSubstream(EndpointSubstream):
+            tap_stream_id = "test_endpoint_substream"
+            key_properties = []
+            request_handler = MagicMock()
+            transformer_class = test_transformer_class
+
+        TestEndpointSubstream.request_handler.fetch.side_effect = fetch_notes
+
+        class TestStream(Stream):
+            tap_stream_id = "test_stream"
+            substream_definitions = [TestEndpointSubstream]
+            key_properties = []
+            request_handler = MagicMock()
+            valid_replication_keys = ["updated_date"]
+            transformer_class = test_transformer_class
+
+        TestStream.request_handler.fetch.return_value = [
+            {"id": f"parent-{i}"} for i in range(20)
+        ]
+
+        test_catalog = generate_catalog(
+            [
+                {"tap_stream_id": "test_stream", "selected": True},
+                {"tap_stream_id": "test_endpoint_substream", "selected": True},
+            ]
+        )
+        self.test_stream = TestStream(test_catalog, {})
+        self.test_stream.instantiate_substreams(test_catalog)
+
+    @patch("tap_ordway.streams.base.TAP_CONFIG")
+    def test_sync_with_substream_workers_keeps_serial_order(self, mocked_tap_config):
+        mocked_tap_config.async_http = False
+        mocked_tap_config.resume_full_table = False
+        mocked_tap_config.max_substream_workers = 1
+        serial_results = list(self.test_stream.sync(MagicMock()))
+
+        mocked_tap_config.max_substream_workers = 4
+        concurrent_results = list(self.test_stream.sync(MagicMock()))
+
+        self.assertEqual(len(serial_results), 80)
+        self.assertListEqual(concurrent_results, serial_results)
+        self.assertListEqual(
+            serial_results[:4],
+            [
+                ("test_endpoint_substream", {"id": "parent-0-note-0"}),
+                ("test_endpoint_substream", {"id": "parent-0-note-1"}),
+                ("test_endpoint_substream", {"id": "parent-0-note-2"}),
+                ("test_stream", {"id": "parent-0"}),
+            ],
+        )
+
+    @patch("tap_ordway.streams.base.TAP_CONFIG")
+    def test_sync_with_substream_workers_keeps_page_cursors_in_order(
+        self, mocked_tap_config
+    ):
+        mocked_tap_config.async_http = False
+        mocked_tap_config.resume_full_table = True
+        mocked_tap_config.max_substream_workers = 4
+        self.test_stream.replication_method = "FULL_TABLE"
+        self.test_stream.request_handler.fetch.return_value = [
+            PageCursor(1, 1),
+            {"id": "parent-0"},
+            PageCursor(2, 1),
+            {"id": "parent-1"},
+        ]
+
+        results = [
+            record
+            for tap_stream_id, record in self.test_stream.sync(MagicMock())
+            if tap_stream_id == "test_stream"
+        ]
+
+        self.assertListEqual(
+            results,
+            [PageCursor(1, 1), {"id": "parent-0"}, PageCursor(2, 1), {"id": "parent-1"}],
+        )
+        self.assertTrue(
+            self.test_stream.request_handler.fetch.call_args[1]["yield_cursors"]
+        )
+
+    @patch("tap_ordway.streams.base.TAP_CONFIG")
+    def test_sync_with_async_request_handlers_keeps_serial_order(
+        self, mocked_tap_config
+    ):
+        mocked_tap_config.async_http = False
+        mocked_tap_config.resume_full_table = False
+        mocked_tap_config.max_substream_workers = 1
+        serial_results = list(self.test_stream.sync(MagicMock()))
+        substream = self.test_stream.substreams[0]
+        request_handler = self.test_stream.request_handler
+        substream_request_handler = substream.request_handler
+
+        async def fetch_parent_pages(context, cursor=None):
+            parents = request_handler.fetch(context)
+
+            for i in range(0, len(parents), 7):
+                yield parents[i : i + 7]
+
+        async def fetch_notes(context):
+            await asyncio.sleep(0.001 * (20 - int(context.parent_record["id"][7:])))
+
+            for note in substream_request_handler.fetch(context):
+                yield note
+
+        async_request_handler = MagicMock(spec=AsyncRequestHandler)
+        async_request_handler.fetch_pages = fetch_parent_pages
+        async_substream_request_handler = MagicMock(spec=AsyncRequestHandler)
+        async_substream_request_handler.fetch = fetch_notes
+
+        mocked_tap_config.async_http = True
+        mocked_tap_config.max_concurrent_requests = 10
+
+        with patch.object(
+            self.test_stream, "request_handler", async_request_handler, create=True
+        ), patch.object(
+            substream, "request_handler", async_substream_request_handler, create=True
+        ):
+            async_results = list(self.test_stream.sync(MagicMock()))
+
+        self.assertListEqual(async_results, serial_results)
+
+
+class EndpointSubstreamTestCase(TestCase):
+    def setUp(self):
+        test_transformer_class = MagicMock()
+        transformer = test_transformer_class.return_value.__enter__.return_value
+        transformer.transform.side_effect = lambda record, *_, **__: iter([record])
+
+        class TestEndpointSubstream(EndpointSubstream):
+            tap_stream_id = "test_endpoint_substream"
+            key_properties = []
+            request_handler = RequestHandler("/customers/{id}/customer_notes")
+            transformer_class = test_transformer_class
+
+        self.request_handler = TestEndpointSubstream.request_handler
+        self.test_substream = TestEndpointSubstream(
+            generate_catalog(
+                [{"tap_stream_id": "test_endpoint_substream", "selected": True}]
+            ),
+            {},
+        )
+
+    @patch("tap_ordway.api.base.RequestHandler._get", autospec=True)
+    def test_sync_makes_no_request_past_short_pages(self, mocked_get):
+        notes = {"C-1": 52, "C-2": 1}
+        requests = []
+
+        def get_page(_, path, params):
+            requests.append((path, params["page"]))
+            offset = (params["page"] - 1) * params["size"]
+            count = min(max(notes[path.split("/")[2]] - offset, 0), params["size"])
+
+            return [{"id": f"{path}-{offset + i}"} for i in range(count)]
+
+        mocked_get.side_effect = get_page
+        filter_datetime = datetime(2020, 1, 1, tzinfo=UTC)
+
+        for customer_id, count in notes.items():
+            results = list(self.test_substream.sync({"id": customer_id}, filter_datetime))
+
+            self.assertEqual(len(results), count)
+
+        self.assertListEqual(
+            requests,
+            [
+                ("/customers/C-1/customer_notes", 1),
+                ("/customers/C-1/customer_notes", 2),
+                ("/customers/C-2/customer_notes", 1),
+            ],
+        )
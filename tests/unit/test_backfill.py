@@ -0,0 +1,159 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from datetime import datetime, timedelta
+from threading import Barrier
+from pytz import UTC
+from tests.utils import generate_catalog
+from tap_ordway.api import RequestHandler
+from tap_ordway.backfill import (
+    BackfillWindow,
+    CompletedWindow,
+    get_backfill_windows,
+    sync_backfill_windows,
+)
+from tap_ordway.streams.base import Stream
+
+
+@patch("tap_ordway.backfill.now", return_value=datetime(2020, 1, 25, tzinfo=UTC))
+@patch("tap_ordway.backfill.TAP_CONFIG")
+class GetBackfillWindowsTestCase(TestCase):
+    def test_disabled(self, mocked_tap_config, _):
+        mocked_tap_config.backfill_window_days = None
+
+        self.assertListEqual(
+            get_backfill_windows(datetime(2020, 1, 1, tzinfo=UTC)), []
+        )
+
+    def test_within_a_single_window(self, mocked_tap_config, _):
+        mocked_tap_config.backfill_window_days = 30
+
+        self.assertListEqual(
+            get_backfill_windows(datetime(2020, 1, 1, tzinfo=UTC)), []
+        )
+
+    def test_windows_cover_the_whole_range(self, mocked_tap_config, _):
+        mocked_tap_config.backfill_window_days = 10
+        overlap = timedelta(microseconds=1)
+
+        self.assertListEqual(
+            get_backfill_windows(datetime(2020, 1, 1, tzinfo=UTC)),
+            [
+                BackfillWindow(
+                    datetime(2020, 1, 1, tzinfo=UTC), datetime(2020, 1, 11, tzinfo=UTC)
+                ),
+                BackfillWindow(
+                    datetime(2020, 1, 11, tzinfo=UTC) - overlap,
+                    datetime(2020, 1, 21, tzinfo=UTC),
+                ),
+                BackfillWindow(datetime(2020, 1, 21, tzinfo=UTC) - overlap),
+            ],
+        )
+
+
+class SyncBackfillWindowsTestCase(TestCase):
+    @patch("tap_ordway.backfill.TAP_CONFIG")
+    def test_yields_windows_in_order(self, mocked_tap_config):
+        mocked_tap_config.max_backfill_workers = 2
+        windows = [
+            BackfillWindow(
+                datetime(2020, 1, 1, tzinfo=UTC), datetime(2020, 1, 11, tzinfo=UTC)
+            ),
+            BackfillWindow(
+                datetime(2020, 1, 11, tzinfo=UTC), datetime(2020, 1, 21, tzinfo=UTC)
+            ),
+            BackfillWindow(datetime(2020, 1, 21, tzinfo=UTC)),
+        ]
+
+        def sync(_, window):
+            return [
+                ("invoices", {"id": f"{window.start.day}-{i}"}) for i in range(3)
+            ]
+
+        stream_def = MagicMock(tap_stream_id="invoices")
+        stream_def.sync.side_effect = sync
+
+        self.assertListEqual(
+            list(
+                sync_backfill_windows(
+                    stream_def, datetime(2020, 1, 1, tzinfo=UTC), windows
+                )
+            ),
+            [
+                ("invoices", {"id": "1-0"}),
+                ("invoices", {"id": "1-1"}),
+                ("invoices", {"id": "1-2"}),
+                (
+                    "invoices",
+                    CompletedWindow("2020-01-10T23:59:59.999999Z", is_last=False),
+                ),
+                ("invoices", {"id": "11-0"}),
+                ("invoices", {"id": "11-1"}),
+                ("invoices", {"id": "11-2"}),
+                (
+                    "invoices",
+                    CompletedWindow("2020-01-20T23:59:59.999999Z", is_last=True),
+                ),
+                ("invoices", {"id": "21-0"}),
+                ("invoices", {"id": "21-1"}),
+                ("invoices", {"id": "21-2"}),
+            ],
+        )
+
+    def test_windows_fetch_with_their_own_request_handlers(self):
+        """Ensure windows fetching at the same time don't share their page
+        counts, leaving the stream's request handler to the open-ended window
+        """
+
+        test_transformer_class = MagicMock()
+        transformer = test_transformer_class.return_value.__enter__.return_value
+        transformer.transform.side_effect = lambda record, *_, **__: iter([record])
+
+        class TestStream(Stream):
+            tap_stream_id = "invoices"
+            key_properties = []
+            request_handler = RequestHandler("/invoices", page_size=2)
+            transformer_class = test_transformer_class
+
+        test_stream = TestStream(
+            generate_catalog([{"tap_stream_id": "invoices", "selected": True}]), {}
+        )
+        windows = [
+            BackfillWindow(
+                datetime(2020, 1, 1, tzinfo=UTC), datetime(2020, 1, 11, tzinfo=UTC)
+            ),
+            BackfillWindow(datetime(2020, 1, 11, tzinfo=UTC)),
+        ]
+        # Neither window gets past its first page before the other requested it
+        first_pages = Barrier(2, timeout=5)
+        request_handlers = {}
+
+        def get_page(request_handler, _, params):
+            window_start = params["updated_date>"][:10]
+            request_handlers.setdefault(window_start, set()).add(request_handler)
+
+            if params["page"] == 1:
+                first_pages.wait()
+
+            if params["page"] > 2:
+                return []
+
+            return [{"id": f"{window_start}-{params['page']}-{i}"} for i in range(2)]
+
+        with patch.object(RequestHandler, "_get", autospec=True) as mocked_get:
+            mocked_get.side_effect = get_page
+            results = list(
+                sync_backfill_windows(
+                    test_stream, datetime(2020, 1, 1, tzinfo=UTC), windows
+                )
+            )
+
+        self.assertListEqual(
+            [record["id"] for _, record in results[:4]],
+            ["2020-01-01-1-0", "2020-01-01-1-1", "2020-01-01-2-0", "2020-01-01-2-1"],
+        )
+        self.assertIsInstance(results[4][1], CompletedWindow)
+        self.assertEqual(len(results), 9)
+        self.assertEqual(len(request_handlers["2020-01-01"]), 1)
+        self.assertNotIn(TestStream.request_handler, request_handlers["2020-01-01"])
+        self.assertSetEqual(request_handlers["2020-01-11"], {TestStream.request_handler})
+        self.assertEqual(TestStream.request_handler.pages_consumed, 3)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from tap_ordway.checkpoint import Checkpointer
+
+
+class CheckpointerTestCase(TestCase):
+    def test_defaults_to_every_record(self):
+        checkpointer = Checkpointer()
+
+        self.assertFalse(checkpointer.is_due)
+        checkpointer.record_handled()
+        self.assertTrue(checkpointer.is_due)
+
+    def test_every_records(self):
+        checkpointer = Checkpointer(every_records=3)
+
+        for _ in range(2):
+            checkpointer.record_handled()
+
+        self.assertFalse(checkpointer.is_due)
+        checkpointer.record_handled()
+        self.assertTrue(checkpointer.is_due)
+
+        checkpointer.checkpointed()
+        self.assertFalse(checkpointer.is_due)
+
+    @patch("tap_ordway.checkpoint.monotonic")
+    def test_every_seconds(self, mocked_monotonic):
+        mocked_monotonic.return_value = 100
+        checkpointer = Checkpointer(every_seconds=5)
+
+        mocked_monotonic.return_value = 104
+        self.assertFalse(checkpointer.is_due)
+
+        mocked_monotonic.return_value = 105
+        self.assertTrue(checkpointer.is_due)
+
+        checkpointer.checkpointed()
+        self.assertFalse(checkpointer.is_due)
+
+    def test_on_page_boundary(self):
+        request_handler = MagicMock(pages_consumed=1)
+        checkpointer = Checkpointer(
+            on_page_boundary=True, request_handler=request_handler
+        )
+
+        checkpointer.record_handled()
+        self.assertFalse(checkpointer.is_due)
+
+        request_handler.pages_consumed = 2
+        self.assertTrue(checkpointer.is_due)
+
+        checkpointer.checkpointed()
+        self.assertFalse(checkpointer.is_due)
@@ -3,7 +3,17 @@ from unittest.mock import MagicMock, patch
 from datetime import datetime
 from pytz import UTC
 from tests.utils import generate_catalog
-from tap_ordway import filter_record, handle_record, prepare_stream
+from tap_ordway import (
+    filter_record,
+    finalize_stream,
+    handle_completed_window,
+    handle_page_cursor,
+    handle_record,
+    prepare_stream,
+)
+from tap_ordway.api.pagination import PageCursor
+from tap_ordway.backfill import CompletedWindow
+from tap_ordway.checkpoint import Checkpointer
 
 
 class PrepareStreamTestCase(TestCase):
@@ -120,10 +130,24 @@ class FilterRecordTestCase(TestCase):
         self.assertFalse(
             filter_record(
                 {"updated_date": "2020-01-02"},
-                MagicMock(filter_datetime=datetime(2020, 1, 1, tzinfo=UTC)),
+                MagicMock(
+                    filter_datetime=datetime(2020, 1, 1, tzinfo=UTC),
+                    until_datetime=None,
+                ),
             )
         )
 
+    def test_updated_date_gte_until_datetime(self):
+        """Ensure records past a backfill window are filtered"""
+
+        context = MagicMock(
+            filter_datetime=datetime(2020, 1, 1, tzinfo=UTC),
+            until_datetime=datetime(2020, 2, 1, tzinfo=UTC),
+        )
+
+        self.assertFalse(filter_record({"updated_date": "2020-01-31"}, context))
+        self.assertTrue(filter_record({"updated_date": "2020-02-01"}, context))
+
 
 class HandleRecordTestCase(TestCase):
     def test_with_full_table_stream(self):
@@ -207,3 +231,199 @@ class HandleRecordTestCase(TestCase):
                 "foo": "bar",
             },
         )
+
+    @patch("tap_ordway.write_state")
+    def test_with_checkpointer_only_writes_state_at_safe_resume_points(
+        self, mocked_write_state
+    ):
+        """Ensure STATE is written when due, but never for a bookmark whose
+        value may still be shared by records that weren't written yet
+        """
+
+        stream_def = MagicMock(is_valid_incremental=True, replication_key="modified_at")
+        checkpointer = Checkpointer(every_records=2)
+        state = {}
+        written_bookmarks = []
+        mocked_write_state.side_effect = lambda state: written_bookmarks.append(
+            state["bookmarks"]["foo"]["modified_at"]
+        )
+
+        for modified_at in ["2020-01-01", "2020-01-02", "2020-01-02", "2020-01-02", "2020-01-03"]:
+            state = handle_record(
+                "foo",
+                record={"modified_at": modified_at},
+                stream_def=stream_def,
+                stream_version=None,
+                state=state,
+                checkpointer=checkpointer,
+            )
+
+        self.assertListEqual(written_bookmarks, ["2020-01-02"])
+        self.assertEqual(state["bookmarks"]["foo"]["modified_at"], "2020-01-02")
+        self.assertEqual(checkpointer.pending_bookmark, "2020-01-03")
+        self.assertNotIn("currently_syncing", state)
+
+    @patch("tap_ordway.write_state")
+    def test_with_checkpointers_never_writes_other_streams_pending_bookmarks(
+        self, mocked_write_state
+    ):
+        """Ensure STATE written for one stream, e.g. while syncing streams in
+        parallel, doesn't hold another stream's unsafe bookmark
+        """
+
+        stream_def = MagicMock(is_valid_incremental=True, replication_key="modified_at")
+        checkpointers = {"foo": Checkpointer(), "bar": Checkpointer()}
+        state = {}
+        written_states = []
+        mocked_write_state.side_effect = lambda state: written_states.append(
+            {
+                tap_stream_id: bookmarks["modified_at"]
+                for tap_stream_id, bookmarks in state["bookmarks"].items()
+            }
+        )
+
+        for tap_stream_id, modified_at in [
+            ("foo", "2020-01-01"),
+            ("foo", "2020-01-02"),
+            ("bar", "2020-01-05"),
+            ("bar", "2020-01-06"),
+        ]:
+            state = handle_record(
+                tap_stream_id,
+                {"modified_at": modified_at},
+                stream_def,
+                None,
+                state,
+                checkpointers[tap_stream_id],
+            )
+
+        self.assertListEqual(
+            written_states,
+            [{"foo": "2020-01-01"}, {"foo": "2020-01-01", "bar": "2020-01-05"}],
+        )
+
+    @patch("tap_ordway.write_state")
+    def test_with_held_bookmarks_advances_per_completed_window(
+        self, mocked_write_state
+    ):
+        """Ensure backfilled records only advance the bookmark through
+        completed windows, until the last one completes
+        """
+
+        stream_def = MagicMock(is_valid_incremental=True, replication_key="modified_at")
+        checkpointer = Checkpointer()
+        checkpointer.bookmarks_held = True
+        state = {}
+
+        state = handle_record(
+            "foo", {"modified_at": "2020-01-05"}, stream_def, None, state, checkpointer
+        )
+        self.assertNotIn("bookmarks", state)
+
+        state = handle_completed_window(
+            "foo",
+            CompletedWindow("2020-01-09T23:59:59.999999Z", is_last=True),
+            stream_def,
+            state,
+            checkpointer,
+        )
+        self.assertEqual(
+            state["bookmarks"]["foo"]["modified_at"], "2020-01-09T23:59:59.999999Z"
+        )
+        mocked_write_state.assert_called_once_with(state)
+        self.assertFalse(checkpointer.bookmarks_held)
+
+        state = handle_record(
+            "foo", {"modified_at": "2020-01-10"}, stream_def, None, state, checkpointer
+        )
+        self.assertEqual(checkpointer.pending_bookmark, "2020-01-10")
+
+
+@patch("tap_ordway.configs.resume_full_table", True)
+class ResumeFullTableTestCase(TestCase):
+    def setUp(self):
+        self.catalog = generate_catalog([
+            {"tap_stream_id": "plans", "selected": True, "replication_key": None, "replication_method": "FULL_TABLE"},
+            {"tap_stream_id": "charges", "selected": True, "replication_key": None, "replication_method": "FULL_TABLE"},
+        ])
+
+    @patch("tap_ordway.write_activate_version", autospec=True)
+    @patch("tap_ordway.get_full_table_version", return_value=2)
+    def test_prepare_stream_reuses_interrupted_versions(self, _, mock_write_activate_version):
+        stream_versions = {}
+        state = {
+            "bookmarks": {
+                "plans": {
+                    "wrote_initial_activate_version": True,
+                    "page_cursor": {"page": 800, "size": 50},
+                    "version": 1,
+                },
+                "charges": {"wrote_initial_activate_version": True, "version": 1},
+            }
+        }
+
+        prepare_stream("plans", {}, stream_versions, self.catalog, {"start_date": "2021-01-01"}, state)
+
+        self.assertDictEqual(stream_versions, {"plans": 1, "charges": 1})
+        mock_write_activate_version.assert_not_called()
+
+    @patch("tap_ordway.write_activate_version", autospec=True)
+    @patch("tap_ordway.get_full_table_version", return_value=2)
+    def test_prepare_stream_keeps_new_versions_in_state(self, *_):
+        stream_versions = {}
+        state = {"bookmarks": {"plans": {"version": 1}}}
+
+        prepare_stream("plans", {}, stream_versions, self.catalog, {"start_date": "2021-01-01"}, state)
+
+        # Without a cursor, there's nothing to resume
+        self.assertDictEqual(stream_versions, {"plans": 2, "charges": 2})
+        self.assertEqual(state["bookmarks"]["plans"]["version"], 2)
+        self.assertEqual(state["bookmarks"]["charges"]["version"], 2)
+
+    @patch("tap_ordway.write_state")
+    def test_handle_page_cursor(self, mocked_write_state):
+        state = handle_page_cursor("plans", PageCursor(page=3, size=50), {})
+
+        self.assertDictEqual(
+            state, {"bookmarks": {"plans": {"page_cursor": {"page": 3, "size": 50}}}}
+        )
+        mocked_write_state.assert_called_once_with(state)
+
+    @patch("tap_ordway.write_activate_version")
+    @patch("tap_ordway.write_state")
+    def test_finalize_stream_clears_cursor_and_versions(self, mocked_write_state, _):
+        substream_def = MagicMock(tap_stream_id="charges", is_selected=True)
+        stream_def = MagicMock(
+            tap_stream_id="plans", is_valid_incremental=False, substreams=[substream_def]
+        )
+        state = {
+            "bookmarks": {
+                "plans": {"page_cursor": {"page": 3, "size": 50}, "version": 1},
+                "charges": {"version": 1},
+            }
+        }
+
+        finalize_stream(stream_def, {"plans": 1, "charges": 1}, state)
+
+        self.assertDictEqual(state, {"bookmarks": {"plans": {}, "charges": {}}})
+        mocked_write_state.assert_called_once_with(state)
+
+    @patch("tap_ordway.write_activate_version")
+    @patch("tap_ordway.write_state")
+    def test_finalize_stream_adds_pending_bookmark(self, mocked_write_state, _):
+        stream_def = MagicMock(
+            tap_stream_id="invoices",
+            is_valid_incremental=True,
+            replication_key="updated_date",
+            substreams=[],
+        )
+        checkpointer = Checkpointer()
+        checkpointer.pending_bookmark = "2020-01-03"
+        state = {}
+
+        finalize_stream(stream_def, {"invoices": None}, state, checkpointer)
+
+        self.assertDictEqual(
+            state, {"bookmarks": {"invoices": {"updated_date": "2020-01-03"}}}
+        )
+        mocked_write_state.assert_called_once_with(state)
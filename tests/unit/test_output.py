@@ -0,0 +1,125 @@
+from unittest import TestCase, skipUnless
+from unittest.mock import MagicMock
+from decimal import Decimal
+import simplejson
+from singer.messages import ActivateVersionMessage, RecordMessage, StateMessage
+from tap_ordway.output import (
+    HAS_ORJSON,
+    MessageWriter,
+    encode_orjson,
+    encode_simplejson,
+    get_encoder,
+)
+
+
+class MessageWriterTestCase(TestCase):
+    def setUp(self):
+        self.stream = MagicMock(spec=["write", "flush"])
+
+    def written_lines(self):
+        return [
+            line
+            for call_args in self.stream.write.call_args_list
+            for line in call_args[0][0].splitlines()
+        ]
+
+    def test_buffers_until_flush_bytes(self):
+        writer = MessageWriter(flush_bytes=200, stream=self.stream)
+
+        writer.write_message(RecordMessage("usages", {"id": 1}))
+        writer.write_message(RecordMessage("usages", {"id": 2}))
+        self.stream.write.assert_not_called()
+
+        writer.write_message(RecordMessage("usages", {"id": "x" * 100}))
+        self.stream.write.assert_called_once()
+        self.stream.flush.assert_called_once()
+        self.assertEqual(len(self.written_lines()), 3)
+
+    def test_buffers_until_flush_records(self):
+        writer = MessageWriter(flush_records=2, stream=self.stream)
+
+        writer.write_message(ActivateVersionMessage("usages", 1))
+        writer.write_message(RecordMessage("usages", {"id": 1}))
+        self.stream.write.assert_not_called()
+
+        writer.write_message(RecordMessage("usages", {"id": 2}))
+        self.stream.write.assert_called_once()
+        self.assertListEqual(
+            self.written_lines(),
+            [
+                '{"type": "ACTIVATE_VERSION", "stream": "usages", "version": 1}',
+                '{"type": "RECORD", "stream": "usages", "record": {"id": 1}}',
+                '{"type": "RECORD", "stream": "usages", "record": {"id": 2}}',
+            ],
+        )
+
+    def test_state_flushes_preceding_messages(self):
+        writer = MessageWriter(stream=self.stream)
+
+        writer.write_message(RecordMessage("usages", {"id": 1}))
+        writer.write_message(StateMessage({"bookmarks": {}}))
+
+        self.stream.write.assert_called_once()
+        self.stream.flush.assert_called_once()
+        self.assertListEqual(
+            self.written_lines(),
+            [
+                '{"type": "RECORD", "stream": "usages", "record": {"id": 1}}',
+                '{"type": "STATE", "value": {"bookmarks": {}}}',
+            ],
+        )
+
+    def test_flush(self):
+        writer = MessageWriter(stream=self.stream)
+
+        writer.write_message(RecordMessage("usages", {"id": 1}))
+        writer.flush()
+        writer.flush()
+
+        self.stream.write.assert_called_once()
+        self.assertEqual(len(self.written_lines()), 1)
+
+
+@skipUnless(HAS_ORJSON, "orjson>=3.9 isn't installed")
+class EncodeOrjsonTestCase(TestCase):
+    def test_equivalent_to_simplejson(self):
+        message = RecordMessage(
+            "invoices",
+            {
+                "invoice_id": "INV-01",
+                "customer_name": "Ünïcode ☃",
+                "invoice_amount": Decimal("12345678901234567890.123456789"),
+                "exchange_rate": Decimal("1E-10"),
+                "quantity": 3,
+                "taxable": True,
+                "notes": None,
+                "tax_lines": [{"rate": Decimal("0.0725"), "amount": Decimal("-1.50")}],
+                "custom_fields": {1: "non-str key"},
+            },
+            version=1,
+        )
+
+        encoded = encode_orjson(message)
+
+        self.assertNotEqual(encoded, encode_simplejson(message))
+        self.assertEqual(
+            simplejson.loads(encoded, use_decimal=True),
+            simplejson.loads(encode_simplejson(message), use_decimal=True),
+        )
+        self.assertIn(b'"invoice_amount":12345678901234567890.123456789', encoded)
+
+    def test_falls_back_to_simplejson(self):
+        message = RecordMessage("usages", {"quantity": 2 ** 70})
+
+        self.assertEqual(encode_orjson(message), encode_simplejson(message))
+
+
+class GetEncoderTestCase(TestCase):
+    def test_get_encoder(self):
+        self.assertIs(get_encoder("simplejson"), encode_simplejson)
+        self.assertIs(
+            get_encoder("auto"), encode_orjson if HAS_ORJSON else encode_simplejson
+        )
+
+        with self.assertRaises(ValueError):
+            get_encoder("ujson")
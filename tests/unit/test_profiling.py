@@ -0,0 +1,235 @@
+import json
+import os
+import tempfile
+from time import sleep
+from unittest import TestCase
+from unittest.mock import patch
+from threading import Thread
+from tap_ordway.profiling import (
+    DeterministicProfiler,
+    SamplingProfiler,
+    StageHistogram,
+    StageProfile,
+    get_stage_profile,
+    iter_profiled,
+    log_stage_profiles,
+    parse_profiler_args,
+    profile_stream,
+    time_stage,
+)
+
+
+class StageHistogramTestCase(TestCase):
+    def test_percentiles_round_up_to_buckets(self):
+        histogram = StageHistogram()
+
+        for _ in range(90):
+            histogram.add(0.0001)
+
+        for _ in range(10):
+            histogram.add(0.1)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(0.5), 128 / 1e6)
+        self.assertEqual(histogram.percentile(0.99), 0.1)
+        self.assertEqual(histogram.summarize()["max_ms"], 100.0)
+
+    def test_empty(self):
+        self.assertEqual(StageHistogram().percentile(0.5), 0.0)
+
+
+class StageProfileTestCase(TestCase):
+    def test_iter_timed(self):
+        profile = StageProfile()
+
+        self.assertEqual(list(profile.iter_timed(iter([1, 2, 3]), "fetch_wait")), [1, 2, 3])
+        self.assertEqual(profile.stages["fetch_wait"].count, 3)
+
+    def test_time_stage(self):
+        profile = StageProfile()
+
+        with time_stage(profile, "http"):
+            pass
+
+        with time_stage(None, "http"):
+            pass
+
+        self.assertEqual(list(profile.summarize()), ["http"])
+        self.assertEqual(profile.stages["http"].count, 1)
+
+
+@patch("tap_ordway.profiling.TAP_CONFIG")
+class GetStageProfileTestCase(TestCase):
+    def test_disabled(self, mocked_config):
+        mocked_config.profile_stages = False
+
+        self.assertIsNone(get_stage_profile("invoices"))
+
+    def test_shared_per_stream(self, mocked_config):
+        mocked_config.profile_stages = True
+
+        with patch("tap_ordway.profiling._profiles", {}):
+            profile = get_stage_profile("invoices")
+
+            self.assertIs(get_stage_profile("invoices"), profile)
+            self.assertIsNot(get_stage_profile("customers"), profile)
+
+
+@patch("tap_ordway.profiling.log_metric")
+@patch("tap_ordway.profiling.TAP_CONFIG")
+class LogStageProfilesTestCase(TestCase):
+    def test_logs_and_writes_summary(self, mocked_config, mocked_log_metric):
+        mocked_config.profile_stages = True
+
+        with tempfile.TemporaryDirectory() as directory, patch(
+            "tap_ordway.profiling._profiles", {}
+        ), patch("tap_ordway.profiling._summaries", {}):
+            mocked_config.profile_summary_file = os.path.join(directory, "stages.json")
+            get_stage_profile("invoices").add("http", 0.5)
+            get_stage_profile("invoice_line_items").add("filter_hook", 0.001)
+
+            log_stage_profiles(["invoices"])
+
+            point = mocked_log_metric.call_args.args[1]
+            self.assertEqual(point.metric, "stage_duration")
+            self.assertEqual(point.tags["stream"], "invoices")
+            self.assertEqual(point.tags["stage"], "http")
+            self.assertEqual(point.tags["count"], 1)
+
+            with open(mocked_config.profile_summary_file) as summary_file:
+                summary = json.load(summary_file)
+
+            self.assertEqual(list(summary), ["invoices"])
+            self.assertEqual(summary["invoices"]["http"]["total_seconds"], 0.5)
+
+
+class ParseProfilerArgsTestCase(TestCase):
+    def test_not_profiling(self):
+        profiler, remaining = parse_profiler_args(["-c", "config.json"])
+
+        self.assertIsNone(profiler)
+        self.assertEqual(remaining, ["-c", "config.json"])
+
+    def test_sampling(self):
+        profiler, remaining = parse_profiler_args(
+            ["-c", "config.json", "--profile", "sample", "--profile-interval", "5"]
+        )
+
+        self.assertIsInstance(profiler, SamplingProfiler)
+        self.assertEqual(profiler.interval, 0.005)
+        self.assertEqual(profiler.directory, "profiles")
+        self.assertEqual(remaining, ["-c", "config.json"])
+
+    def test_cprofile(self):
+        profiler, _ = parse_profiler_args(
+            ["--profile", "cprofile", "--profile-dir", "out", "--profile-top", "5"]
+        )
+
+        self.assertIsInstance(profiler, DeterministicProfiler)
+        self.assertEqual((profiler.directory, profiler.top), ("out", 5))
+
+
+class ProfileStreamTestCase(TestCase):
+    def test_not_profiling(self):
+        with profile_stream("invoices"):
+            pass
+
+        self.assertEqual(list(iter_profiled([1, 2], "invoices")), [1, 2])
+
+
+class SamplingProfilerTestCase(TestCase):
+    def test_attributes_samples_to_streams(self):
+        profiler = SamplingProfiler("profiles")
+
+        profiler.sample()
+        self.assertEqual(profiler.stream_ids(), [])
+
+        with profiler.profile_stream("invoices"):
+            # The sampling thread's own stack isn't sampled
+            sampler = Thread(target=profiler.sample)
+            sampler.start()
+            sampler.join()
+
+        self.assertEqual(profiler.stream_ids(), ["invoices"])
+        self.assertTrue(
+            any(
+                "test_attributes_samples_to_streams" in label
+                for stack in profiler._stacks["invoices"]
+                for label in stack
+            )
+        )
+
+    def test_other_threads_of_parallel_streams(self):
+        profiler = SamplingProfiler("profiles")
+
+        def sync(tap_stream_id):
+            with profiler.profile_stream(tap_stream_id):
+                sleep(0.2)
+
+        threads = [Thread(target=sync, args=(stream,)) for stream in ("a", "b")]
+
+        for thread in threads:
+            thread.start()
+
+        sleep(0.1)
+        # Samples this thread too, which isn't syncing either stream
+        sampler = Thread(target=profiler.sample)
+        sampler.start()
+        sampler.join()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(profiler.stream_ids()), ["_other", "a", "b"])
+
+    def test_writes_profiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = SamplingProfiler(directory, interval=0.001)
+            profiler.start()
+
+            with profiler.profile_stream("invoices"):
+                sleep(0.05)
+
+            profiler.stop()
+
+            self.assertEqual(
+                sorted(os.listdir(directory)), ["invoices.collapsed", "invoices.txt"]
+            )
+
+            with open(os.path.join(directory, "invoices.collapsed")) as collapsed_file:
+                self.assertIn("test_writes_profiles", collapsed_file.read())
+
+
+class DeterministicProfilerTestCase(TestCase):
+    def test_writes_profiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = DeterministicProfiler(directory, top=5)
+
+            with profiler.profile_stream("invoices"):
+                sorted(range(100))
+
+            profiler.stop()
+
+            self.assertEqual(
+                sorted(os.listdir(directory)), ["invoices.prof", "invoices.txt"]
+            )
+
+            with open(os.path.join(directory, "invoices.txt")) as summary_file:
+                self.assertIn("sorted", summary_file.read())
+
+    @patch("tap_ordway.profiling.TAP_CONFIG")
+    @patch("tap_ordway.profiling.sys")
+    def test_rejects_parallel_streams_on_python_3_12(self, mocked_sys, mocked_config):
+        profiler = DeterministicProfiler("profiles")
+        mocked_config.max_parallel_streams = 2
+
+        mocked_sys.version_info = (3, 11, 0)
+        profiler.start()
+
+        mocked_sys.version_info = (3, 12, 0)
+
+        with self.assertRaises(ValueError):
+            profiler.start()
+
+        mocked_config.max_parallel_streams = 1
+        profiler.start()
@@ -0,0 +1,82 @@
+from unittest import TestCase
+from threading import current_thread
+from tap_ordway.scheduler import StreamScheduler
+
+
+class StreamSchedulerTestCase(TestCase):
+    def test_requires_a_worker(self):
+        with self.assertRaises(ValueError):
+            StreamScheduler(0)
+
+    def test_keeps_order_of_each_job(self):
+        scheduler = StreamScheduler(max_workers=3, buffer_size=2)
+        jobs = [
+            (job_id, lambda job_id=job_id: (f"{job_id}-{i}" for i in range(50)))
+            for job_id in ("invoices", "payments", "usages", "credits")
+        ]
+
+        items = {}
+        finished = []
+
+        for scheduled in scheduler.run(jobs):
+            if scheduled.done:
+                finished.append(scheduled.job_id)
+                continue
+
+            items.setdefault(scheduled.job_id, []).append(scheduled.item)
+
+        self.assertCountEqual(finished, ["invoices", "payments", "usages", "credits"])
+
+        for job_id, job_items in items.items():
+            self.assertListEqual(job_items, [f"{job_id}-{i}" for i in range(50)])
+
+    def test_starts_jobs_on_consuming_thread_up_to_max_workers(self):
+        """Jobs are started lazily, so their preparation (e.g. writing SCHEMA
+        messages) happens on the consuming thread and only once a worker is free
+        """
+
+        scheduler = StreamScheduler(max_workers=2)
+        started = []
+
+        def start(job_id):
+            started.append((job_id, current_thread()))
+            return [job_id]
+
+        jobs = [(job_id, lambda job_id=job_id: start(job_id)) for job_id in "abc"]
+        results = scheduler.run(jobs)
+
+        next(results)
+        self.assertEqual(len(started), 2)
+
+        list(results)
+        self.assertEqual(len(started), 3)
+        self.assertTrue(all(thread is current_thread() for _, thread in started))
+
+    def test_reraises_job_errors(self):
+        def failing():
+            yield 1
+            raise RuntimeError("boom")
+
+        scheduler = StreamScheduler(max_workers=2)
+
+        with self.assertRaises(RuntimeError):
+            list(scheduler.run([("failing", failing)]))
+
+    def test_run_in_order_yields_jobs_one_after_another(self):
+        scheduler = StreamScheduler(max_workers=3, buffer_size=2)
+        jobs = [
+            (job_id, lambda job_id=job_id: (f"{job_id}-{i}" for i in range(20)))
+            for job_id in "abcde"
+        ]
+
+        self.assertListEqual(
+            [
+                scheduled.item if not scheduled.done else f"{scheduled.job_id}-done"
+                for scheduled in scheduler.run_in_order(jobs)
+            ],
+            [
+                item
+                for job_id in "abcde"
+                for item in [f"{job_id}-{i}" for i in range(20)] + [f"{job_id}-done"]
+            ],
+        )
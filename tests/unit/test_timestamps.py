@@ -0,0 +1,39 @@
+from unittest import TestCase
+from unittest.mock import patch
+from singer.utils import strptime_to_utc
+from tap_ordway.timestamps import parse_timestamp
+
+
+class ParseTimestampTestCase(TestCase):
+    def test_equivalent_to_strptime_to_utc(self):
+        for value in [
+            "2020-04-08T18:54:38.484Z",
+            "2020-04-08T18:54:38.484000Z",
+            "2020-04-08T18:54:38Z",
+            "2020-04-08T18:54:38",
+            "2020-04-08 18:54:38.1+00:00",
+            "2020-04-08T18:54:38.4+0000",
+            "2020-04-08T18:54:38-05:00",
+            "2020-04-08T18:54:38.1234567Z",
+            "2020-04-08",
+            "9999-12-31T23:59:59.999999Z",
+        ]:
+            with self.subTest(value=value):
+                parsed = parse_timestamp(value)
+
+                self.assertEqual(parsed, strptime_to_utc(value))
+                self.assertEqual(parsed.utcoffset().total_seconds(), 0)
+
+    def test_raises_on_invalid_timestamps(self):
+        with self.assertRaises(ValueError):
+            parse_timestamp("2020-02-30")
+
+        with self.assertRaises(ValueError):
+            parse_timestamp("-")
+
+    @patch("tap_ordway.timestamps.strptime_to_utc")
+    def test_avoids_dateutil_for_ordway_formats(self, mocked_strptime_to_utc):
+        parse_timestamp("2021-06-01T01:02:03.004Z")
+        parse_timestamp("2021-06-01")
+
+        mocked_strptime_to_utc.assert_not_called()
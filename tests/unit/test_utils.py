@@ -1,8 +1,11 @@
 from unittest import TestCase
-from unittest.mock import MagicMock, patch
-from datetime import datetime
-from pytz import UTC
-from tap_ordway.utils import denest, get_company_id, get_full_table_version, get_version
+from unittest.mock import patch
+from tap_ordway.utils import (
+    denest,
+    get_company_id,
+    get_full_table_version,
+    iter_denest,
+)
 
 
 @patch.dict(
@@ -22,40 +25,6 @@ def test_get_full_table_version(mocked_time):
     assert mocked_time.call_count == 1
 
 
-class GetVersionTestCase(TestCase):
-    @patch("tap_ordway.utils.get_full_table_version")
-    def test_full_table_stream(self, mocked_get_full_table_version):
-        """ Ensure get_full_table_version is invoked on FULL_TABLE streams """
-
-        mocked_stream = MagicMock()
-        mocked_stream.is_valid_incremental = False
-
-        get_version(mocked_stream, "2020-01-01", None)
-
-        self.assertEqual(mocked_get_full_table_version.call_count, 1)
-
-    def test_version_is_1_when_incremental_first_run(self):
-        mocked_stream = MagicMock()
-        mocked_stream.is_valid_incremental = True
-
-        version = get_version(
-            mocked_stream, "2020-01-01", datetime(2018, 12, 1, tzinfo=UTC)
-        )
-        self.assertEqual(version, 1)
-
-        version = get_version(mocked_stream, "2020-01-01", None)
-        self.assertEqual(version, 1)
-
-    def test_version_is_None_on_incremental_non_first_runs(self):
-        mocked_stream = MagicMock()
-        mocked_stream.is_valid_incremental = True
-
-        version = get_version(
-            mocked_stream, "2020-01-01", datetime(2020, 2, 1, tzinfo=UTC)
-        )
-        self.assertIsNone(version)
-
-
 class DenestTestCase(TestCase):
     def test_empty_path_returns_original_value(self):
         """ Ensure path being empty returns the original result in a list """
@@ -77,3 +46,12 @@ class DenestTestCase(TestCase):
         )
 
         self.assertListEqual(results, [{"id": 1}, {"id": 2}])
+
+    def test_iter_denest_is_lazy(self):
+        results = iter_denest(
+            {"plans": [{"charges": [{"id": 1}, {"id": 2}]}, {"charges": [{"id": 3}]}]},
+            ("plans", "charges"),
+        )
+
+        self.assertNotIsInstance(results, list)
+        self.assertListEqual(list(results), [{"id": 1}, {"id": 2}, {"id": 3}])
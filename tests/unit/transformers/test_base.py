@@ -8,6 +8,7 @@ from tap_ordway.transformers.base import (
     _transform_string,
     transformer_prehook,
 )
+from tap_ordway.transformers.compiled import CompiledSchema
 
 
 def test_transform_string():
@@ -129,3 +130,30 @@ class RecordTransformerTestCase(TestCase):
             self.transformer.__exit__(None)
 
             self.assertEqual(mocked_log_warning.call_count, 1)
+
+    def test_transform_with_compiled_schema(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "charge_id": {"type": ["null", "string"]},
+                "company_id": {"type": ["null", "string"]},
+                "amount": {"type": ["null", "number"]},
+            },
+        }
+
+        self.assertListEqual(
+            list(
+                self.transformer.transform(
+                    {"id": "CHG-1", "amount": "1.50"},
+                    CompiledSchema(schema),
+                    context=self.mocked_context,
+                )
+            ),
+            list(
+                self.transformer.transform(
+                    {"id": "CHG-1", "amount": "1.50"},
+                    schema,
+                    context=self.mocked_context,
+                )
+            ),
+        )
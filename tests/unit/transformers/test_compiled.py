@@ -0,0 +1,122 @@
+from unittest import TestCase
+from copy import deepcopy
+from decimal import Decimal
+from singer.transform import SchemaMismatch
+from tap_ordway.transformers.base import PrecisionSafeTransformer, transformer_prehook
+from tap_ordway.transformers.compiled import CompiledSchema
+
+SCHEMA = {
+    "type": ["null", "object"],
+    "properties": {
+        "customer_id": {"type": ["string"]},
+        "name": {"type": ["null", "string"]},
+        "balance": {"type": ["null", "number"]},
+        "quantity": {"type": ["null", "integer"]},
+        "taxable": {"type": ["null", "boolean"]},
+        "updated_date": {"type": ["null", "string"], "format": "date-time"},
+        "amount": {"type": ["null", "string", "number"]},
+        "custom_fields": {"type": ["null", "object"]},
+        "deselected": {"type": ["null", "string"]},
+        "line_items": {
+            "type": ["null", "array"],
+            "items": {
+                "type": ["null", "object"],
+                "properties": {
+                    "line_no": {"type": ["null", "string"]},
+                    "unit_price": {"type": ["null", "number"]},
+                },
+            },
+        },
+        "contact": {
+            "anyOf": [
+                {"type": "object", "properties": {"id": {"type": "integer"}}},
+                {"type": "string"},
+            ]
+        },
+    },
+}
+METADATA = {
+    (): {"inclusion": "available"},
+    ("properties", "customer_id"): {"inclusion": "automatic"},
+    ("properties", "deselected"): {"inclusion": "available", "selected": False},
+}
+RECORDS = [
+    {
+        "customer_id": "C-1",
+        "name": "",
+        "balance": "1,234.5600",
+        "quantity": "1,000",
+        "taxable": "-",
+        "updated_date": "2020-11-14T05:59:48.842Z",
+        "amount": 0.1,
+        "custom_fields": {"foo": "bar"},
+        "deselected": "foo",
+        "not_in_schema": True,
+        "line_items": [
+            {"line_no": 1, "unit_price": 10.25, "extra": None},
+            {"line_no": "2", "unit_price": "-"},
+        ],
+        "contact": {"id": "5"},
+    },
+    {"customer_id": "C-2", "taxable": "false", "contact": "none", "balance": None},
+    {"customer_id": None, "contact": {"id": "not an integer"}},
+]
+
+
+class CompiledSchemaTestCase(TestCase):
+    def assert_transforms_like_singer(self, pre_hook):
+        singer_transformer = PrecisionSafeTransformer(pre_hook=pre_hook)
+        compiled_transformer = PrecisionSafeTransformer(pre_hook=pre_hook)
+        singer_schema = deepcopy(SCHEMA)
+        compiled_schema = CompiledSchema(deepcopy(SCHEMA), METADATA)
+
+        for record in RECORDS:
+            try:
+                expected = singer_transformer.transform(
+                    deepcopy(record), singer_schema, METADATA
+                )
+            except SchemaMismatch as err:
+                with self.assertRaises(SchemaMismatch) as ctx:
+                    compiled_schema.transform(deepcopy(record), compiled_transformer)
+
+                self.assertEqual(str(ctx.exception), str(err))
+                continue
+
+            results = compiled_schema.transform(deepcopy(record), compiled_transformer)
+
+            self.assertEqual(repr(results), repr(expected))
+
+        self.assertSetEqual(compiled_transformer.removed, singer_transformer.removed)
+        self.assertSetEqual(compiled_transformer.filtered, singer_transformer.filtered)
+        self.assertListEqual(
+            [error.tostr() for error in compiled_transformer.errors],
+            [error.tostr() for error in singer_transformer.errors],
+        )
+
+    def test_matches_singer_transformer_with_prehook(self):
+        self.assert_transforms_like_singer(transformer_prehook)
+
+    def test_matches_singer_transformer_without_prehook(self):
+        self.assert_transforms_like_singer(None)
+
+    def test_numbers_are_decimals(self):
+        results = CompiledSchema(SCHEMA).transform(
+            {"customer_id": "C-1", "balance": "1,234.5600"},
+            PrecisionSafeTransformer(pre_hook=transformer_prehook),
+        )
+
+        self.assertEqual(results["balance"], Decimal("1234.5600"))
+        self.assertIsInstance(results["balance"], Decimal)
+
+    def test_uses_transformer_pre_hook_at_transform_time(self):
+        transformer = PrecisionSafeTransformer(pre_hook=None)
+        compiled_schema = CompiledSchema(SCHEMA)
+
+        self.assertEqual(
+            compiled_schema.transform({"name": ""}, transformer), {"name": ""}
+        )
+
+        transformer.pre_hook = transformer_prehook
+        self.assertEqual(
+            compiled_schema.transform({"name": ""}, transformer), {"name": None}
+        )